@@ -1,19 +1,28 @@
+import json
+import time
 from google.adk.agents import Agent
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from config.constants import MODEL_NAME_FLASH_2
+from models import init_backend, create_model, ResponseCache
+from .specialist_context import SpecialistContext, start_session, generate
+from .alert_queue import AlertQueue
+from .alert_correlation import AlertCorrelator
+from .plan_cache import ResponsePlanCache, PLAN_PLACEHOLDERS, incident_signature, fill_plan
 
 # agents/alert_agent.py
 class AlertManagementAgent(Agent):
     """Agent specialized in alert management and emergency response coordination"""
     
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, response_cache: Optional[ResponseCache] = None):
         super().__init__(
             name="AlertManagement-Agent",
             description="Specialized agent for alert management, emergency response coordination, and incident handling", 
             instructions="You manage alerts, prioritize emergencies, and coordinate response plans for incidents."
         )
-        vertexai.init(project=project_id, location=location)
+        init_backend(project_id, location)
         
-        self.model = GenerativeModel(
+        self.model = create_model(
             model_name=MODEL_NAME_FLASH_2,
             system_instruction="""
             You are an Alert Management Agent specialized in:
@@ -24,53 +33,143 @@ class AlertManagementAgent(Agent):
             - Resource allocation for incidents
             
             Always prioritize human safety and provide clear, actionable guidance.
-            """
+            """,
+            cache=response_cache
         )
-        self.chat_session = self.model.start_chat()
+        # Stateless calls unless STATEFUL_CHAT_SESSIONS is set
+        self.chat_session = start_session(self.model)
+        
+        # Live alerts persist between calls; ranking is local, the model only sees changes
+        self.alert_queue = AlertQueue()
+        
+        # Collapses alert storms so one response plan covers one incident
+        self.correlator = AlertCorrelator()
+        
+        # Routine incidents reuse plan templates keyed by (type, severity band, zone class)
+        self.plan_cache = ResponsePlanCache()
     
-    def prioritize_alerts(self, alerts: list) -> Dict[str, Any]:
+    def prioritize_alerts(self, alerts: list, context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
         """Prioritize multiple alerts based on severity and impact"""
-        prompt = f"""
-        Prioritize these safety alerts:
-        Alerts: {alerts}
-        
-        For each alert, determine:
-        1. Priority level (P1-Critical, P2-High, P3-Medium, P4-Low)
-        2. Required response time
-        3. Resource requirements
-        4. Escalation needs
+        now = time.time()
+        new_alerts = [alert for alert in alerts if self.alert_queue.push(alert, now)]
+        escalated = [live.data | {"severity": live.severity, "escalations": live.escalations}
+                     for live in self.alert_queue.take_escalated()]
+        ranked = self.alert_queue.top(10, now)
         
-        Provide ranked list with justifications.
-        """
+        if new_alerts or escalated:
+            prompt = f"""
+            Prioritize these new or escalated safety alerts:
+            New alerts: {new_alerts}
+            Escalated alerts: {escalated}
+            Current queue (highest score first): {json.dumps(ranked, separators=(',', ':'))}
+            
+            For each new or escalated alert, determine:
+            1. Priority level (P1-Critical, P2-High, P3-Medium, P4-Low)
+            2. Required response time
+            3. Resource requirements
+            4. Escalation needs
+            
+            Provide ranked list with justifications.
+            """
+            
+            response = generate("alert_management", MODEL_NAME_FLASH_2, self.model, prompt, context, self.chat_session)
+            result = response.text
+        else:
+            result = "No new or escalated alerts. Current queue ranking unchanged."
         
-        response = self.chat_session.send_message(prompt)
         return {
             "agent": "alert_management",
             "analysis_type": "alert_prioritization",
-            "result": response.text,
-            "alerts_processed": len(alerts)
+            "result": result,
+            "alerts_processed": len(alerts),
+            "new_alerts": len(new_alerts),
+            "escalated_alerts": len(escalated),
+            "queue": ranked
         }
     
-    def generate_response_plan(self, incident_details: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate emergency response plan"""
-        prompt = f"""
-        Generate emergency response plan for:
-        Incident: {incident_details}
-        
-        Include:
-        1. Immediate actions (0-5 minutes)
-        2. Short-term response (5-30 minutes)
-        3. Extended response (30+ minutes)
-        4. Communication protocols
-        5. Resource deployment strategy
+    def acknowledge_alert(self, alert_id: str) -> bool:
+        """Mark a live alert as being handled; it stops aging"""
+        return self.alert_queue.acknowledge(alert_id)
+    
+    def resolve_alert(self, alert_id: str) -> bool:
+        """Remove a live alert from the queue"""
+        return self.alert_queue.resolve(alert_id) is not None
+    
+    def escalate_alert(self, alert_id: str) -> bool:
+        """Escalate a live alert; it is sent to the model on the next prioritization"""
+        return self.alert_queue.escalate(alert_id)
+    
+    def generate_response_plan(self, incident_details: Dict[str, Any],
+                               context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
+        """Generate emergency response plan, reusing a cached template for routine incidents"""
+        signature = incident_signature(incident_details)
+        template = self.plan_cache.get(signature) if signature else None
+        cached = template is not None
         
-        Ensure plan is specific and actionable.
-        """
+        if not cached:
+            if signature:
+                # Cacheable: only the incident class goes in; specifics stay placeholders
+                incident = {
+                    "type": signature[0],
+                    "severity_band": signature[1],
+                    "zone_class": signature[2]
+                }
+                placeholder_note = (f"Refer to incident-specific details only with these placeholders: "
+                                    f"{', '.join(PLAN_PLACEHOLDERS)}.")
+            else:
+                incident = incident_details
+                placeholder_note = ""
+            
+            prompt = f"""
+            Generate emergency response plan for:
+            Incident: {incident}
+            
+            Include:
+            1. Immediate actions (0-5 minutes)
+            2. Short-term response (5-30 minutes)
+            3. Extended response (30+ minutes)
+            4. Communication protocols
+            5. Resource deployment strategy
+            
+            Ensure plan is specific and actionable. {placeholder_note}
+            """
+            
+            # Templates are shared across requests, so they are generated without request context
+            start = time.perf_counter()
+            response = generate("alert_management", MODEL_NAME_FLASH_2, self.model, prompt,
+                                None if signature else context, self.chat_session)
+            template = response.text
+            generation_latency = time.perf_counter() - start
+            if signature:
+                self.plan_cache.put(signature, template, generation_latency)
+            else:
+                self.plan_cache.record_bypass(generation_latency)
         
-        response = self.chat_session.send_message(prompt)
         return {
             "agent": "alert_management", 
             "analysis_type": "response_planning",
-            "result": response.text,
-            "incident_type": incident_details.get('type', 'unknown')
+            "result": fill_plan(template, incident_details),
+            "incident_type": incident_details.get('type', 'unknown'),
+            "plan_cached": cached
+        }
+    
+    def respond_to_alerts(self, alerts: List[Dict[str, Any]],
+                          context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
+        """Correlate alerts into incidents and generate one response plan per incident"""
+        incidents = self.correlator.ingest_many(alerts)
+        
+        plans = {}
+        for incident in incidents:
+            if incident.needs_plan:
+                incident.plan = self.generate_response_plan(incident.to_details(), context)
+                incident.planned_severity = incident.severity
+            plans[incident.id] = incident.plan
+        
+        return {
+            "agent": "alert_management",
+            "analysis_type": "incident_response",
+            "result": "\n\n".join(f"[{incident_id}] {plan['result']}" for incident_id, plan in plans.items()),
+            "incidents": [incident.to_details() for incident in incidents],
+            "alerts_processed": len(alerts),
+            "correlation": self.correlator.stats()
         }
@@ -0,0 +1,165 @@
+# agents/alert_correlation.py
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from config.agent_config import ZONE_ADJACENCY
+from .alert_queue import SEVERITY_ORDER, _to_epoch
+from .plan_cache import GENERIC_INCIDENT_TYPES
+
+# Alert ids and descriptions kept per incident; alert_count keeps counting past them
+INCIDENT_MAX_ALERT_IDS = 100
+INCIDENT_MAX_DESCRIPTIONS = 5
+UNKNOWN_ZONES = {"", "unknown"}
+
+
+@dataclass
+class Incident:
+    """A cluster of alerts of one type from adjacent zones within the time window"""
+    id: str
+    type: str
+    first_seen: float
+    last_seen: float
+    zones: Set[str] = field(default_factory=set)
+    alert_ids: List[str] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+    alert_count: int = 0
+    severity: str = "low"
+    plan: Optional[Dict[str, Any]] = None
+    planned_severity: Optional[str] = None
+
+    @property
+    def needs_plan(self) -> bool:
+        """No plan yet, or the incident has become more severe since it was planned"""
+        return (self.plan is None
+                or SEVERITY_ORDER.index(self.severity) > SEVERITY_ORDER.index(self.planned_severity))
+
+    def to_details(self) -> Dict[str, Any]:
+        """Incident details in the shape generate_response_plan expects"""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "location": ", ".join(sorted(self.zones)),
+            "severity": self.severity,
+            "description": " | ".join(self.descriptions),
+            "alert_count": self.alert_count,
+            "timestamp": datetime.fromtimestamp(self.first_seen).isoformat()
+        }
+
+
+class AlertCorrelator:
+    """
+    Clusters incoming alerts into incidents by type, zone adjacency and a
+    sliding time window.
+
+    Open incidents are indexed by (type, zone), so matching an alert is a
+    handful of dict lookups over its zone and the zone's neighbours. A deque
+    of (last_seen, incident) entries expires incidents as the window slides.
+    Alerts with a generic type or no known zone are never correlated; each
+    opens its own incident. Ingestion is serialized by a lock.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, adjacency: Optional[Dict[str, List[str]]] = None):
+        self.window_seconds = window_seconds
+        adjacency = ZONE_ADJACENCY if adjacency is None else adjacency
+        self.adjacency = {_normalize(zone): {_normalize(n) for n in neighbours}
+                          for zone, neighbours in adjacency.items()}
+
+        self._index: Dict[Tuple[str, str], Incident] = {}
+        self._window: deque = deque()
+        self._clock = 0.0
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+        self.alerts_seen = 0
+        self.incidents_created = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        """Alerts per incident; 1.0 means nothing was collapsed"""
+        return self.alerts_seen / self.incidents_created if self.incidents_created else 1.0
+
+    def open_incidents(self) -> List[Incident]:
+        with self._lock:
+            self._expire(self._clock)
+            return list({id(incident): incident for incident in self._index.values()}.values())
+
+    def ingest(self, alert: Dict[str, Any], now: Optional[float] = None) -> Tuple[Incident, bool]:
+        """Attach an alert to a matching open incident or open a new one; returns (incident, created)"""
+        with self._lock:
+            timestamp = _to_epoch(alert.get('timestamp'), time.time() if now is None else now)
+            self._clock = max(self._clock, timestamp)
+            self._expire(self._clock)
+            self.alerts_seen += 1
+
+            alert_type = _normalize(alert.get('type', 'general'))
+            zone = _normalize(alert.get('zone', alert.get('location', 'unknown')))
+
+            correlatable = alert_type not in GENERIC_INCIDENT_TYPES and zone not in UNKNOWN_ZONES
+            incident = self._index.get((alert_type, zone)) if correlatable else None
+            if incident is None and correlatable:
+                for neighbour in self.adjacency.get(zone, ()):
+                    incident = self._index.get((alert_type, neighbour))
+                    if incident is not None:
+                        break
+
+            created = incident is None
+            if created:
+                incident = Incident(id=f"incident_{next(self._ids)}", type=alert_type,
+                                    first_seen=timestamp, last_seen=timestamp)
+                self.incidents_created += 1
+
+            incident.last_seen = max(incident.last_seen, timestamp)
+            incident.zones.add(zone)
+            incident.alert_count += 1
+            incident.alert_ids.append(str(alert.get('id', incident.alert_count)))
+            del incident.alert_ids[:-INCIDENT_MAX_ALERT_IDS]
+            if alert.get('description') and len(incident.descriptions) < INCIDENT_MAX_DESCRIPTIONS:
+                incident.descriptions.append(str(alert['description']))
+            severity = str(alert.get('severity', 'medium')).lower()
+            if severity in SEVERITY_ORDER and SEVERITY_ORDER.index(severity) > SEVERITY_ORDER.index(incident.severity):
+                incident.severity = severity
+
+            if correlatable:
+                self._index[(alert_type, zone)] = incident
+                self._window.append((incident.last_seen, alert_type, zone, incident))
+            return incident, created
+
+    def ingest_many(self, alerts: List[Dict[str, Any]], now: Optional[float] = None) -> List[Incident]:
+        """Ingest a batch; returns the distinct incidents it touched, in first-touched order"""
+        with self._lock:
+            touched: Dict[str, Incident] = {}
+            for alert in alerts:
+                incident, _ = self.ingest(alert, now)
+                touched.setdefault(incident.id, incident)
+            return list(touched.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "alerts_seen": self.alerts_seen,
+                "incidents_created": self.incidents_created,
+                "open_incidents": len(self.open_incidents()),
+                "compression_ratio": round(self.compression_ratio, 2)
+            }
+
+    def _expire(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            _, alert_type, zone, incident = self._window.popleft()
+            if self._index.get((alert_type, zone)) is not incident:
+                continue
+            if incident.last_seen < cutoff:
+                del self._index[(alert_type, zone)]
+            else:
+                # Refreshed through another zone since; check this zone again later
+                self._window.append((incident.last_seen, alert_type, zone, incident))
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value).lower().replace("_", " ").split())
+
@@ -0,0 +1,231 @@
+# agents/alert_queue.py
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from config.agent_config import (ALERT_SLA_SECONDS, ALERT_SEVERITY_WEIGHTS, ALERT_MAX_AGE_SLAS, ALERT_TTL_SECONDS,
+                                 ALERT_QUEUE_MAX_ALERTS, ZONE_CRITICALITY)
+
+SEVERITY_ORDER = ["low", "medium", "high", "critical"]
+
+
+@dataclass
+class LiveAlert:
+    """An alert held in the queue until it is resolved or expires"""
+    id: str
+    type: str
+    severity: str
+    zone: str
+    created_at: float
+    updated_at: float
+    data: Dict[str, Any] = field(default_factory=dict)
+    acknowledged_at: Optional[float] = None
+    escalations: int = 0
+    version: int = 0
+
+    def to_dict(self, score: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "severity": self.severity,
+            "zone": self.zone,
+            "score": round(score, 2),
+            "acknowledged": self.acknowledged_at is not None,
+            "escalations": self.escalations
+        }
+
+
+class AlertQueue:
+    """
+    In-process priority queue of live alerts backed by a binary heap.
+
+    Score = severity weight x zone criticality x (1 + min(age / SLA, ALERT_MAX_AGE_SLAS))
+    x 2^escalations. Alerts expire `ttl_seconds` after they were raised or
+    last escalated, and past `max_alerts` the oldest are dropped.
+    Scores grow with age at different rates, so every heap key is computed
+    as of the last re-score and the whole heap is re-scored in one O(n)
+    heapify at most every `rescore_interval` seconds. Pushes, escalations
+    and removals in between are O(log n), with lazy invalidation of stale
+    heap entries. Operations are serialized by a lock, so specialist
+    threads can share one queue.
+    """
+
+    def __init__(self, rescore_interval: float = 5.0, ttl_seconds: float = ALERT_TTL_SECONDS,
+                 max_alerts: int = ALERT_QUEUE_MAX_ALERTS):
+        self.rescore_interval = rescore_interval
+        self.ttl_seconds = ttl_seconds
+        self.max_alerts = max_alerts
+        self.expired = 0
+        self.evicted = 0
+        self._alerts: Dict[str, LiveAlert] = {}
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._scored_at = 0.0
+        self._escalated: List[str] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self._alerts
+
+    # ---- Scoring ----
+    def score(self, alert: LiveAlert, now: float) -> float:
+        # Acknowledged alerts stop aging: someone is already responding
+        aged_until = min(alert.acknowledged_at, now) if alert.acknowledged_at is not None else now
+        age = max(aged_until - alert.created_at, 0.0)
+        sla = ALERT_SLA_SECONDS.get(alert.severity, ALERT_SLA_SECONDS["medium"])
+        return (ALERT_SEVERITY_WEIGHTS.get(alert.severity, 1.0)
+                * _zone_criticality(alert.zone)
+                * (1 + min(age / sla, ALERT_MAX_AGE_SLAS))
+                * (2 ** alert.escalations))
+
+    # ---- Operations ----
+    def push(self, alert: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Add an alert dict; returns False if an alert with the same id is already live"""
+        with self._lock:
+            now = time.time() if now is None else now
+            alert_id = str(alert.get('id') or f"alert_{next(self._counter)}")
+            existing = self._alerts.get(alert_id)
+            if existing is not None:
+                if not self._is_expired(existing, now):
+                    return False
+                self.resolve(alert_id)
+                self.expired += 1
+            if len(self._alerts) >= self.max_alerts:
+                self._expire(now)
+            while len(self._alerts) >= self.max_alerts:
+                self.resolve(next(iter(self._alerts)))
+                self.evicted += 1
+
+            severity = str(alert.get('severity', 'medium')).lower()
+            created_at = _to_epoch(alert.get('timestamp'), now)
+            live = LiveAlert(
+                id=alert_id,
+                type=str(alert.get('type', 'general')),
+                severity=severity if severity in SEVERITY_ORDER else 'medium',
+                zone=str(alert.get('zone', alert.get('location', 'unknown'))),
+                created_at=created_at,
+                updated_at=created_at,
+                data=alert
+            )
+            self._alerts[alert_id] = live
+            self._push_entry(live)
+            return True
+
+    def acknowledge(self, alert_id: str, now: Optional[float] = None) -> bool:
+        with self._lock:
+            live = self._alerts.get(alert_id)
+            if live is None or live.acknowledged_at is not None:
+                return False
+            now = time.time() if now is None else now
+            live.acknowledged_at = now
+            self._push_entry(live)
+            return True
+
+    def resolve(self, alert_id: str) -> Optional[LiveAlert]:
+        with self._lock:
+            live = self._alerts.pop(alert_id, None)
+            if live is not None:
+                # Outstanding heap entries for this id are skipped lazily
+                live.version += 1
+            return live
+
+    def escalate(self, alert_id: str, now: Optional[float] = None) -> bool:
+        """Raise severity one level (if possible), clear acknowledgement and boost the score"""
+        with self._lock:
+            live = self._alerts.get(alert_id)
+            if live is None:
+                return False
+            live.updated_at = time.time() if now is None else now
+            level = SEVERITY_ORDER.index(live.severity)
+            live.severity = SEVERITY_ORDER[min(level + 1, len(SEVERITY_ORDER) - 1)]
+            live.escalations += 1
+            live.acknowledged_at = None
+            self._push_entry(live)
+            self._escalated.append(alert_id)
+            return True
+
+    def take_escalated(self) -> List[LiveAlert]:
+        """Alerts escalated since the last call (still live)"""
+        with self._lock:
+            escalated = [self._alerts[a] for a in dict.fromkeys(self._escalated) if a in self._alerts]
+            self._escalated = []
+            return escalated
+
+    def peek(self, now: Optional[float] = None) -> Optional[LiveAlert]:
+        with self._lock:
+            top = self.top(1, now)
+            return self._alerts[top[0]['id']] if top else None
+
+    def pop(self, now: Optional[float] = None) -> Optional[LiveAlert]:
+        with self._lock:
+            live = self.peek(now)
+            return self.resolve(live.id) if live else None
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The k highest-scoring live alerts, as dicts with their score as of the last re-score"""
+        with self._lock:
+            now = time.time() if now is None else now
+            if now - self._scored_at >= self.rescore_interval or len(self._heap) > 2 * len(self._alerts) + 64:
+                self.refresh(now)
+
+            ranked, taken = [], []
+            while self._heap and len(ranked) < k:
+                entry = heapq.heappop(self._heap)
+                live = self._alerts.get(entry[2])
+                if live is None or live.version != entry[3]:
+                    continue
+                if self._is_expired(live, now):
+                    self.resolve(live.id)
+                    self.expired += 1
+                    continue
+                taken.append(entry)
+                ranked.append(live.to_dict(-entry[0]))
+            for entry in taken:
+                heapq.heappush(self._heap, entry)
+            return ranked
+
+    def refresh(self, now: Optional[float] = None) -> None:
+        """Re-score every live alert against the current time and rebuild the heap"""
+        with self._lock:
+            now = time.time() if now is None else now
+            self._expire(now)
+            self._heap = [(-self.score(live, now), next(self._counter), live.id, live.version)
+                          for live in self._alerts.values()]
+            heapq.heapify(self._heap)
+            self._scored_at = now
+
+    def _is_expired(self, live: LiveAlert, now: float) -> bool:
+        return now - live.updated_at > self.ttl_seconds
+
+    def _expire(self, now: float):
+        for live in [live for live in self._alerts.values() if self._is_expired(live, now)]:
+            self.resolve(live.id)
+            self.expired += 1
+
+    def _push_entry(self, live: LiveAlert):
+        # Keyed as of the last re-score so all heap entries stay comparable
+        live.version += 1
+        heapq.heappush(self._heap, (-self.score(live, self._scored_at), next(self._counter), live.id, live.version))
+
+
+def _zone_criticality(zone: str) -> float:
+    zone = zone.lower()
+    return max((weight for name, weight in ZONE_CRITICALITY.items() if name in zone), default=1.0)
+
+
+def _to_epoch(timestamp: Any, default: float) -> float:
+    if timestamp is None:
+        return default
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return datetime.fromisoformat(str(timestamp)).timestamp()
+    except ValueError:
+        return default
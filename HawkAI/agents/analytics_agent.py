@@ -1,20 +1,28 @@
+import json
 from google.adk.agents import Agent
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from config.constants import MODEL_NAME_FLASH_2, INCIDENT_STORE_PATH
+from models import init_backend, create_model, ResponseCache
+from .specialist_context import SpecialistContext, start_session, generate
+from .incident_store import IncidentStore
+from .forecasting import CrowdForecaster
 
 
 # agents/analytics_agent.py
 class DataAnalyticsAgent(Agent):
     """Agent specialized in data analysis and pattern recognition"""
     
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, incident_store: Optional[IncidentStore] = None,
+                 response_cache: Optional[ResponseCache] = None):
         super().__init__(
             name="DataAnalytics-Agent", 
             description="Specialized agent for data analysis, pattern recognition, and predictive modeling",
             instructions="You analyze historical data, detect patterns and anomalies, and provide predictive insights."
         )
-        vertexai.init(project=project_id, location=location)
+        init_backend(project_id, location)
         
-        self.model = GenerativeModel(
+        self.model = create_model(
             model_name=MODEL_NAME_FLASH_2,
             system_instruction="""
             You are a Data Analytics Agent specialized in:
@@ -25,15 +33,57 @@ class DataAnalyticsAgent(Agent):
             - Performance metrics calculation
             
             Always provide data-driven insights with confidence levels.
-            """
+            """,
+            cache=response_cache
         )
-        self.chat_session = self.model.start_chat()
+        # Stateless calls unless STATEFUL_CHAT_SESSIONS is set
+        self.chat_session = start_session(self.model)
+        
+        # An unreadable store file leaves a memory-only store instead of failing construction
+        self.incident_store = IncidentStore.open(INCIDENT_STORE_PATH) if incident_store is None else incident_store
+        
+        # Local forecasts for per-gate/per-zone counts; no model call involved
+        self.forecaster = CrowdForecaster()
+    
+    def record_incidents(self, incidents: list) -> int:
+        """Append new incidents to the store and persist just those rows"""
+        if self.incident_store.extend(incidents) and self.incident_store.path:
+            try:
+                self.incident_store.flush()
+            except OSError as error:
+                # Read-only deploy or full disk: keep serving from memory
+                self.incident_store.persist_error = f"Could not write {self.incident_store.path}: {error}"
+                self.incident_store.path = None
+        return len(self.incident_store)
+    
+    def record_counts(self, samples: Dict[str, float]) -> None:
+        """Feed the latest per-gate/per-zone counts into the forecaster"""
+        self.forecaster.update(samples)
     
-    def analyze_historical_patterns(self, incident_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze historical incident patterns"""
+    def forecast_occupancy(self, series_key: str, minutes_ahead: float = 30) -> Dict[str, Any]:
+        """Forecast a gate or zone count locally with Holt-Winters smoothing"""
+        prediction = self.forecaster.forecast(series_key, minutes_ahead)
+        return {
+            "agent": "data_analytics",
+            "analysis_type": "occupancy_forecast",
+            "result": (f"Forecast for {series_key} in {minutes_ahead:g} minutes: {prediction:.0f}"
+                       if prediction is not None else f"No count history for {series_key}"),
+            "series": series_key,
+            "minutes_ahead": minutes_ahead,
+            "forecast": prediction
+        }
+    
+    def analyze_historical_patterns(self, incident_data: Dict[str, Any],
+                                    context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
+        """Analyze historical incident patterns from precomputed summary tables"""
+        # New incidents are ingested; the model only ever sees the aggregates
+        self.record_incidents(incident_data.get('incidents', []))
+        summary = self.incident_store.summary()
+        
         prompt = f"""
         Analyze these historical incident patterns:
-        Data: {incident_data}
+        Time period: {incident_data.get('time_period', 'unknown')}
+        Summary tables: {json.dumps(summary, separators=(',', ':'))}
         
         Identify:
         1. Common incident types and frequencies
@@ -44,15 +94,17 @@ class DataAnalyticsAgent(Agent):
         Provide structured analysis with confidence scores.
         """
         
-        response = self.chat_session.send_message(prompt)
+        response = generate("data_analytics", MODEL_NAME_FLASH_2, self.model, prompt, context, self.chat_session)
         return {
             "agent": "data_analytics",
             "analysis_type": "historical_patterns",
             "result": response.text,
-            "data_points": len(incident_data.get('incidents', []))
+            "data_points": len(self.incident_store),
+            "rejected_incidents": self.incident_store.rejected
         }
     
-    def detect_anomalies(self, current_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    def detect_anomalies(self, current_metrics: Dict[str, Any],
+                         context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
         """Detect anomalies in current event metrics"""
         prompt = f"""
         Detect anomalies in current event metrics:
@@ -66,7 +118,7 @@ class DataAnalyticsAgent(Agent):
         Rate anomaly severity and provide investigation priorities.
         """
         
-        response = self.chat_session.send_message(prompt)
+        response = generate("data_analytics", MODEL_NAME_FLASH_2, self.model, prompt, context, self.chat_session)
         return {
             "agent": "data_analytics",
             "analysis_type": "anomaly_detection",
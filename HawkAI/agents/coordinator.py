@@ -1,15 +1,32 @@
-import vertexai
-from vertexai.generative_models import GenerativeModel
 from google.adk.agents import Agent
 from typing import Dict, Any, List, Optional
 import json
+import re
+import hashlib
 import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
 
 from .safety_agent import SafetyMonitoringAgent
 from .analytics_agent import DataAnalyticsAgent
 from .alert_agent import AlertManagementAgent
-from config.agent_config import AGENT_CONFIGS, get_agent_for_query
+from .prompt_builder import SynthesisPromptBuilder
+from .specialist_context import SpecialistContext, start_session
+from .scheduler import PriorityScheduler, preclassify
+from .deadline import stage_estimate, has_budget_for, fast_path_answer, summarize_locally
+from .structured_output import (ANALYSIS_GENERATION_CONFIG, IncrementalJSONParser, repair_json,
+                                validate_analysis, normalize_agents)
+from monitoring import (tracked_call, tracked_stream, request_scope, usage_tracker, tracer, HistoryLog, CallCancelled,
+                        DeadlineExpired, deadline_scope, remaining_time, SingleFlight, normalize_key)
+from models import init_backend, create_model, ResponseCache
+from config.constants import MODEL_NAME_PRO, WEBHOOK_TIMEOUT_SECONDS, DEADLINE_SAFETY_MARGIN_SECONDS
+from config.agent_config import (AGENT_CONFIGS, ZONE_ADJACENCY, INCIDENT_TYPE_KEYWORDS,
+                                 LOW_PRIORITY_MIN_SPECIALIST_SECONDS, get_agent_for_query)
+
+# "gate 3 has 140", "zone b: 320 people" -> series name, count
+COUNT_PATTERN = re.compile(r'\b((?:gate|zone|entrance|exit|section)\s+[a-z0-9]+)\s*(?::|=|has|at|is|with)\s*(\d+)\b')
 
 class CoordinatorAgent(Agent):
     """
@@ -17,7 +34,7 @@ class CoordinatorAgent(Agent):
     to specialized agents and aggregates responses
     """
     
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, response_cache: Optional[ResponseCache] = None):
         super().__init__(
             name="ProjectHawkAI-Coordinator",
             description="Main coordinator agent for event safety monitoring that routes requests to specialized agents",
@@ -27,11 +44,11 @@ class CoordinatorAgent(Agent):
         self.location = location
         
         # Initialize Vertex AI
-        vertexai.init(project=project_id, location=location)
+        init_backend(project_id, location)
         
         # Initialize the coordinator model (Gemini Pro for complex reasoning)
-        self.model = GenerativeModel(
-            model_name="gemini-1.5-pro",
+        self.model = create_model(
+            model_name=MODEL_NAME_PRO,
             system_instruction="""
             You are ProjectHawkAI Coordinator, the main AI agent for proactive event safety monitoring.
             
@@ -50,25 +67,51 @@ class CoordinatorAgent(Agent):
             Always prioritize safety and provide actionable insights.
             When routing to agents, explain your reasoning.
             When synthesizing multiple agent responses, highlight key insights and conflicts.
-            """
+            """,
+            cache=response_cache
         )
         
         # Initialize specialist agents
         self.specialist_agents = {
-            'safety_monitoring': SafetyMonitoringAgent(project_id, location),
-            'data_analytics': DataAnalyticsAgent(project_id, location),
-            'alert_management': AlertManagementAgent(project_id, location)
+            'safety_monitoring': SafetyMonitoringAgent(project_id, location, response_cache=response_cache),
+            'data_analytics': DataAnalyticsAgent(project_id, location, response_cache=response_cache),
+            'alert_management': AlertManagementAgent(project_id, location, response_cache=response_cache)
         }
         
-        # Start chat session
-        self.chat_session = self.model.start_chat()
+        # Each request's analysis and synthesis prompts are self-contained: no chat
+        # history unless STATEFUL_CHAT_SESSIONS is set
+        self.chat_session = start_session(self.model)
+        
+        # Compact, token-budgeted synthesis prompts
+        self.prompt_builder = SynthesisPromptBuilder()
+        
+        # Specialist calls are blocking, so they run on worker threads
+        self.specialist_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="specialist")
+        
+        # Priority-aware admission for every model-backed step
+        self.scheduler = PriorityScheduler()
         
-        # Track conversation context
-        self.conversation_history = []
+        # Identical concurrent requests and specialist calls share one in-flight run
+        self.request_flight = SingleFlight("coordinator_requests")
+        self.specialist_flight = SingleFlight("specialist_calls")
+        
+        # Track conversation context (recent entries in memory, the rest on disk)
+        self.conversation_history = HistoryLog("coordinator_conversation")
+    
+    def _model_call(self, prompt: str, **kwargs):
+        """Stateless generate_content, or the chat session when STATEFUL_CHAT_SESSIONS is set"""
+        if self.chat_session is not None:
+            return self.chat_session.send_message(prompt, **kwargs)
+        return self.model.generate_content(prompt, **kwargs)
     
-    def analyze_request(self, user_prompt: str) -> Dict[str, Any]:
+    def analyze_request(self, user_prompt: str, on_required_agents=None) -> Dict[str, Any]:
         """
-        Analyze user request to determine routing strategy
+        Analyze user request to determine routing strategy.
+        
+        The analysis is generated as schema-constrained JSON and parsed while
+        it streams; `on_required_agents(agents, priority)` is called as soon
+        as the required_agents field is complete. Truncated or malformed output is
+        repaired locally, with keyword routing only for fields that are lost.
         """
         analysis_prompt = f"""
         Analyze this user request for ProjectHawkAI event safety monitoring:
@@ -76,162 +119,329 @@ class CoordinatorAgent(Agent):
         User Request: "{user_prompt}"
         
         Determine:
-        1. Request type (safety_assessment, data_analysis, alert_management, general_query)
-        2. Complexity level (simple, moderate, complex)
-        3. Required specialist agents (list of agent names)
-        4. Priority level (low, medium, high, critical)
+        1. Priority level (low, medium, high, critical)
+        2. Required specialist agents (list of agent names)
+        3. Request type (safety_assessment, data_analysis, alert_management, general_query)
+        4. Complexity level (simple, moderate, complex)
         5. Expected response time (seconds)
         
-        Respond in JSON format:
+        Respond in JSON format, fields in this order:
         {{
+            "priority": "", 
+            "required_agents": [],
             "request_type": "",
             "complexity": "",
-            "required_agents": [],
-            "priority": "", 
             "expected_response_time": 0,
             "reasoning": ""
         }}
         """
         
-        response = self.chat_session.send_message(analysis_prompt)
+        def on_field(key, value):
+            if key == "required_agents" and on_required_agents:
+                agents = normalize_agents(value)
+                if agents:
+                    on_required_agents(agents, parser.fields.get("priority"))
         
-        try:
-            analysis = json.loads(response.text.strip('```json\n```'))
-        except json.JSONDecodeError:
-            # Fallback to keyword-based routing
-            primary_agent = get_agent_for_query(user_prompt)
-            analysis = {
-                "request_type": "fallback_routing",
-                "complexity": "moderate", 
-                "required_agents": [primary_agent],
-                "priority": "medium",
-                "expected_response_time": 5,
-                "reasoning": f"JSON parsing failed, using keyword-based routing to {primary_agent}"
-            }
+        parser = IncrementalJSONParser(on_field)
+        slot = self.scheduler.slot(preclassify(user_prompt), agent="coordinator", preemptible=False)
+        with tracer.span("analyze_request") as span, slot:
+            try:
+                tracked_stream("coordinator", MODEL_NAME_PRO, self._model_call, analysis_prompt,
+                               on_chunk=parser.feed, generation_config=ANALYSIS_GENERATION_CONFIG)
+            except Exception:
+                # Nothing streamed: let the caller see the model error
+                if not parser.fields:
+                    raise
+            
+            data = parser.fields if parser.complete else {**parser.fields, **(repair_json(parser.buffer) or {})}
+            analysis = validate_analysis(data, user_prompt)
+            span.set_attribute("streamed_fields", list(parser.fields))
+            span.set_attribute("recovered_fields", analysis.get("recovered_fields", []))
         
         return analysis
     
+    def submit_specialist(self, agent_name: str, user_prompt: str, priority: Optional[str] = None,
+                          context: Optional[contextvars.Context] = None) -> Future:
+        """Start one specialist call on a worker thread, keeping the request and span context"""
+        context = (context or contextvars.copy_context()).copy()
+        return self.specialist_executor.submit(context.run, self._run_specialist, agent_name, user_prompt, priority)
+    
     async def route_to_agents(self, user_prompt: str, required_agents: List[str], 
-                            request_context: Dict[str, Any]) -> Dict[str, Any]:
+                            request_context: Dict[str, Any],
+                            started: Optional[Dict[str, Future]] = None) -> Dict[str, Any]:
         """
-        Route request to required specialist agents
-        """
-        agent_responses = {}
+        Route request to required specialist agents. Calls already started
+        during analysis streaming are reused; the rest start now, in parallel.
         
+        Under a deadline, waits until only the synthesis estimate is left,
+        then (synthesis will be skipped) until the deadline itself; agents
+        still running after that are reported as timed out.
+        """
+        started = started or {}
+        priority = request_context.get('priority')
+        futures = {}
         for agent_name in required_agents:
             if agent_name in self.specialist_agents:
-                try:
-                    agent = self.specialist_agents[agent_name]
-                    
-                    # Route to appropriate method based on agent type and request
-                    if agent_name == 'safety_monitoring':
-                        if 'crowd' in user_prompt.lower():
-                            # Extract crowd data from prompt or use defaults
-                            crowd_data = self._extract_crowd_data(user_prompt)
-                            response = agent.analyze_crowd_density(crowd_data)
-                        elif 'weather' in user_prompt.lower():
-                            weather_data = self._extract_weather_data(user_prompt)
-                            response = agent.assess_weather_risk(weather_data)
-                        else:
-                            # General safety analysis
-                            response = {
-                                "agent": "safety_monitoring",
-                                "analysis_type": "general_safety",
-                                "result": f"General safety analysis for: {user_prompt}",
-                                "timestamp": datetime.now().isoformat()
-                            }
-                    
-                    elif agent_name == 'data_analytics':
-                        if 'historical' in user_prompt.lower() or 'pattern' in user_prompt.lower():
-                            incident_data = self._extract_incident_data(user_prompt)
-                            response = agent.analyze_historical_patterns(incident_data)
-                        else:
-                            current_metrics = self._extract_metrics_data(user_prompt)
-                            response = agent.detect_anomalies(current_metrics)
-                    
-                    elif agent_name == 'alert_management':
-                        if 'prioritize' in user_prompt.lower() or 'alerts' in user_prompt.lower():
-                            alerts = self._extract_alerts_data(user_prompt)
-                            response = agent.prioritize_alerts(alerts)
-                        else:
-                            incident_details = self._extract_incident_details(user_prompt)
-                            response = agent.generate_response_plan(incident_details)
-                    
-                    agent_responses[agent_name] = response
-                    
-                except Exception as e:
-                    agent_responses[agent_name] = {
-                        "agent": agent_name,
-                        "error": f"Agent execution failed: {str(e)}",
-                        "timestamp": datetime.now().isoformat()
-                    }
+                started_future = started.get(agent_name) or self.submit_specialist(agent_name, user_prompt, priority)
+                futures[agent_name] = asyncio.wrap_future(started_future)
+        
+        pending = set(futures.values())
+        for reserve in (stage_estimate("synthesis"), 0.0):
+            if not pending:
+                break
+            remaining = remaining_time()
+            timeout = None if remaining is None else max(0.0, remaining - reserve)
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+        
+        agent_responses = {}
+        for agent_name, future in futures.items():
+            if future in pending:
+                agent_responses[agent_name] = {
+                    "agent": agent_name,
+                    "status": "timed_out",
+                    "result": "No result before the request deadline",
+                    "timestamp": datetime.now().isoformat()
+                }
+            else:
+                agent_responses[agent_name] = future.result()
         
         return agent_responses
     
-    def synthesize_responses(self, user_prompt: str, agent_responses: Dict[str, Any], 
-                           analysis: Dict[str, Any]) -> str:
+    def _run_specialist(self, agent_name: str, user_prompt: str, priority: Optional[str] = None) -> Dict[str, Any]:
+        key = (agent_name, normalize_key(user_prompt))
+        response, shared = self.specialist_flight.do(key, self._run_specialist_once, agent_name, user_prompt, priority)
+        return {**response, "coalesced": True} if shared else response
+    
+    def _run_specialist_once(self, agent_name: str, user_prompt: str, priority: Optional[str] = None) -> Dict[str, Any]:
+        with tracer.span("specialist_call", agent=agent_name, priority=priority) as span:
+            try:
+                with self.scheduler.slot(priority, agent=agent_name):
+                    response = self._call_specialist(agent_name, user_prompt,
+                                                     SpecialistContext(request=user_prompt, priority=priority))
+                span.set_attribute("analysis_type", response.get("analysis_type"))
+                return response
+            except DeadlineExpired:
+                span.set_attribute("timed_out", True)
+                return {
+                    "agent": agent_name,
+                    "status": "timed_out",
+                    "result": "No result before the request deadline",
+                    "timestamp": datetime.now().isoformat()
+                }
+            except CallCancelled:
+                span.set_attribute("deferred", True)
+                return {
+                    "agent": agent_name,
+                    "status": "deferred",
+                    "result": "Deferred: preempted by a critical request; ask again once it is handled",
+                    "timestamp": datetime.now().isoformat()
+                }
+            except Exception as e:
+                span.set_attribute("error", str(e))
+                return {
+                    "agent": agent_name,
+                    "error": f"Agent execution failed: {str(e)}",
+                    "timestamp": datetime.now().isoformat()
+                }
+    
+    def _call_specialist(self, agent_name: str, user_prompt: str,
+                         context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
         """
-        Synthesize responses from specialist agents into a coherent answer
+        Run one specialist agent, picking the method from the agent type and request.
+        `context` is all the model sees besides the method's own prompt.
         """
-        synthesis_prompt = f"""
-        Original user request: "{user_prompt}"
+        agent = self.specialist_agents[agent_name]
         
-        Request analysis: {json.dumps(analysis, indent=2)}
+        # Route to appropriate method based on agent type and request
+        if agent_name == 'safety_monitoring':
+            if 'crowd' in user_prompt.lower():
+                # Extract crowd data from prompt or use defaults
+                crowd_data = self._extract_crowd_data(user_prompt)
+                response = agent.analyze_crowd_density(crowd_data, context)
+            elif 'weather' in user_prompt.lower():
+                weather_data = self._extract_weather_data(user_prompt)
+                response = agent.assess_weather_risk(weather_data, context)
+            else:
+                # General safety analysis
+                response = {
+                    "agent": "safety_monitoring",
+                    "analysis_type": "general_safety",
+                    "result": f"General safety analysis for: {user_prompt}",
+                    "timestamp": datetime.now().isoformat()
+                }
         
-        Specialist agent responses:
-        {json.dumps(agent_responses, indent=2)}
+        elif agent_name == 'data_analytics':
+            counts = self._extract_counts(user_prompt)
+            if counts:
+                agent.record_counts(counts)
+            forecast_target = self._extract_forecast_target(user_prompt)
+            if forecast_target:
+                series_key, minutes_ahead = forecast_target
+                response = agent.forecast_occupancy(series_key, minutes_ahead)
+            elif 'historical' in user_prompt.lower() or 'pattern' in user_prompt.lower():
+                incident_data = self._extract_incident_data(user_prompt)
+                response = agent.analyze_historical_patterns(incident_data, context)
+            else:
+                current_metrics = {**self._extract_metrics_data(user_prompt), **counts}
+                response = agent.detect_anomalies(current_metrics, context)
         
-        Synthesize these responses into a coherent, actionable answer that:
-        1. Directly addresses the user's request
-        2. Highlights key insights from each agent
-        3. Identifies any conflicts or contradictions
-        4. Provides clear recommendations
-        5. Indicates confidence levels where appropriate
+        elif agent_name == 'alert_management':
+            if 'prioritize' in user_prompt.lower() or 'alerts' in user_prompt.lower():
+                alerts = self._extract_alerts_data(user_prompt)
+                response = agent.prioritize_alerts(alerts, context)
+            else:
+                # Correlated first: alerts joining a planned incident reuse its plan
+                incident_details = self._extract_incident_details(user_prompt)
+                response = agent.respond_to_alerts([incident_details], context)
         
-        Keep the response concise but comprehensive.
+        return response
+    
+    def forecast_occupancy(self, series_key: str, minutes_ahead: float = 30) -> Dict[str, Any]:
         """
-        
-        response = self.chat_session.send_message(synthesis_prompt)
-        return response.text
+        Answer "occupancy in N minutes" from the local forecaster without a model call
+        """
+        return self.specialist_agents['data_analytics'].forecast_occupancy(series_key, minutes_ahead)
     
-    async def process_request(self, user_prompt: str) -> Dict[str, Any]:
+    def record_counts(self, samples: Dict[str, float]) -> None:
         """
-        Main method to process user requests through the multi-agent system
+        Feed per-gate/per-zone counts (e.g. {"gate 1": 140}) to the local forecaster
         """
-        start_time = datetime.now()
-        
-        # Step 1: Analyze the request
-        analysis = self.analyze_request(user_prompt)
+        self.specialist_agents['data_analytics'].record_counts(
+            {self._series_key(key): float(value) for key, value in samples.items()})
+    
+    def synthesize_responses(self, user_prompt: str, agent_responses: Dict[str, Any], 
+                           analysis: Dict[str, Any]) -> str:
+        """
+        Synthesize responses from specialist agents into a coherent answer
+        """
+        with tracer.span("synthesize_responses", agents=list(agent_responses)) as span:
+            synthesis_prompt, prompt_stats = self.prompt_builder.build(user_prompt, agent_responses, analysis)
+            span.set_attribute("prompt_tokens_estimate", prompt_stats["prompt_tokens"])
+            
+            with self.scheduler.slot(analysis.get('priority'), agent="coordinator", preemptible=False):
+                response = tracked_call("coordinator", MODEL_NAME_PRO, self._model_call, synthesis_prompt)
+        return response.text
+    
+    async def process_request(self, user_prompt: str, deadline_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Main method to process user requests through the multi-agent system.
         
-        # Step 2: Route to specialist agents
-        agent_responses = await self.route_to_agents(
-            user_prompt, 
-            analysis['required_agents'],
-            analysis
-        )
+        Concurrent requests with the same normalized prompt (and so the same
+        keyword-routed agents) attach to the one already in flight and get
+        its result, marked "coalesced", unless that one runs under a later
+        deadline than theirs.
+        """
+        if deadline_s is None:
+            deadline_s = WEBHOOK_TIMEOUT_SECONDS - DEADLINE_SAFETY_MARGIN_SECONDS
+        with deadline_scope(deadline_s):
+            result, shared = await self.request_flight.do_async(normalize_key(user_prompt), self._process_request,
+                                                                user_prompt, deadline_s)
+        return {**result, "coalesced": True} if shared else result
+    
+    async def _process_request(self, user_prompt: str, deadline_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        One run of the pipeline, under a deadline (default: the webhook
+        timeout minus a safety margin; low-priority requests are also held
+        to the analysis' expected_response_time). Degrades instead of missing it: skip
+        synthesis, then return the specialist results that finished, then
+        a local fast-path answer. The level applied is reported under
+        "degradation".
+        """
+        start_time = time.perf_counter()
+        if deadline_s is None:
+            deadline_s = WEBHOOK_TIMEOUT_SECONDS - DEADLINE_SAFETY_MARGIN_SECONDS
+        degradation = "full"
+        agent_responses = {}
         
-        # Step 3: Synthesize responses
-        final_response = self.synthesize_responses(user_prompt, agent_responses, analysis)
+        with request_scope() as request_id, deadline_scope(deadline_s), \
+                tracer.span("process_request", request_id=request_id) as span:
+            # Step 1: Analyze the request; specialists start as soon as required_agents has streamed
+            request_context = contextvars.copy_context()
+            started = {}
+            
+            def dispatch_early(agents, priority):
+                for agent_name in agents:
+                    if agent_name in self.specialist_agents and agent_name not in started:
+                        started[agent_name] = self.submit_specialist(agent_name, user_prompt, priority, request_context)
+            
+            try:
+                analysis = await self._run_within_deadline(self.analyze_request, user_prompt, dispatch_early)
+                usage_tracker.record_stage_latency("analysis", time.perf_counter() - start_time)
+            except (asyncio.TimeoutError, DeadlineExpired):
+                analysis = validate_analysis(None, user_prompt)
+                degradation = "fast_path"
+            span.set_attribute("required_agents", analysis['required_agents'])
+            span.set_attribute("early_dispatch", list(started))
+            
+            if degradation != "fast_path":
+                # Only the outer deadline is hard; the analysis' own estimate just tightens low-priority
+                # work, and always leaves time for the specialists plus synthesis
+                budget = None
+                if analysis['priority'] == "low":
+                    budget = max(start_time + analysis['expected_response_time'] - time.perf_counter(),
+                                 LOW_PRIORITY_MIN_SPECIALIST_SECONDS + stage_estimate("synthesis"))
+                with deadline_scope(budget):
+                    # Step 2: Route to specialist agents
+                    agent_responses = await self.route_to_agents(
+                        user_prompt, 
+                        analysis['required_agents'],
+                        analysis,
+                        started=started
+                    )
+                    
+                    # Step 3: Synthesize responses, if the budget allows it
+                    finished = [r for r in agent_responses.values() if r.get("status") != "timed_out"]
+                    if not finished:
+                        degradation = "fast_path"
+                    elif len(finished) < len(agent_responses):
+                        degradation = "partial_specialists"
+                    elif has_budget_for("synthesis"):
+                        try:
+                            synthesis_start = time.perf_counter()
+                            final_response = await self._run_within_deadline(
+                                self.synthesize_responses, user_prompt, agent_responses, analysis)
+                            usage_tracker.record_stage_latency("synthesis", time.perf_counter() - synthesis_start)
+                        except (asyncio.TimeoutError, DeadlineExpired):
+                            degradation = "skip_synthesis"
+                    else:
+                        degradation = "skip_synthesis"
+            
+            if degradation == "fast_path":
+                final_response = fast_path_answer(user_prompt)
+            elif degradation != "full":
+                final_response = summarize_locally(agent_responses) or fast_path_answer(user_prompt)
+            span.set_attribute("degradation", degradation)
         
         # Step 4: Prepare comprehensive result
-        end_time = datetime.now()
-        processing_time = (end_time - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         result = {
+            "request_id": request_id,
             "user_request": user_prompt,
             "analysis": analysis,
             "agent_responses": agent_responses,
             "final_response": final_response,
+            "degradation": degradation,
             "processing_time": processing_time,
-            "timestamp": end_time.isoformat(),
-            "agents_used": list(agent_responses.keys())
+            "timestamp": datetime.now().isoformat(),
+            "agents_used": list(agent_responses.keys()),
+            "usage": usage_tracker.request_usage(request_id)
         }
         
+        usage_tracker.record_request_latency("coordinator", processing_time)
+        
         # Update conversation history
         self.conversation_history.append(result)
         
         return result
     
+    async def _run_within_deadline(self, func, *args):
+        """
+        Run a blocking step on a worker thread (with the request context)
+        and stop waiting for it when the deadline passes
+        """
+        return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout=remaining_time())
+    
     # Helper methods to extract structured data from natural language prompts
     def _extract_crowd_data(self, prompt: str) -> Dict[str, Any]:
         """Extract crowd-related data from user prompt"""
@@ -271,11 +481,39 @@ class CoordinatorAgent(Agent):
             "raw_prompt": prompt
         }
     
+    def _extract_forecast_target(self, prompt: str) -> Optional[tuple]:
+        """Find a known gate/zone series and horizon in forecast-style prompts"""
+        prompt_lower = prompt.lower()
+        if not any(word in prompt_lower for word in ('predict', 'forecast', 'expect', 'will be')):
+            return None
+        forecaster = self.specialist_agents['data_analytics'].forecaster
+        # Whole words only, longest first: "gate 1" must not answer for "gate 10"
+        matches = [key for key in forecaster.keys
+                   if re.search(r'(?<!\w)' + re.escape(key.lower()) + r'(?!\w)', prompt_lower)]
+        if not matches:
+            return None
+        series_key = max(matches, key=len)
+        minutes = re.search(r'(\d+)\s*(min|hour|hr)', prompt_lower)
+        minutes_ahead = 30.0
+        if minutes:
+            minutes_ahead = float(minutes.group(1)) * (60 if minutes.group(2) in ('hour', 'hr') else 1)
+        return series_key, minutes_ahead
+    
+    def _extract_counts(self, prompt: str) -> Dict[str, float]:
+        """Gate/zone counts stated in the prompt, e.g. "gate 3 has 140 people" -> {"gate 3": 140.0}"""
+        return {self._series_key(match.group(1)): float(match.group(2))
+                for match in COUNT_PATTERN.finditer(prompt.lower())}
+    
+    @staticmethod
+    def _series_key(name: str) -> str:
+        return ' '.join(name.lower().split())
+    
     def _extract_alerts_data(self, prompt: str) -> List[Dict[str, Any]]:
         """Extract alerts from user prompt"""
         return [
             {
-                "id": "sample_alert",
+                # Same description -> same alert id, so repeats are not re-prioritized
+                "id": f"alert_{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:10]}",
                 "type": "general",
                 "severity": "medium", 
                 "description": prompt,
@@ -285,9 +523,13 @@ class CoordinatorAgent(Agent):
     
     def _extract_incident_details(self, prompt: str) -> Dict[str, Any]:
         """Extract incident details from user prompt"""
+        prompt_lower = prompt.lower()
+        incident_type = next((name for name, keywords in INCIDENT_TYPE_KEYWORDS.items()
+                              if any(keyword in prompt_lower for keyword in keywords)), "general_incident")
+        location = next((zone for zone in ZONE_ADJACENCY if zone in prompt_lower), "unknown")
         return {
-            "type": "general_incident",
-            "location": "unknown",
+            "type": incident_type,
+            "location": location,
             "severity": "medium",
             "description": prompt,
             "timestamp": datetime.now().isoformat()
@@ -0,0 +1,41 @@
+# agents/deadline.py
+from typing import Dict, Any
+
+from config.agent_config import (AGENT_CONFIGS, STAGE_LATENCY_DEFAULTS, STAGE_LATENCY_MIN_SAMPLES, FAST_PATH_RESPONSES,
+                                 get_agent_for_query)
+from monitoring import usage_tracker, remaining_time
+from .prompt_builder import truncate_to_tokens
+from .scheduler import preclassify
+
+# From a full answer to the most degraded one; the response reports which applied
+DEGRADATION_LEVELS = ["full", "skip_synthesis", "partial_specialists", "fast_path"]
+
+
+def stage_estimate(stage: str) -> float:
+    """p95 latency of a pipeline stage, or the configured default until enough calls are measured"""
+    measured = usage_tracker.latency_quantile(f"stage/{stage}", 0.95, min_count=STAGE_LATENCY_MIN_SAMPLES)
+    return STAGE_LATENCY_DEFAULTS.get(stage, 5.0) if measured is None else measured
+
+
+def has_budget_for(stage: str) -> bool:
+    remaining = remaining_time()
+    return remaining is None or remaining > stage_estimate(stage)
+
+
+def fast_path_answer(user_prompt: str) -> str:
+    """Canned guidance for the request type, without any model call"""
+    if preclassify(user_prompt) == "critical":
+        return FAST_PATH_RESPONSES["critical"]
+    return FAST_PATH_RESPONSES[get_agent_for_query(user_prompt)]
+
+
+def summarize_locally(agent_responses: Dict[str, Any], max_tokens_per_agent: int = 150) -> str:
+    """
+    Final answer when synthesis is skipped: each finished specialist's
+    result, highest-priority agents first
+    """
+    finished = {name: response for name, response in agent_responses.items()
+                if isinstance(response, dict) and "result" in response and not response.get("status")}
+    order = sorted(finished, key=lambda name: getattr(AGENT_CONFIGS.get(name), 'priority_level', 5))
+    lines = [f"{name}: {truncate_to_tokens(str(finished[name]['result']), max_tokens_per_agent)}" for name in order]
+    return "\n\n".join(lines)
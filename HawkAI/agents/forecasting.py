@@ -0,0 +1,178 @@
+# agents/forecasting.py
+import threading
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+
+class CrowdForecaster:
+    """
+    Additive Holt-Winters forecaster for per-gate and per-zone counts.
+
+    All series share one set of state arrays, so a fit or an incremental
+    update is a handful of vector operations across every series at once
+    rather than a Python loop per series. Set `season_length` to 0 for
+    plain Holt (level + trend) smoothing. Fits, updates and forecasts
+    are serialized by a lock.
+    """
+
+    def __init__(self, interval_seconds: int = 300, season_length: int = 12,
+                 alpha: float = 0.4, beta: float = 0.05, gamma: float = 0.2):
+        self.interval_seconds = interval_seconds
+        self.season_length = season_length
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+
+        self.keys: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._level = np.zeros(0)
+        self._trend = np.zeros(0)
+        self._season = np.zeros((0, max(season_length, 1)))
+        self._steps = np.zeros(0, dtype=np.int64)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    # ---- Fitting ----
+    def fit(self, series: Dict[str, Sequence[float]]) -> None:
+        """Fit (or refit) many series at once; series of equal length are smoothed as one matrix"""
+        with self._lock:
+            by_length: Dict[int, List[str]] = {}
+            for key, values in series.items():
+                by_length.setdefault(len(values), []).append(key)
+
+            for length, keys in by_length.items():
+                if length == 0:
+                    continue
+                matrix = np.asarray([series[key] for key in keys], dtype=np.float64)
+                level, trend, season = self._smooth(matrix)
+                rows = self._rows_for(keys)
+                self._level[rows] = level
+                self._trend[rows] = trend
+                self._season[rows] = season
+                self._steps[rows] = length
+
+    def update(self, samples: Dict[str, float]) -> None:
+        """Fold one new sample per series into the state without refitting"""
+        with self._lock:
+            if not samples:
+                return
+            rows = self._rows_for(list(samples.keys()))
+            y = np.asarray(list(samples.values()), dtype=np.float64)
+
+            fresh = self._steps[rows] == 0
+            if fresh.any():
+                self._level[rows[fresh]] = y[fresh]
+
+            old = ~fresh
+            if old.any():
+                r, obs = rows[old], y[old]
+                slot = self._steps[r] % self._season.shape[1]
+                seasonal = self._season[r, slot] if self.season_length else 0.0
+                prev_level = self._level[r]
+                level = self.alpha * (obs - seasonal) + (1 - self.alpha) * (prev_level + self._trend[r])
+                self._trend[r] = self.beta * (level - prev_level) + (1 - self.beta) * self._trend[r]
+                self._level[r] = level
+                if self.season_length:
+                    self._season[r, slot] = self.gamma * (obs - level) + (1 - self.gamma) * seasonal
+            self._steps[rows] += 1
+
+    # ---- Forecasting ----
+    def forecast(self, key: str, minutes_ahead: float) -> Optional[float]:
+        """Point forecast for one series `minutes_ahead` from its latest sample"""
+        with self._lock:
+            row = self._index.get(key)
+            if row is None or self._steps[row] == 0:
+                return None
+            return float(self._forecast_rows(np.array([row]), self._horizon(minutes_ahead))[0])
+
+    def forecast_all(self, minutes_ahead: float) -> Dict[str, float]:
+        """Point forecasts for every fitted series"""
+        with self._lock:
+            rows = np.nonzero(self._steps > 0)[0]
+            values = self._forecast_rows(rows, self._horizon(minutes_ahead))
+            return {self.keys[r]: float(v) for r, v in zip(rows, values)}
+
+    def backtest(self, series: Dict[str, Sequence[float]], horizon: int) -> Dict[str, Any]:
+        """Hold out the last `horizon` samples of each series and score the forecasts"""
+        keys = [k for k, v in series.items() if len(v) > horizon + max(self.season_length, 1) * 2]
+        if not keys:
+            return {"series": 0}
+        length = min(len(series[k]) for k in keys)
+        matrix = np.asarray([series[k][-length:] for k in keys], dtype=np.float64)
+        train, actual = matrix[:, :-horizon], matrix[:, -horizon:]
+
+        level, trend, season = self._smooth(train)
+        steps = np.arange(1, horizon + 1)
+        predicted = level[:, None] + trend[:, None] * steps
+        if self.season_length:
+            slots = (train.shape[1] + steps - 1) % self.season_length
+            predicted += season[:, slots]
+        predicted = np.maximum(predicted, 0.0)
+        naive = np.repeat(train[:, -1:], horizon, axis=1)
+
+        errors = np.abs(predicted - actual)
+        denominator = np.maximum(np.abs(actual), 1.0)
+        return {
+            "series": len(keys),
+            "horizon": horizon,
+            "mae": float(errors.mean()),
+            "mape": float((errors / denominator).mean()),
+            "naive_mape": float((np.abs(naive - actual) / denominator).mean())
+        }
+
+    # ---- Internals ----
+    def _horizon(self, minutes_ahead: float) -> int:
+        return max(1, int(round(minutes_ahead * 60 / self.interval_seconds)))
+
+    def _forecast_rows(self, rows: np.ndarray, h: int) -> np.ndarray:
+        values = self._level[rows] + h * self._trend[rows]
+        if self.season_length:
+            slots = (self._steps[rows] + h - 1) % self.season_length
+            values = values + self._season[rows, slots]
+        return np.maximum(values, 0.0)
+
+    def _smooth(self, matrix: np.ndarray):
+        """Run the smoothing recursions over a (series x time) matrix"""
+        n, length = matrix.shape
+        m = self.season_length
+        if m and length >= 2 * m:
+            first, second = matrix[:, :m].mean(axis=1), matrix[:, m:2 * m].mean(axis=1)
+            level = first.copy()
+            trend = (second - first) / m
+            season = matrix[:, :m] - first[:, None]
+            start = m
+        else:
+            level = matrix[:, 0].copy()
+            trend = matrix[:, 1] - matrix[:, 0] if length > 1 else np.zeros(n)
+            season = np.zeros((n, max(m, 1)))
+            start = 1
+
+        for t in range(start, length):
+            obs = matrix[:, t]
+            slot = t % m if m else 0
+            seasonal = season[:, slot] if m else 0.0
+            prev_level = level
+            level = self.alpha * (obs - seasonal) + (1 - self.alpha) * (prev_level + trend)
+            trend = self.beta * (level - prev_level) + (1 - self.beta) * trend
+            if m:
+                season[:, slot] = self.gamma * (obs - level) + (1 - self.gamma) * seasonal
+        return level, trend, season
+
+    def _rows_for(self, keys: List[str]) -> np.ndarray:
+        new = [k for k in dict.fromkeys(keys) if k not in self._index]
+        if new:
+            for key in new:
+                self._index[key] = len(self.keys)
+                self.keys.append(key)
+            grow = len(new)
+            self._level = np.concatenate([self._level, np.zeros(grow)])
+            self._trend = np.concatenate([self._trend, np.zeros(grow)])
+            self._season = np.concatenate([self._season, np.zeros((grow, self._season.shape[1]))])
+            self._steps = np.concatenate([self._steps, np.zeros(grow, dtype=np.int64)])
+        return np.array([self._index[k] for k in keys], dtype=np.int64)
@@ -0,0 +1,428 @@
+# agents/incident_store.py
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Iterable
+
+import numpy as np
+
+SEVERITY_LEVELS = ["low", "medium", "high", "critical"]
+
+FILE_MAGIC = b"HWKINC01"
+# Version 2 stores the UTC hour; version 1 files (local hour) are read with hours recomputed
+FILE_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+_ALIGNMENT = 8
+# Appended segments a file may hold before `flush` compacts it with a full save
+MAX_SEGMENTS = 32
+# Per-minute counts kept for rolling windows, back from the newest incident
+ROLLING_MINUTES = 1440
+
+# Column name -> dtype. Hour of day (UTC) is derived at append time so that
+# the type x hour aggregate can be rebuilt from the file without timezone guesses.
+COLUMNS = {
+    "timestamp": np.float64,
+    "type": np.uint16,
+    "zone": np.uint16,
+    "severity": np.uint8,
+    "hour": np.uint8,
+    "response_time": np.float32,
+}
+
+
+class IncidentStore:
+    """
+    Append-only columnar store of incidents with incrementally maintained
+    group-by aggregates (type x hour, zone x type, severity, response time
+    and per-minute counts over the last ROLLING_MINUTES).
+
+    Columns live in growable NumPy arrays; `save` writes them to a compact
+    binary file which `load` memory-maps instead of parsing. `flush` appends
+    only the rows added since, as a further segment of the same layout.
+    Incidents that cannot be parsed, or that would overflow the type/zone
+    codes, are skipped and counted in `rejected`.
+    Ingestion, aggregates and persistence are serialized by a lock.
+    """
+
+    def __init__(self, path: Optional[str] = None, initial_capacity: int = 1024):
+        self.path = path
+        self._size = 0
+        self._columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._mapped = False
+        self._saved_rows = 0
+        self._segments = 0
+        self._file_bytes = 0
+        self.rejected = 0
+        self.persist_error: Optional[str] = None
+        self._lock = threading.RLock()
+
+        self.types: List[str] = []
+        self.zones: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self._zone_index: Dict[str, int] = {}
+
+        self._type_hour = np.zeros((0, 24), dtype=np.int64)
+        self._zone_type = np.zeros((0, 0), dtype=np.int64)
+        self._type_severity = np.zeros((0, len(SEVERITY_LEVELS)), dtype=np.int64)
+        self._response_sum = np.zeros(0, dtype=np.float64)
+        self._response_count = np.zeros(0, dtype=np.int64)
+        # Ring of per-minute type counts; slot m % ROLLING_MINUTES holds minute _slot_minute[slot]
+        self._minute_counts = np.zeros((ROLLING_MINUTES, 0), dtype=np.int64)
+        self._slot_minute = np.full(ROLLING_MINUTES, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ---- Ingestion ----
+    def append(self, incident: Dict[str, Any]) -> None:
+        """Append one incident dict (type, timestamp, zone/location, severity, response_time)"""
+        with self._lock:
+            # Parse everything before touching the columns, so a bad row leaves no trace
+            timestamp = _to_epoch(incident.get('timestamp'))
+            hour = datetime.fromtimestamp(timestamp, timezone.utc).hour
+            severity = _severity_code(incident.get('severity'))
+            response_time = incident.get('response_time')
+            response_time = float(response_time) if response_time is not None else np.nan
+            type_code = self._code(self.types, self._type_index, str(incident.get('type', 'unknown')))
+            zone_code = self._code(self.zones, self._zone_index,
+                                   str(incident.get('zone', incident.get('location', 'unknown'))))
+
+            self._reserve(self._size + 1)
+            row = self._size
+            self._columns['timestamp'][row] = timestamp
+            self._columns['type'][row] = type_code
+            self._columns['zone'][row] = zone_code
+            self._columns['severity'][row] = severity
+            self._columns['hour'][row] = hour
+            self._columns['response_time'][row] = response_time
+            self._size += 1
+
+            self._type_hour[type_code, hour] += 1
+            self._zone_type[zone_code, type_code] += 1
+            self._type_severity[type_code, severity] += 1
+            if not np.isnan(response_time):
+                self._response_sum[type_code] += response_time
+                self._response_count[type_code] += 1
+            self._count_minute(int(timestamp // 60), type_code)
+
+    def extend(self, incidents: Iterable[Dict[str, Any]]) -> int:
+        """Append each parseable incident; malformed ones (e.g. bad timestamps) are skipped and counted"""
+        with self._lock:
+            added = 0
+            for incident in incidents:
+                try:
+                    self.append(incident)
+                except (ValueError, TypeError, OverflowError, OSError):
+                    self.rejected += 1
+                    continue
+                added += 1
+            return added
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a column (no copy)"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    # ---- Aggregates ----
+    def rolling_counts(self, window_minutes: int, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Incident counts per type over the trailing window ending at `now`
+        (default: latest incident). Only the last ROLLING_MINUTES before the
+        newest incident are kept, so longer windows are cut to that.
+        """
+        with self._lock:
+            if now is None:
+                now = float(self._slot_minute.max() * 60) if self._size else datetime.now().timestamp()
+            end_minute = int(now // 60)
+            minutes = np.arange(end_minute - min(window_minutes, ROLLING_MINUTES) + 1, end_minute + 1)
+            slots = minutes % ROLLING_MINUTES
+            counts = self._minute_counts[slots[self._slot_minute[slots] == minutes]].sum(axis=0)
+            return {self.types[i]: int(c) for i, c in enumerate(counts) if c}
+
+    def summary(self, top_n: int = 5, rolling_windows: Iterable[int] = (15, 60, 1440)) -> Dict[str, Any]:
+        """Precomputed summary tables small enough to hand to the model instead of raw records"""
+        with self._lock:
+            if not self._size:
+                return {"total_incidents": 0}
+
+            type_totals = self._type_hour.sum(axis=1)
+            zone_totals = self._zone_type.sum(axis=1)
+            top_types = np.argsort(-type_totals)[:top_n]
+            top_zones = np.argsort(-zone_totals)[:top_n]
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_response = self._response_sum / self._response_count
+
+            timestamps = self._columns['timestamp'][:self._size]
+            return {
+                "total_incidents": self._size,
+                "time_range": [
+                    datetime.fromtimestamp(float(timestamps.min()), timezone.utc).isoformat(),
+                    datetime.fromtimestamp(float(timestamps.max()), timezone.utc).isoformat()
+                ],
+                "type_frequencies": {self.types[t]: int(type_totals[t]) for t in top_types},
+                "peak_hours_by_type": {
+                    self.types[t]: [int(h) for h in np.argsort(-self._type_hour[t])[:3] if self._type_hour[t, h]]
+                    for t in top_types
+                },
+                "zone_hotspots": {
+                    self.zones[z]: {self.types[t]: int(self._zone_type[z, t]) for t in np.nonzero(self._zone_type[z])[0]}
+                    for z in top_zones
+                },
+                "severity_by_type": {
+                    self.types[t]: dict(zip(SEVERITY_LEVELS, self._type_severity[t].tolist())) for t in top_types
+                },
+                "mean_response_time_s": {
+                    self.types[t]: round(float(mean_response[t]), 1) for t in top_types if self._response_count[t]
+                },
+                "rolling_counts": {f"{w}m": self.rolling_counts(w) for w in rolling_windows}
+            }
+
+    # ---- Persistence ----
+    def save(self, path: Optional[str] = None) -> str:
+        """Write all rows as a single segment (atomic replace); also compacts appended segments"""
+        with self._lock:
+            path = path or self.path
+            if not path:
+                raise ValueError("No path given for incident store")
+
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                self._write_segment(f, 0, self._size)
+            os.replace(tmp_path, path)
+            self.path = path
+            self._saved_rows = self._size
+            self._segments = 1
+            self._file_bytes = os.path.getsize(path)
+            return path
+
+    def flush(self) -> str:
+        """
+        Persist rows added since the last save/flush by appending one segment,
+        so the cost follows the new rows rather than the store. A file with
+        MAX_SEGMENTS segments (or none yet) gets a full `save` instead.
+        """
+        with self._lock:
+            if not self.path:
+                raise ValueError("No path given for incident store")
+            if self._size == self._saved_rows and os.path.exists(self.path):
+                return self.path
+            if not self._segments or self._segments >= MAX_SEGMENTS or not os.path.exists(self.path):
+                return self.save()
+            with open(self.path, 'r+b') as f:
+                # Write over anything past the last good segment (a torn append)
+                f.seek(self._file_bytes)
+                f.truncate()
+                self._write_segment(f, self._saved_rows, self._size)
+                self._file_bytes = f.tell()
+            self._saved_rows = self._size
+            self._segments += 1
+            return self.path
+
+    def _write_segment(self, f, start: int, end: int) -> None:
+        # A segment is self-describing: magic, header (with the full type/zone
+        # tables so far) and the aligned columns of rows [start, end)
+        rows = end - start
+        layout = []
+        offset = 0
+        for name, dtype in COLUMNS.items():
+            layout.append({"name": name, "dtype": np.dtype(dtype).str, "offset": offset})
+            offset += _aligned(rows * np.dtype(dtype).itemsize)
+
+        header = json.dumps({
+            "version": FILE_VERSION,
+            "rows": rows,
+            "types": self.types,
+            "zones": self.zones,
+            "columns": layout
+        }, separators=(',', ':')).encode('utf-8')
+        data_start = _aligned(len(FILE_MAGIC) + 4 + len(header))
+
+        f.write(FILE_MAGIC)
+        f.write(len(header).to_bytes(4, 'little'))
+        f.write(header)
+        f.write(b'\0' * (data_start - len(FILE_MAGIC) - 4 - len(header)))
+        for entry in layout:
+            data = self._columns[entry['name']][start:end].tobytes()
+            f.write(data)
+            f.write(b'\0' * (_aligned(len(data)) - len(data)))
+
+    @classmethod
+    def load(cls, path: str) -> "IncidentStore":
+        """
+        Memory-map a store written by `save` and rebuild aggregates with
+        vectorized counts. Appended segments are concatenated into memory; a
+        segment torn by a crash mid-append is ignored.
+        """
+        file_size = os.path.getsize(path)
+        segments = []
+        position = 0
+        with open(path, 'rb') as f:
+            while position < file_size:
+                f.seek(position)
+                magic = f.read(len(FILE_MAGIC))
+                if magic != FILE_MAGIC:
+                    if position == 0:
+                        raise ValueError(f"Not an incident store file: {path}")
+                    break
+                header_len = int.from_bytes(f.read(4), 'little')
+                try:
+                    header = json.loads(f.read(header_len).decode('utf-8'))
+                except ValueError:
+                    break
+                if header['version'] not in SUPPORTED_VERSIONS:
+                    raise ValueError(f"Unsupported incident store version: {header['version']}")
+                data_start = position + _aligned(len(FILE_MAGIC) + 4 + header_len)
+                end = data_start + sum(_aligned(header['rows'] * np.dtype(entry['dtype']).itemsize)
+                                       for entry in header['columns'])
+                if end > file_size:
+                    break
+                segments.append((data_start, header))
+                position = end
+        if not segments:
+            raise ValueError(f"Not an incident store file: {path}")
+
+        store = cls(path=path, initial_capacity=0)
+        for name, dtype in COLUMNS.items():
+            parts = []
+            for data_start, header in segments:
+                entry = next(entry for entry in header['columns'] if entry['name'] == name)
+                if header['rows']:
+                    parts.append(np.memmap(path, dtype=np.dtype(entry['dtype']), mode='r',
+                                           offset=data_start + entry['offset'], shape=(header['rows'],)))
+            store._columns[name] = (parts[0] if len(parts) == 1 else
+                                    np.concatenate(parts) if parts else np.zeros(0, dtype=dtype))
+        rows = sum(header['rows'] for _, header in segments)
+        store._size = rows
+        store._saved_rows = rows
+        store._segments = len(segments)
+        store._file_bytes = position
+        store._mapped = isinstance(store._columns['timestamp'], np.memmap)
+        if any(header['version'] < 2 for _, header in segments):
+            # Local hours from a version 1 file; the UTC hour follows from the timestamp
+            store._columns['hour'] = (store._columns['timestamp'] // 3600 % 24).astype(COLUMNS['hour'])
+        # The last segment carries the complete type/zone tables
+        last = segments[-1][1]
+        for name in last['types']:
+            store._code(store.types, store._type_index, name)
+        for name in last['zones']:
+            store._code(store.zones, store._zone_index, name)
+        store._rebuild_aggregates()
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> "IncidentStore":
+        """
+        Load the store at `path`, or start an empty one there. A file that
+        cannot be read leaves a memory-only store with the reason in
+        `persist_error`, rather than failing the caller.
+        """
+        if not os.path.exists(path):
+            return cls(path=path)
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, KeyError) as error:
+            store = cls()
+            store.persist_error = f"Could not load {path}: {error}"
+            return store
+
+    # ---- Internals ----
+    def _code(self, names: List[str], index: Dict[str, int], name: str) -> int:
+        code = index.get(name)
+        if code is None:
+            code = len(names)
+            if code > np.iinfo(np.uint16).max:
+                raise OverflowError(f"All {code} codes are in use; cannot add '{name}'")
+            names.append(name)
+            index[name] = code
+            self._resize_aggregates()
+        return code
+
+    def _resize_aggregates(self):
+        n_types, n_zones = len(self.types), len(self.zones)
+        self._type_hour = _pad(self._type_hour, (n_types, 24))
+        self._zone_type = _pad(self._zone_type, (n_zones, n_types))
+        self._type_severity = _pad(self._type_severity, (n_types, len(SEVERITY_LEVELS)))
+        self._response_sum = _pad(self._response_sum, (n_types,))
+        self._response_count = _pad(self._response_count, (n_types,))
+        self._minute_counts = _pad(self._minute_counts, (ROLLING_MINUTES, n_types))
+
+    def _rebuild_aggregates(self):
+        n_types, n_zones = len(self.types), len(self.zones)
+        types = self._columns['type'][:self._size].astype(np.int64)
+        zones = self._columns['zone'][:self._size].astype(np.int64)
+        severity = self._columns['severity'][:self._size].astype(np.int64)
+        hours = self._columns['hour'][:self._size].astype(np.int64)
+        response = self._columns['response_time'][:self._size].astype(np.float64)
+        minutes = (self._columns['timestamp'][:self._size] // 60).astype(np.int64)
+
+        self._type_hour = np.bincount(types * 24 + hours, minlength=n_types * 24).reshape(n_types, 24)
+        self._zone_type = np.bincount(zones * n_types + types, minlength=n_zones * n_types).reshape(n_zones, n_types)
+        self._type_severity = np.bincount(types * len(SEVERITY_LEVELS) + severity,
+                                          minlength=n_types * len(SEVERITY_LEVELS)).reshape(n_types, len(SEVERITY_LEVELS))
+        known = ~np.isnan(response)
+        self._response_sum = np.bincount(types[known], weights=response[known], minlength=n_types)
+        self._response_count = np.bincount(types[known], minlength=n_types)
+
+        self._minute_counts = np.zeros((ROLLING_MINUTES, n_types), dtype=np.int64)
+        self._slot_minute = np.full(ROLLING_MINUTES, -1, dtype=np.int64)
+        if self._size:
+            recent = minutes > minutes.max() - ROLLING_MINUTES
+            slots = minutes[recent] % ROLLING_MINUTES
+            np.add.at(self._minute_counts, (slots, types[recent]), 1)
+            self._slot_minute[slots] = minutes[recent]
+
+    def _count_minute(self, minute: int, type_code: int):
+        slot = minute % ROLLING_MINUTES
+        if self._slot_minute[slot] != minute:
+            if minute < self._slot_minute[slot]:
+                return  # older than the ring covers
+            self._minute_counts[slot] = 0
+            self._slot_minute[slot] = minute
+        self._minute_counts[slot, type_code] += 1
+
+    def _reserve(self, capacity: int):
+        current = len(self._columns['timestamp'])
+        if capacity <= current and not self._mapped:
+            return
+        new_capacity = max(capacity, current * 2, 1024)
+        for name, dtype in COLUMNS.items():
+            grown = np.zeros(new_capacity, dtype=dtype)
+            grown[:self._size] = self._columns[name][:self._size]
+            self._columns[name] = grown
+        # Appends after a load copy the mapped columns into memory once
+        self._mapped = False
+
+
+def _pad(array: np.ndarray, shape) -> np.ndarray:
+    if array.shape == tuple(shape):
+        return array
+    padded = np.zeros(shape, dtype=array.dtype)
+    padded[tuple(slice(0, n) for n in array.shape)] = array
+    return padded
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _to_epoch(timestamp: Any) -> float:
+    """Epoch seconds; raises ValueError/TypeError for timestamps that cannot be parsed"""
+    if timestamp is None:
+        return datetime.now().timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return datetime.fromisoformat(str(timestamp)).timestamp()
+
+
+def _severity_code(severity: Any) -> int:
+    if isinstance(severity, int):
+        return min(max(severity, 0), len(SEVERITY_LEVELS) - 1)
+    severity = str(severity or 'medium').lower()
+    return SEVERITY_LEVELS.index(severity) if severity in SEVERITY_LEVELS else 1
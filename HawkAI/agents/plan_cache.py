@@ -0,0 +1,141 @@
+# agents/plan_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from config.agent_config import (
+    ZONE_CLASSES, UNUSUAL_INCIDENT_KEYWORDS, PLAN_CACHE_TTL_SECONDS, PLAN_CACHE_MAX_ENTRIES
+)
+
+# Fields every routine incident carries; anything else makes it unusual
+STANDARD_INCIDENT_FIELDS = {
+    "id", "type", "location", "zone", "severity", "description", "timestamp", "alert_count"
+}
+
+# Placeholders the model writes into cacheable plans, filled per incident
+PLAN_PLACEHOLDERS = {
+    "[LOCATION]": lambda incident: str(incident.get('location', incident.get('zone', 'the affected area'))),
+    "[INCIDENT_ID]": lambda incident: str(incident.get('id', 'this incident')),
+    "[REPORTED_AT]": lambda incident: str(incident.get('timestamp', 'now')),
+    "[ALERT_COUNT]": lambda incident: str(incident.get('alert_count', 1))
+}
+
+# Incident types too vague to share a plan; these are always planned fresh
+GENERIC_INCIDENT_TYPES = {"", "general", "general incident", "incident", "unknown", "other"}
+
+Signature = Tuple[str, str, str]
+
+
+def incident_signature(incident: Dict[str, Any]) -> Optional[Signature]:
+    """
+    Canonical (type, severity band, zone class) key for a routine incident,
+    or None when the incident has an unusual attribute, a generic type or no
+    known zone, and needs a fresh plan
+    """
+    if set(incident) - STANDARD_INCIDENT_FIELDS:
+        return None
+    description = str(incident.get('description', '')).lower()
+    if any(keyword in description for keyword in UNUSUAL_INCIDENT_KEYWORDS):
+        return None
+
+    incident_type = " ".join(str(incident.get('type', 'general')).lower().replace("_", " ").split())
+    if incident_type in GENERIC_INCIDENT_TYPES:
+        return None
+    location = str(incident.get('location', incident.get('zone', ''))).lower()
+    zone_class = next((cls for name, cls in ZONE_CLASSES.items() if name in location), None)
+    if zone_class is None:
+        return None
+    severity = str(incident.get('severity', 'medium')).lower()
+    severity_band = "urgent" if severity in ("high", "critical") else "routine"
+    return incident_type, severity_band, zone_class
+
+
+def fill_plan(template: str, incident: Dict[str, Any]) -> str:
+    """Substitute incident-specific fields into a cached plan template"""
+    for placeholder, value in PLAN_PLACEHOLDERS.items():
+        if placeholder in template:
+            template = template.replace(placeholder, value(incident))
+    return template
+
+
+class ResponsePlanCache:
+    """
+    LRU cache of response-plan templates keyed by incident signature, with a
+    TTL per entry and counters for hits, misses and generation latency saved.
+    Safe to share between threads.
+    """
+
+    def __init__(self, ttl_seconds: float = PLAN_CACHE_TTL_SECONDS, max_entries: int = PLAN_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Signature, Tuple[str, float, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.latency_saved = 0.0
+        self._generation_time = 0.0
+        self._generations = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, signature: Signature) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                self.misses += 1
+                return None
+            template, created_at, generation_latency = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self._entries[signature]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(signature)
+            self.hits += 1
+            self.latency_saved += generation_latency
+            return template
+
+    def put(self, signature: Signature, template: str, generation_latency: float) -> None:
+        with self._lock:
+            self.record_generation(generation_latency)
+            self._entries[signature] = (template, time.monotonic(), generation_latency)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_bypass(self, generation_latency: float) -> None:
+        """An unusual incident that was generated fresh without consulting the cache"""
+        with self._lock:
+            self.bypasses += 1
+            self.record_generation(generation_latency)
+
+    def record_generation(self, generation_latency: float) -> None:
+        with self._lock:
+            self._generation_time += generation_latency
+            self._generations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "avg_generation_latency_s": round(self._generation_time / self._generations, 3) if self._generations else 0.0,
+                "latency_saved_s": round(self.latency_saved, 3)
+            }
@@ -0,0 +1,127 @@
+# agents/prompt_builder.py
+import json
+import re
+from typing import Dict, Any, List, Tuple
+
+from config.agent_config import AGENT_CONFIGS, SYNTHESIS_TOKEN_BUDGET
+
+# Fields that duplicate the user request or add nothing to a synthesis
+REDUNDANT_FIELDS = {"raw_prompt", "timestamp", "reasoning", "coalesced"}
+
+SYNTHESIS_INSTRUCTIONS = """Synthesize these responses into a coherent, actionable answer that:
+1. Directly addresses the user's request
+2. Highlights key insights from each agent
+3. Identifies any conflicts or contradictions
+4. Provides clear recommendations
+5. Indicates confidence levels where appropriate
+
+Keep the response concise but comprehensive."""
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_TRUNCATION_MARK = " …[truncated]"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate: one token per word or punctuation mark, plus one
+    per extra 6 characters of long words (subword splits). Approximate, but
+    needs no tokenizer call and is good enough for budgeting.
+    """
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        count += 1 + (len(piece) - 1) // 6
+    return count
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def strip_fields(value: Any, fields=REDUNDANT_FIELDS) -> Any:
+    """Recursively drop redundant keys from nested dicts/lists"""
+    if isinstance(value, dict):
+        return {k: strip_fields(v, fields) for k, v in value.items() if k not in fields}
+    if isinstance(value, list):
+        return [strip_fields(v, fields) for v in value]
+    return value
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly `max_tokens`, preferring a line or sentence boundary"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_tokens -= estimate_tokens(_TRUNCATION_MARK)
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + _TRUNCATION_MARK
+
+
+class SynthesisPromptBuilder:
+    """
+    Builds the coordinator's synthesis prompt within a token budget.
+
+    Analysis and specialist responses are serialized compactly with
+    redundant fields removed. If the specialist outputs still exceed the
+    budget, their `result` text is truncated, giving agents with a higher
+    AgentConfig.priority_level first claim on the remaining tokens.
+    """
+
+    def __init__(self, token_budget: int = SYNTHESIS_TOKEN_BUDGET, min_tokens_per_agent: int = 80):
+        self.token_budget = token_budget
+        self.min_tokens_per_agent = min_tokens_per_agent
+        self.last_stats: Dict[str, Any] = {}
+
+    def build(self, user_prompt: str, agent_responses: Dict[str, Any],
+              analysis: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        header = (f'Original user request: "{user_prompt}"\n'
+                  f'Request analysis: {compact_json(strip_fields(analysis))}\n'
+                  f'Specialist agent responses:\n')
+        footer = f"\n{SYNTHESIS_INSTRUCTIONS}"
+        fixed_tokens = estimate_tokens(header) + estimate_tokens(footer)
+
+        responses = {name: strip_fields(response) for name, response in agent_responses.items()}
+        allowances = self._allocate(responses, self.token_budget - fixed_tokens)
+
+        lines = []
+        truncated: List[str] = []
+        for name, response in responses.items():
+            allowance = allowances.get(name)
+            if allowance is not None and isinstance(response, dict) and isinstance(response.get('result'), str):
+                overhead = estimate_tokens(compact_json(dict(response, result="")))
+                result = truncate_to_tokens(response['result'], max(allowance - overhead, 0))
+                if result != response['result']:
+                    truncated.append(name)
+                response = dict(response, result=result)
+            lines.append(f"{name}: {compact_json(response)}")
+
+        prompt = header + "\n".join(lines) + footer
+        self.last_stats = {
+            "token_budget": self.token_budget,
+            "prompt_tokens": estimate_tokens(prompt),
+            "truncated_agents": truncated
+        }
+        return prompt, self.last_stats
+
+    def _allocate(self, responses: Dict[str, Any], available: int) -> Dict[str, int]:
+        """Per-agent token allowance; empty when everything fits"""
+        needs = {name: estimate_tokens(f"{name}: {compact_json(response)}") for name, response in responses.items()}
+        if sum(needs.values()) <= available:
+            return {}
+
+        order = sorted(needs, key=lambda name: getattr(AGENT_CONFIGS.get(name), 'priority_level', 5))
+        allowances = {}
+        remaining = max(available, self.min_tokens_per_agent * len(order))
+        for i, name in enumerate(order):
+            reserve = self.min_tokens_per_agent * (len(order) - i - 1)
+            allowances[name] = max(min(needs[name], remaining - reserve), self.min_tokens_per_agent)
+            remaining -= allowances[name]
+        return allowances
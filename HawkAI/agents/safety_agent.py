@@ -1,21 +1,23 @@
 # agents/safety_agent.py
-import vertexai
-from vertexai.generative_models import GenerativeModel
 from google.adk.agents import Agent
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from config.constants import MODEL_NAME_FLASH_2
+from models import init_backend, create_model, ResponseCache
+from .specialist_context import SpecialistContext, start_session, generate
 
 class SafetyMonitoringAgent(Agent):
     """Agent specialized in event safety monitoring and risk assessment"""
     
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, response_cache: Optional[ResponseCache] = None):
         super().__init__(
             name="SafetyMonitoring-Agent",
             description="Specialized agent for event safety monitoring, crowd analysis, and risk assessment",
             instructions="You analyze safety conditions, assess risks, and provide safety recommendations for events."
         )
-        vertexai.init(project=project_id, location=location)
+        init_backend(project_id, location)
         
-        self.model = GenerativeModel(
+        self.model = create_model(
             model_name=MODEL_NAME_FLASH_2,  # Using flash for faster responses
             system_instruction="""
             You are a Safety Monitoring Agent specialized in:
@@ -26,11 +28,14 @@ class SafetyMonitoringAgent(Agent):
             - Incident risk prediction
             
             Always provide structured responses with risk levels (LOW/MEDIUM/HIGH/CRITICAL).
-            """
+            """,
+            cache=response_cache
         )
-        self.chat_session = self.model.start_chat()
+        # Stateless calls unless STATEFUL_CHAT_SESSIONS is set
+        self.chat_session = start_session(self.model)
     
-    def analyze_crowd_density(self, crowd_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_crowd_density(self, crowd_data: Dict[str, Any],
+                              context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
         """Analyze crowd density and safety implications"""
         prompt = f"""
         Analyze crowd safety based on this data:
@@ -42,7 +47,7 @@ class SafetyMonitoringAgent(Agent):
         Provide JSON response with: risk_level, recommendations, monitoring_priority
         """
         
-        response = self.chat_session.send_message(prompt)
+        response = generate("safety_monitoring", MODEL_NAME_FLASH_2, self.model, prompt, context, self.chat_session)
         return {
             "agent": "safety_monitoring",
             "analysis_type": "crowd_density",
@@ -50,7 +55,8 @@ class SafetyMonitoringAgent(Agent):
             "timestamp": crowd_data.get('timestamp')
         }
     
-    def assess_weather_risk(self, weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    def assess_weather_risk(self, weather_data: Dict[str, Any],
+                            context: Optional[SpecialistContext] = None) -> Dict[str, Any]:
         """Assess weather-related safety risks"""
         prompt = f"""
         Evaluate weather safety risks for outdoor event:
@@ -63,7 +69,7 @@ class SafetyMonitoringAgent(Agent):
         Provide JSON response with risk_level and specific precautions.
         """
         
-        response = self.chat_session.send_message(prompt)
+        response = generate("safety_monitoring", MODEL_NAME_FLASH_2, self.model, prompt, context, self.chat_session)
         return {
             "agent": "safety_monitoring",
             "analysis_type": "weather_risk",
@@ -0,0 +1,169 @@
+# agents/scheduler.py
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from config.agent_config import (AGENT_CONFIGS, SCHEDULER_MAX_CONCURRENCY, SCHEDULER_RESERVED_CRITICAL,
+                                 PRIORITY_WEIGHTS, PREEMPTIBLE_PRIORITIES, CRITICAL_REQUEST_KEYWORDS)
+from monitoring import cancellation_scope
+
+PRIORITY_CLASSES = ["critical", "high", "medium", "low"]
+
+
+def priority_class(priority: Optional[str]) -> str:
+    return priority if priority in PRIORITY_CLASSES else "medium"
+
+
+def preclassify(user_prompt: str) -> str:
+    """Priority to use before the model analysis is available"""
+    prompt_lower = user_prompt.lower()
+    return "critical" if any(keyword in prompt_lower for keyword in CRITICAL_REQUEST_KEYWORDS) else "medium"
+
+
+class Ticket:
+    """One model-backed step waiting for or holding a scheduler slot"""
+
+    __slots__ = ("priority", "agent", "preemptible", "agent_level", "seq", "enqueued_at", "started_at", "cancelled")
+
+    def __init__(self, priority: str, agent: Optional[str], preemptible: bool, seq: int):
+        self.priority = priority
+        self.agent = agent
+        self.preemptible = preemptible
+        # AgentConfig.priority_level breaks ties within a class; the coordinator goes first
+        self.agent_level = getattr(AGENT_CONFIGS.get(agent), 'priority_level', 0)
+        self.seq = seq
+        self.enqueued_at = time.perf_counter()
+        self.started_at = None
+        self.cancelled = threading.Event()
+
+    def order(self) -> tuple:
+        return self.agent_level, self.seq
+
+
+class PriorityScheduler:
+    """
+    Admission control for model-backed steps (analysis, specialist calls,
+    synthesis), shared by all requests in the process.
+
+    - Critical work always goes first and can use every slot; the other
+      classes together never hold more than
+      `max_concurrency - reserved_critical` slots, so critical requests
+      always find capacity.
+    - Among non-critical classes, slots are shared by weight (stride
+      scheduling), so low-priority work is slowed down, not starved.
+    - When critical work has to wait anyway, the newest in-flight
+      preemptible step (a specialist call of a preemptible class) is
+      cancelled: its next model call or stream chunk raises CallCancelled
+      and the caller reports it as deferred.
+    """
+
+    def __init__(self, max_concurrency: int = SCHEDULER_MAX_CONCURRENCY,
+                 reserved_critical: int = SCHEDULER_RESERVED_CRITICAL,
+                 weights: Optional[Dict[str, float]] = None,
+                 preemptible: Optional[List[str]] = None):
+        self.max_concurrency = max_concurrency
+        self.reserved_critical = min(reserved_critical, max_concurrency - 1)
+        self.weights = dict(PRIORITY_WEIGHTS if weights is None else weights)
+        self.preemptible = set(PREEMPTIBLE_PRIORITIES if preemptible is None else preemptible)
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._waiting: Dict[str, List[Ticket]] = {name: [] for name in PRIORITY_CLASSES}
+        self._running: List[Ticket] = []
+        self._pass = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._virtual_time = 0.0
+        self._stats = {name: {"granted": 0, "wait_s": 0.0, "cancelled": 0, "timeouts": 0} for name in PRIORITY_CLASSES}
+
+    @contextmanager
+    def slot(self, priority: Optional[str], agent: Optional[str] = None, timeout: Optional[float] = None,
+             preemptible: bool = True):
+        """
+        Hold a slot for the block. Model calls inside it are cancelled if
+        the step is preempted; pass preemptible=False for steps that have
+        no deferred result. Raises TimeoutError if no slot is granted
+        within `timeout` seconds.
+        """
+        ticket = self._acquire(priority_class(priority), agent, timeout, preemptible)
+        try:
+            with cancellation_scope(ticket.cancelled):
+                yield ticket
+        finally:
+            self._release(ticket)
+
+    def _acquire(self, priority: str, agent: Optional[str], timeout: Optional[float], preemptible: bool) -> Ticket:
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            ticket = Ticket(priority, agent, preemptible and priority in self.preemptible, next(self._seq))
+            if not self._waiting[priority]:
+                # A class that was idle rejoins at the current virtual time, without a backlog of turns
+                self._pass[priority] = max(self._pass[priority], self._virtual_time)
+            self._waiting[priority].append(ticket)
+            preempted = False
+            while not self._can_start(ticket):
+                if priority == "critical" and not preempted and len(self._running) >= self.max_concurrency:
+                    preempted = self._preempt_one()
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._waiting[priority].remove(ticket)
+                    self._stats[priority]["timeouts"] += 1
+                    self._cond.notify_all()
+                    raise TimeoutError(f"No scheduler slot for {agent or 'request'} ({priority}) within {timeout}s")
+                self._cond.wait(remaining)
+
+            self._waiting[priority].remove(ticket)
+            self._running.append(ticket)
+            if priority != "critical":
+                self._virtual_time = self._pass[priority]
+                self._pass[priority] += 1.0 / self.weights.get(priority, 1)
+            ticket.started_at = time.perf_counter()
+            self._stats[priority]["granted"] += 1
+            self._stats[priority]["wait_s"] += ticket.started_at - ticket.enqueued_at
+            # Others may now be next in line
+            self._cond.notify_all()
+            return ticket
+
+    def _release(self, ticket: Ticket) -> None:
+        with self._cond:
+            self._running.remove(ticket)
+            self._cond.notify_all()
+
+    def _can_start(self, ticket: Ticket) -> bool:
+        if len(self._running) >= self.max_concurrency:
+            return False
+        if ticket.priority == "critical":
+            return ticket is min(self._waiting["critical"], key=Ticket.order)
+        if self._waiting["critical"]:
+            return False
+        shared_in_use = sum(1 for t in self._running if t.priority != "critical")
+        if shared_in_use >= self.max_concurrency - self.reserved_critical:
+            return False
+        return ticket is self._next_shared()
+
+    def _next_shared(self) -> Optional[Ticket]:
+        """Weighted choice among non-critical classes: lowest pass value wins"""
+        candidates = [name for name in PRIORITY_CLASSES[1:] if self._waiting[name]]
+        if not candidates:
+            return None
+        chosen = min(candidates, key=lambda name: (self._pass[name], PRIORITY_CLASSES.index(name)))
+        return min(self._waiting[chosen], key=Ticket.order)
+
+    def _preempt_one(self) -> bool:
+        victims = [t for t in self._running if t.preemptible and not t.cancelled.is_set()]
+        if not victims:
+            return False
+        victim = max(victims, key=lambda t: (PRIORITY_CLASSES.index(t.priority), t.agent_level, t.seq))
+        victim.cancelled.set()
+        self._stats[victim.priority]["cancelled"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "running": len(self._running),
+                "waiting": {name: len(tickets) for name, tickets in self._waiting.items()},
+                "by_priority": {
+                    name: {**s, "avg_wait_ms": round(s["wait_s"] / s["granted"] * 1000, 2) if s["granted"] else 0.0}
+                    for name, s in self._stats.items()
+                }
+            }
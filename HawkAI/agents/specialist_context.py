@@ -0,0 +1,49 @@
+# agents/specialist_context.py
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from config.agent_config import SPECIALIST_CONTEXT_TOKENS
+from models import start_session  # re-exported for the agents
+from monitoring import tracked_call
+from .prompt_builder import truncate_to_tokens
+
+
+@dataclass
+class SpecialistContext:
+    """
+    Everything a specialist call knows beyond its own prompt: the current
+    request, its priority and a few notes, rendered within a token budget.
+    Nothing carries over from earlier requests.
+    """
+    request: str = ""
+    priority: Optional[str] = None
+    notes: List[str] = field(default_factory=list)
+    max_tokens: int = SPECIALIST_CONTEXT_TOKENS
+
+    def add_note(self, note: str) -> None:
+        self.notes.append(note)
+
+    def render(self) -> str:
+        lines = []
+        if self.request:
+            lines.append(f"Operator request: {self.request}")
+        if self.priority:
+            lines.append(f"Priority: {self.priority}")
+        lines += [f"Note: {note}" for note in self.notes]
+        return truncate_to_tokens("\n".join(lines), self.max_tokens) if lines else ""
+
+    def apply(self, prompt: str) -> str:
+        rendered = self.render()
+        return f"Context:\n{rendered}\n\n{prompt.strip()}" if rendered else prompt
+
+
+def generate(agent: str, model_name: str, model, prompt: str, context: Optional[SpecialistContext] = None,
+             chat_session=None, **kwargs) -> Any:
+    """
+    One tracked model call. Stateless by default: the prompt carries only
+    `context`, so prompt tokens do not grow with the requests served.
+    """
+    if context is not None:
+        prompt = context.apply(prompt)
+    call = chat_session.send_message if chat_session is not None else model.generate_content
+    return tracked_call(agent, model_name, call, prompt, **kwargs)
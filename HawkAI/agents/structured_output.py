@@ -0,0 +1,188 @@
+# agents/structured_output.py
+import json
+import re
+from typing import Dict, Any, List, Callable, Optional
+
+from config.agent_config import AGENT_CONFIGS, get_agent_for_query
+
+PRIORITIES = ["low", "medium", "high", "critical"]
+COMPLEXITIES = ["simple", "moderate", "complex"]
+
+# Response schema for the coordinator's request analysis. priority and
+# required_agents come first so scheduling and routing can start while the
+# rest is still streaming; without propertyOrdering Gemini emits properties
+# alphabetically and they would arrive almost last.
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "priority": {"type": "string", "enum": PRIORITIES},
+        "required_agents": {"type": "array", "items": {"type": "string", "enum": list(AGENT_CONFIGS)}},
+        "request_type": {"type": "string"},
+        "complexity": {"type": "string", "enum": COMPLEXITIES},
+        "expected_response_time": {"type": "integer"},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["priority", "required_agents", "request_type", "complexity", "expected_response_time"],
+    "propertyOrdering": ["priority", "required_agents", "request_type", "complexity", "expected_response_time",
+                         "reasoning"]
+}
+
+ANALYSIS_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": ANALYSIS_SCHEMA,
+    "temperature": 0.0
+}
+
+
+class IncrementalJSONParser:
+    """
+    Streaming parser for one top-level JSON object. `feed` takes text
+    chunks as they arrive and calls `on_field(key, value)` as soon as each
+    top-level member is complete, without waiting for the closing brace.
+    Leading prose or ``` fences before the object are skipped.
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.fields: Dict[str, Any] = {}
+        self.buffer = ""
+        self.complete = False
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+
+    def feed(self, chunk: str) -> None:
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text) and not self.complete:
+            char = text[self._pos]
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(text[self._member_start:self._pos])
+                    self.complete = True
+            elif char == "," and self._depth == 1:
+                self._emit(text[self._member_start:self._pos])
+                self._member_start = self._pos + 1
+            self._pos += 1
+
+    def _emit(self, member: str) -> None:
+        if not member.strip():
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        for key, value in parsed.items():
+            self.fields[key] = value
+            if self.on_field:
+                self.on_field(key, value)
+
+
+def repair_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Best-effort local repair of a truncated or sloppy JSON object: strips
+    fences and prose, closes open strings/brackets and drops trailing
+    commas. Returns None if nothing object-like can be recovered.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+    end = text.rfind("}")
+    try:
+        return json.loads(text[:end + 1]) if end > 0 else json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    closers: List[str] = []
+    in_string = escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]" and closers:
+            closers.pop()
+    repaired = text + ('"' if in_string else "")
+    # A dangling key or colon cannot be completed; cut back to the last full member
+    repaired = re.sub(r',?\s*"[^"]*"\s*:?\s*$', "", repaired) if not in_string else repaired
+    repaired = re.sub(r",\s*$", "", repaired) + "".join(reversed(closers))
+    repaired = re.sub(r",\s*([}\]])", r"\1", repaired)
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError:
+        return None
+
+
+def normalize_agents(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return list(dict.fromkeys(name for name in value if name in AGENT_CONFIGS))
+
+
+def validate_analysis(data: Optional[Dict[str, Any]], user_prompt: str) -> Dict[str, Any]:
+    """
+    Coerce a (possibly partial) analysis to the schema. Missing or invalid
+    fields get local defaults - keyword routing for required_agents - and
+    are listed under "recovered_fields".
+    """
+    data = dict(data or {})
+    recovered = []
+
+    agents = normalize_agents(data.get("required_agents"))
+    if not agents:
+        agents = [get_agent_for_query(user_prompt)]
+        recovered.append("required_agents")
+    data["required_agents"] = agents
+
+    if data.get("priority") not in PRIORITIES:
+        data["priority"] = "medium"
+        recovered.append("priority")
+    if data.get("complexity") not in COMPLEXITIES:
+        data["complexity"] = "complex" if len(agents) > 1 else "moderate"
+        recovered.append("complexity")
+    if not isinstance(data.get("request_type"), str) or not data["request_type"]:
+        data["request_type"] = "fallback_routing"
+        recovered.append("request_type")
+    try:
+        data["expected_response_time"] = int(data.get("expected_response_time"))
+    except (TypeError, ValueError):
+        data["expected_response_time"] = 5
+        recovered.append("expected_response_time")
+    data.setdefault("reasoning", "")
+
+    if recovered:
+        data["recovered_fields"] = recovered
+    return data
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark single-flight coalescing on the simulated Gemini backend: an
+incident burst where many operators send near-identical queries within
+seconds, through the sync webhook handler (threads) and the async agent
+path used by the service. Reports model calls made, the coalescing ratio
+and latency with coalescing off and on.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation
+from monitoring import usage_tracker
+from harness import latency_summary, run_concurrent
+from loadtest_handler import FakeRequest
+
+INCIDENT_QUERIES = [
+    "Crowd crush at gate 3 - what do we do?",
+    "crowd crush at Gate 3, what do we do",
+    "CROWD CRUSH AT GATE 3 what do we do?!",
+    "Fire alarm in sector A",
+    "fire alarm in sector a",
+    "Is the main stage area safe right now?"
+]
+
+
+def burst(operators: int, spread_s: float, seed: int):
+    """(delay, payload) per operator: queries drawn from a few incident phrasings"""
+    rng = random.Random(seed)
+    return [(rng.uniform(0, spread_s), {"text": rng.choice(INCIDENT_QUERIES)}) for _ in range(operators)]
+
+
+def model_calls() -> int:
+    return usage_tracker.summary()["by_agent"].get("hawkai_agent", {}).get("calls", 0)
+
+
+def run_handler(main, requests, coalesce: bool):
+    main.agent.flight.enabled = coalesce
+    main.agent.flight.reset()
+    calls_before = model_calls()
+
+    def handle(request):
+        delay, payload = request
+        time.sleep(delay)
+        start = time.perf_counter()
+        body, status, _ = main.projectHawkAI_handler(FakeRequest(payload))
+        return {"latency": time.perf_counter() - start} if status == 200 else {"error": f"HTTP {status}"}
+
+    row = run_concurrent(handle, requests, len(requests))
+    latencies = [result["latency"] for result in row.pop("_results") if result and "latency" in result]
+    return {"path": "webhook handler", "coalesce": coalesce, "requests": len(requests),
+            "model_calls": model_calls() - calls_before, **main.agent.flight.stats(),
+            "latency_ms": latency_summary(latencies), "errors": row["errors"]}
+
+
+async def _run_async(main, requests):
+    async def one(delay, payload):
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        await main.agent.analyze_request_async(payload["text"])
+        return time.perf_counter() - start
+    return await asyncio.gather(*[one(delay, payload) for delay, payload in requests])
+
+
+def run_service_path(main, requests, coalesce: bool):
+    main.agent.flight.enabled = coalesce
+    main.agent.flight.reset()
+    calls_before = model_calls()
+    latencies = asyncio.run(_run_async(main, requests))
+    return {"path": "async service", "coalesce": coalesce, "requests": len(requests),
+            "model_calls": model_calls() - calls_before, **main.agent.flight.stats(),
+            "latency_ms": latency_summary(latencies), "errors": 0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operators", type=int, default=100)
+    parser.add_argument("--spread", type=float, default=1.0, help="Seconds over which the burst arrives")
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    models.set_backend("simulated")
+    configure_simulation(time_scale=args.time_scale, error_rate=0.0)
+    # The handler module builds its agent at import time, after the backend switch
+    import main
+
+    print("=== HawkAI Request Coalescing Benchmark (simulated Gemini) ===\n")
+    requests = burst(args.operators, args.spread, args.seed)
+    results = []
+    for runner in (run_handler, run_service_path):
+        for coalesce in (False, True):
+            row = runner(main, requests, coalesce)
+            results.append(row)
+            latency = row["latency_ms"]
+            print(f"🔗 {row['path']:<16} coalesce={'on ' if coalesce else 'off'} | {row['model_calls']:4d} model calls "
+                  f"for {row['requests']} requests | ratio {row['coalescing_ratio']:.2f} | "
+                  f"p50 {latency['p50_ms']:7.1f} ms | p95 {latency['p95_ms']:7.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
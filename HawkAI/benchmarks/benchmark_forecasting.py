@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the local crowd-flow forecaster: fit time for many series and
+backtest accuracy against a naive last-value forecast.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.forecasting import CrowdForecaster
+
+
+def synthetic_counts(n_series: int, length: int, season_length: int, seed: int = 7):
+    """Seasonal gate counts with per-series scale, drift and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(length)
+    scale = rng.uniform(50, 2000, size=(n_series, 1))
+    phase = rng.uniform(0, 2 * np.pi, size=(n_series, 1))
+    drift = rng.normal(0, 0.0005, size=(n_series, 1))
+    seasonal = 1 + 0.5 * np.sin(2 * np.pi * t / season_length + phase)
+    noise = rng.normal(0, 0.05, size=(n_series, length))
+    values = np.maximum(scale * (seasonal + drift * t + noise), 0)
+    return {f"gate_{i}": values[i].tolist() for i in range(n_series)}
+
+
+def run(series_counts, length: int, season_length: int, horizon: int):
+    results = []
+    for n_series in series_counts:
+        series = synthetic_counts(n_series, length, season_length)
+        forecaster = CrowdForecaster(season_length=season_length)
+
+        start = time.perf_counter()
+        forecaster.fit(series)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        forecaster.update({key: values[-1] for key, values in series.items()})
+        update_seconds = time.perf_counter() - start
+
+        backtest = forecaster.backtest(series, horizon)
+        results.append({
+            "series": n_series,
+            "samples_per_series": length,
+            "fit_seconds": round(fit_seconds, 4),
+            "incremental_update_seconds": round(update_seconds, 5),
+            "backtest": backtest
+        })
+        print(f"📈 {n_series:>6} series | fit {fit_seconds * 1000:8.1f} ms | "
+              f"update {update_seconds * 1000:6.2f} ms | "
+              f"MAPE {backtest['mape']:.3f} (naive {backtest['naive_mape']:.3f})")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--series", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--length", type=int, default=288, help="Samples per series")
+    parser.add_argument("--season-length", type=int, default=12)
+    parser.add_argument("--horizon", type=int, default=6, help="Held-out samples per series")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print("=== HawkAI Forecasting Benchmark ===\n")
+    results = run(args.series, args.length, args.season_length, args.horizon)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
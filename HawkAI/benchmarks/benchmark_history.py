@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark conversation history storage: an unbounded in-memory list of
+result dicts versus HistoryLog (ring buffer plus compressed on-disk log).
+Reports Python heap growth, append throughput, disk size and time-range
+read latency.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from monitoring.history import HistoryLog
+
+AGENT_TEXT = ("Risk level: HIGH. Crowd density near gate 3 exceeds safe limits; redirect flow through "
+              "gate 2 and open overflow exits. Re-check in 10 minutes. ") * 8
+
+
+def sample_result(i: int):
+    """Roughly the size of a CoordinatorAgent.process_request result"""
+    return {
+        "request_id": f"req{i:08d}",
+        "user_request": f"Crowd update {i}: fire alarm sector A, medical emergency gate 3",
+        "analysis": {"request_type": "alert_management", "required_agents": ["safety_monitoring", "alert_management"],
+                     "priority": "critical", "expected_response_time": 3},
+        "agent_responses": {name: {"agent": name, "result": AGENT_TEXT} for name in ("safety_monitoring", "alert_management")},
+        "final_response": AGENT_TEXT * 2,
+        "processing_time": 2.5 + (i % 7) * 0.1,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def run(entries: int, memory_entries: int):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    history = []
+    start = time.perf_counter()
+    for i in range(entries):
+        history.append(sample_result(i))
+    list_time = time.perf_counter() - start
+    list_mb = (tracemalloc.get_traced_memory()[0] - base) / 2**20
+    del history
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = tracemalloc.get_traced_memory()[0]
+        log = HistoryLog("bench", max_memory_entries=memory_entries, path=os.path.join(tmp, "bench.log"))
+        start = time.perf_counter()
+        first_logged = time.time()
+        for i in range(entries):
+            log.append(sample_result(i))
+        log_time = time.perf_counter() - start
+        log_mb = (tracemalloc.get_traced_memory()[0] - base) / 2**20
+        tracemalloc.stop()
+
+        # Read back a 1% slice from the middle of the log
+        span = (time.time() - first_logged) / 100
+        middle = first_logged + (time.time() - first_logged) / 2
+        start = time.perf_counter()
+        window = log.read_range(middle, middle + span)
+        range_ms = (time.perf_counter() - start) * 1000
+        disk_mb = log.disk_bytes() / 2**20
+        log.close()
+
+    results = {
+        "entries": entries,
+        "list": {"heap_mb": round(list_mb, 2), "appends_per_s": round(entries / list_time)},
+        "history_log": {"heap_mb": round(log_mb, 2), "appends_per_s": round(entries / log_time),
+                        "disk_mb": round(disk_mb, 2), "range_read_entries": len(window),
+                        "range_read_ms": round(range_ms, 2)}
+    }
+    print(f"🧠 list        | heap {list_mb:8.2f} MB | {entries / list_time:9.0f} appends/s")
+    print(f"💾 HistoryLog  | heap {log_mb:8.2f} MB | {entries / log_time:9.0f} appends/s | "
+          f"disk {disk_mb:.2f} MB | range read {len(window)} entries in {range_ms:.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--memory-entries", type=int, default=100)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print("=== HawkAI History Storage Benchmark ===\n")
+    results = run(args.entries, args.memory_entries)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
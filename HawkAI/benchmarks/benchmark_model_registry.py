@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the process-wide model registry against per-agent clients.
+
+1. Clients: build the four agents' models for N requests, the way the
+   Vertex webhook handler constructs its agent per request, and open their
+   prediction clients (what the first call does). Real Vertex AI SDK
+   clients with anonymous credentials, so nothing leaves the machine.
+   Reports clients, gRPC channels, setup time, traced and RSS memory.
+2. Connection setup: the Vertex webhook handler on the simulated backend,
+   where a client's first call pays the profile's connect_s. Latencies
+   are fixed so the modes differ only in connection setup.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation, model_registry
+from config.constants import MODEL_NAME_PRO, MODEL_NAME_FLASH
+from harness import run_concurrent, save_results
+from loadtest_handler import FakeRequest, QUERIES
+
+# Model and system instruction of each agent (instructions shortened)
+AGENT_MODELS = [
+    (MODEL_NAME_PRO, "You are ProjectHawkAI Coordinator, the main AI agent for proactive event safety monitoring."),
+    (MODEL_NAME_FLASH, "You are the Safety Monitoring Agent for ProjectHawkAI."),
+    (MODEL_NAME_FLASH, "You are the Data Analytics Agent for ProjectHawkAI."),
+    (MODEL_NAME_FLASH, "You are the Alert Management Agent for ProjectHawkAI.")
+]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def measure_clients(requests: int, shared: bool) -> dict:
+    """Runs in a fresh interpreter so RSS is not shared between modes"""
+    import vertexai
+    from google.auth.credentials import AnonymousCredentials
+    vertexai.init(project="hawkai-benchmark", location="asia-south1", credentials=AnonymousCredentials())
+    models.set_backend("vertex")
+    model_registry.enabled = shared
+
+    # Import the SDK's lazy modules before measuring
+    model_registry.get(*AGENT_MODELS[0]).client._prediction_client
+    model_registry.clear()
+
+    rss_before = rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    handles = []
+    for _ in range(requests):
+        for model_name, instruction in AGENT_MODELS:
+            handle = models.create_model(model_name, instruction)
+            handle.client._prediction_client
+            handles.append(handle)
+    elapsed = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    clients = {id(handle.client) for handle in handles}
+    channels = {id(handle.client._prediction_client) for handle in handles}
+    return {"mode": "registry" if shared else "per-agent", "requests": requests, "model_handles": len(handles),
+            "clients": len(clients), "channels": len(channels), "setup_ms": round(elapsed * 1000, 1),
+            "traced_mb": round(traced / 2 ** 20, 2), "rss_mb": round(rss_mb() - rss_before, 2)}
+
+
+def run_clients(requests: int, shared: bool) -> dict:
+    output = subprocess.run([sys.executable, __file__, "--measure-clients", str(requests)]
+                            + ([] if shared else ["--per-agent"]), capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def run_connections(requests: int, concurrency: int, shared: bool, time_scale: float) -> dict:
+    models.set_backend("simulated")
+    # Fixed latencies, so the modes differ only in connection setup
+    configure_simulation(time_scale=time_scale, error_rate=0.0, ttft_sigma=0.0, output_tokens_sigma=0.0)
+    model_registry.clear()
+    model_registry.enabled = shared
+    from deployment.vertex_agent import projectHawkAI_handler
+
+    payloads = [{"text": QUERIES[i % len(QUERIES)], "intentInfo": {"displayName": "safety_check"}}
+                for i in range(requests)]
+    row = run_concurrent(lambda payload: projectHawkAI_handler(FakeRequest(payload)), payloads, concurrency)
+    row.pop("_results")
+    stats = model_registry.stats()
+    return {"mode": "registry" if shared else "per-agent", **row, "connections": stats["clients"] if shared
+            else model_registry.created}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Per-request agent constructions")
+    parser.add_argument("--concurrency", type=int, default=4, help="The handler's model executor has 4 threads")
+    parser.add_argument("--time-scale", type=float, default=0.2,
+                        help="Multiply simulated model latency, e.g. 1.0 for real-time")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--measure-clients", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--per-agent", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_clients:
+        print(json.dumps(measure_clients(args.measure_clients, not args.per_agent)))
+        sys.exit(0)
+
+    print("=== HawkAI Model Registry Benchmark ===\n")
+    results = {"clients": [], "connections": []}
+    print(f"🧠 Vertex AI clients for {args.requests} requests x {len(AGENT_MODELS)} agents (offline)")
+    for shared in (False, True):
+        row = run_clients(args.requests, shared)
+        results["clients"].append(row)
+        print(f"   {row['mode']:<10} | clients {row['clients']:4d} | channels {row['channels']:4d} | "
+              f"setup {row['setup_ms']:8.1f} ms | traced {row['traced_mb']:7.2f} MB | RSS +{row['rss_mb']:.2f} MB")
+
+    print(f"\n🔌 Webhook handler, simulated backend (c={args.concurrency}, time scale {args.time_scale})")
+    for shared in (False, True):
+        row = run_connections(args.requests, args.concurrency, shared, args.time_scale)
+        results["connections"].append(row)
+        print(f"   {row['mode']:<10} | connections {row['connections']:4d} | {row['throughput_rps']:7.2f} req/s | "
+              f"p50 {row['p50_ms']:8.1f} ms | p95 {row['p95_ms']:8.1f} ms | errors {row['error_rate'] * 100:.1f}%")
+
+    if args.output:
+        save_results(args.output, "benchmark_model_registry", vars(args), results)
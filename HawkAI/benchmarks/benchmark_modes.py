@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Offline benchmark of the three request paths - the full multi-agent
+coordinator, fast mode and simplified mode - on the simulated Gemini
+backend. Reports throughput and p50/p95/p99 latency per concurrency level.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation
+from monitoring import usage_tracker
+from config.constants import PROJECT_ID, LOCATION
+from harness import run_concurrent, load_entry_module, save_results, compare_to_baseline
+
+PROMPTS = [
+    "5000 people in 3000 capacity venue",
+    "Fire alarm sector A, medical emergency gate 3",
+    "Rain forecast 25mph winds tomorrow outdoor event",
+    "Unusual incident patterns this week",
+    "Need evacuation plan severe weather",
+    "Prioritize these alerts: crowd surge gate 2, lost child food court"
+]
+
+
+def build_coordinator(mode: str):
+    """Create the coordinator for a mode; returns its process_request"""
+    if mode == "coordinator":
+        from agents.coordinator import CoordinatorAgent
+        return CoordinatorAgent(PROJECT_ID, LOCATION).process_request
+    if mode == "fast":
+        module = load_entry_module("fast-main.py", "fast_main")
+        return module.FastCoordinatorAgent(PROJECT_ID, LOCATION).process_request
+    if mode == "simplified":
+        module = load_entry_module("simplified-main.py", "simplified_main")
+        return module.SimpleCoordinatorAgent(PROJECT_ID, LOCATION).process_request
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def run(modes, concurrency_levels, requests_per_level):
+    results = []
+    payloads = [PROMPTS[i % len(PROMPTS)] for i in range(requests_per_level)]
+    for mode in modes:
+        try:
+            process_request = build_coordinator(mode)
+        except Exception as e:
+            print(f"❌ {mode:<11} | setup failed: {type(e).__name__}: {str(e).splitlines()[0]}")
+            results.append({"mode": mode, "setup_error": f"{type(e).__name__}: {e}"})
+            continue
+
+        for concurrency in concurrency_levels:
+            usage_tracker.reset()
+            row = run_concurrent(process_request, payloads, concurrency)
+            row.pop("_results")
+            usage = usage_tracker.summary()
+            row = {"mode": mode, **row,
+                   "model_calls": sum(a["calls"] for a in usage["by_agent"].values()),
+                   "avg_tokens_per_request": usage["avg_tokens_per_request"]}
+            results.append(row)
+            print(f"🚀 {mode:<11} c={concurrency:<3} | {row['throughput_rps']:7.2f} req/s | "
+                  f"p50 {row['p50_ms']:8.1f} ms | p95 {row['p95_ms']:8.1f} ms | p99 {row['p99_ms']:8.1f} ms | "
+                  f"errors {row['errors']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["coordinator", "fast", "simplified"],
+                        choices=["coordinator", "fast", "simplified"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=60, help="Requests per concurrency level")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="Multiply simulated model latency, e.g. 1.0 for real-time")
+    parser.add_argument("--error-rate", type=float, help="Override the simulated error rate for every model")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    models.set_backend("simulated")
+    overrides = {"time_scale": args.time_scale}
+    if args.error_rate is not None:
+        overrides["error_rate"] = args.error_rate
+    configure_simulation(**overrides)
+
+    print("=== HawkAI Mode Benchmark (simulated Gemini) ===\n")
+    results = run(args.modes, args.concurrency, args.requests)
+
+    if args.output:
+        save_results(args.output, "modes", vars(args), results)
+    if args.baseline:
+        compare_to_baseline(args.baseline, results)
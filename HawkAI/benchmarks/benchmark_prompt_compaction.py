@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark synthesis prompt size: the original indented-JSON prompt versus
+the compact, token-budgeted prompt built by SynthesisPromptBuilder.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.prompt_builder import SynthesisPromptBuilder, estimate_tokens
+
+USER_PROMPT = ("Multiple alerts: fire alarm in sector A, medical emergency near gate 3, "
+               "overcrowding at food court. What should we do?")
+
+SPECIALIST_TEXT = {
+    "safety_monitoring": "Risk level: HIGH. Crowd density near gate 3 exceeds safe limits; "
+                         "redirect flow through gate 2 and open overflow exits. ",
+    "data_analytics": "Incident rate is 3x the weekly baseline, concentrated between 19:00 and 21:00 "
+                      "around sector A and the food court. Confidence: 0.8. ",
+    "alert_management": "P1: fire alarm sector A, dispatch fire marshal within 2 minutes. "
+                        "P2: medical emergency gate 3, paramedics within 5 minutes. "
+}
+
+
+def original_prompt(user_prompt, agent_responses, analysis):
+    """The synthesis prompt as CoordinatorAgent built it before compaction"""
+    return f"""
+        Original user request: "{user_prompt}"
+
+        Request analysis: {json.dumps(analysis, indent=2)}
+
+        Specialist agent responses:
+        {json.dumps(agent_responses, indent=2)}
+
+        Synthesize these responses into a coherent, actionable answer that:
+        1. Directly addresses the user's request
+        2. Highlights key insights from each agent
+        3. Identifies any conflicts or contradictions
+        4. Provides clear recommendations
+        5. Indicates confidence levels where appropriate
+
+        Keep the response concise but comprehensive.
+        """
+
+
+def sample_request(output_repeats: int):
+    now = datetime.now().isoformat()
+    analysis = {
+        "request_type": "alert_management",
+        "complexity": "complex",
+        "required_agents": list(SPECIALIST_TEXT),
+        "priority": "critical",
+        "expected_response_time": 3,
+        "reasoning": "Multiple simultaneous emergencies require safety, analytics and alert agents."
+    }
+    agent_responses = {
+        name: {
+            "agent": name,
+            "analysis_type": "sample",
+            "result": text * output_repeats,
+            "timestamp": now,
+            "conditions": {"raw_prompt": USER_PROMPT, "conditions": "unknown"}
+        }
+        for name, text in SPECIALIST_TEXT.items()
+    }
+    return analysis, agent_responses
+
+
+def run(output_repeats, budgets):
+    results = []
+    for repeats in output_repeats:
+        analysis, agent_responses = sample_request(repeats)
+        before = estimate_tokens(original_prompt(USER_PROMPT, agent_responses, analysis))
+        for budget in budgets:
+            _, stats = SynthesisPromptBuilder(token_budget=budget).build(USER_PROMPT, agent_responses, analysis)
+            after = stats["prompt_tokens"]
+            results.append({
+                "specialist_output_repeats": repeats,
+                "token_budget": budget,
+                "prompt_tokens_before": before,
+                "prompt_tokens_after": after,
+                "reduction": round(1 - after / before, 3),
+                "truncated_agents": stats["truncated_agents"]
+            })
+            print(f"✂️  output x{repeats:<3} budget {budget:>5} | before {before:>6} | after {after:>6} | "
+                  f"-{(1 - after / before) * 100:4.1f}% | truncated {stats['truncated_agents']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output-repeats", type=int, nargs="+", default=[1, 10, 50],
+                        help="How many times each sample specialist output is repeated")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[500, 1500, 4000])
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print("=== HawkAI Synthesis Prompt Compaction Benchmark ===\n")
+    results = run(args.output_repeats, args.budgets)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
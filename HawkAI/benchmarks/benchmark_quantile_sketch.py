@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the latency quantile sketch: accuracy of p50/p95/p99 against
+exact percentiles, insert cost and size, and a fleet-wide merge of
+sketches built in separate worker processes.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from monitoring.sketch import QuantileSketch, merge_exports
+
+QUANTILES = (0.50, 0.95, 0.99)
+
+
+def latencies(n: int, seed: int):
+    """Lognormal model-call latencies with a slow tail of retried calls"""
+    rng = random.Random(seed)
+    return [rng.lognormvariate(0, 0.5) * (4 if rng.random() < 0.02 else 1) for _ in range(n)]
+
+
+def worker_export(args):
+    n, seed = args
+    sketch = QuantileSketch()
+    for value in latencies(n, seed):
+        sketch.add(value)
+    return {"mode/fast": sketch.to_dict()}
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def run(samples: int, workers: int):
+    values = latencies(samples, seed=0)
+    sketch = QuantileSketch()
+    start = time.perf_counter()
+    for value in values:
+        sketch.add(value)
+    insert_ns = (time.perf_counter() - start) / samples * 1e9
+
+    accuracy = {}
+    for q in QUANTILES:
+        estimate, truth = sketch.quantile(q), exact(values, q)
+        accuracy[f"p{int(q * 100)}"] = {"estimate": round(estimate, 4), "exact": round(truth, 4),
+                                        "relative_error": round(abs(estimate - truth) / truth, 5)}
+    size_bytes = len(json.dumps(sketch.to_dict()))
+    print(f"📏 {samples} values | {insert_ns:.0f} ns/insert | {len(sketch.buckets)} buckets | "
+          f"{size_bytes / 1024:.1f} KB serialized (list: {samples * 8 / 1024:.0f} KB of floats)")
+    for name, row in accuracy.items():
+        print(f"   {name}: {row['estimate']:.4f} vs exact {row['exact']:.4f} (error {row['relative_error'] * 100:.2f}%)")
+
+    # Fleet-wide summary from per-process sketches
+    jobs = [(samples // workers, seed) for seed in range(1, workers + 1)]
+    with Pool(workers) as pool:
+        exports = pool.map(worker_export, jobs)
+    merged = merge_exports(exports)["mode/fast"]
+    fleet_values = [v for n, seed in jobs for v in latencies(n, seed)]
+    fleet = {f"p{int(q * 100)}": {"estimate": round(merged.quantile(q), 4), "exact": round(exact(fleet_values, q), 4)}
+             for q in QUANTILES}
+    print(f"🌐 merged {workers} workers ({merged.count} values): " +
+          ", ".join(f"{k} {v['estimate']:.4f}/{v['exact']:.4f}" for k, v in fleet.items()))
+
+    return {"samples": samples, "insert_ns": round(insert_ns), "buckets": len(sketch.buckets),
+            "serialized_bytes": size_bytes, "accuracy": accuracy, "fleet_merge": fleet}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print("=== HawkAI Latency Sketch Benchmark ===\n")
+    results = run(args.samples, args.workers)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
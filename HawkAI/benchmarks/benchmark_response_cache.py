@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the on-disk response cache on the simulated Gemini backend.
+
+1. Cold-start replay: the same query sequence through the webhook agent
+   in two fresh processes sharing one cache file. The second process
+   starts with an empty memory but answers from disk, and must return
+   the same text.
+2. Multi-process access: worker processes reading and writing
+   overlapping keys concurrently.
+3. Storage: compressed bytes on disk against raw response text.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation, ResponseCache, cache_key
+from harness import latency_summary, save_results
+from loadtest_handler import QUERIES
+
+
+def replay(path: str, requests: int, time_scale: float) -> dict:
+    """One cold process: run the query sequence through a cached webhook agent"""
+    models.set_backend("simulated")
+    configure_simulation(time_scale=time_scale, error_rate=0.0)
+    import main
+
+    cache = ResponseCache(path)
+    agent = main.HawkAIAgent(response_cache=cache)
+    latencies, texts = [], []
+    for i in range(requests):
+        start = time.perf_counter()
+        texts.append(agent.analyze_request(QUERIES[i % len(QUERIES)]))
+        latencies.append(time.perf_counter() - start)
+    stats = cache.stats()
+    return {"requests": requests, "model_calls": stats["misses"], "hit_rate": stats["hit_rate"],
+            "tokens_saved": stats["tokens_saved"], **latency_summary(latencies),
+            "wall_time_s": round(sum(latencies), 3), "texts": texts}
+
+
+def run_replay(path: str, requests: int, time_scale: float) -> dict:
+    output = subprocess.run([sys.executable, __file__, "--replay", path, "--requests", str(requests),
+                             "--time-scale", str(time_scale)], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def _worker(path: str, worker: int, operations: int, keys: int, results):
+    cache = ResponseCache(path)
+    text = " ".join(QUERIES) * 4
+    errors = 0
+    start = time.perf_counter()
+    for i in range(operations):
+        key = cache_key("simulated", "benchmark", f"prompt {(i * 7 + worker) % keys}")
+        try:
+            if cache.get(key) is None:
+                cache.put(key, "simulated", text, 100, 200)
+        except Exception:
+            errors += 1
+    results.put((operations / (time.perf_counter() - start), errors, cache.hits))
+
+
+def run_processes(path: str, processes: int, operations: int, keys: int) -> dict:
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_worker, args=(path, i, operations, keys, results))
+               for i in range(processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    rows = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - start
+    return {"processes": processes, "operations": processes * operations,
+            "ops_per_s": round(processes * operations / wall, 1), "errors": sum(row[1] for row in rows),
+            "hits": sum(row[2] for row in rows)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--operations", type=int, default=2000, help="Cache operations per process")
+    parser.add_argument("--time-scale", type=float, default=0.1,
+                        help="Multiply simulated model latency, e.g. 1.0 for real-time")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--replay", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.replay:
+        print(json.dumps(replay(args.replay, args.requests, args.time_scale)))
+        sys.exit(0)
+
+    print("=== HawkAI Response Cache Benchmark (simulated Gemini) ===\n")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "responses.sqlite")
+        first, second = run_replay(path, args.requests, args.time_scale), run_replay(path, args.requests,
+                                                                                      args.time_scale)
+        identical = first.pop("texts") == second.pop("texts")
+        results["replay"] = [{"run": "cold cache", **first}, {"run": "new process, warm disk", **second}]
+        for row in results["replay"]:
+            print(f"💾 {row['run']:<24} | model calls {row['model_calls']:3d}/{row['requests']} | "
+                  f"p50 {row['p50_ms']:8.2f} ms | p95 {row['p95_ms']:8.2f} ms | wall {row['wall_time_s']:.2f} s")
+        print(f"   identical responses across processes: {'yes' if identical else 'NO'}")
+        results["replay_identical"] = identical
+
+        cache = ResponseCache(path)
+        keys = [key for (key,) in cache._db().execute("SELECT key FROM responses").fetchall()]
+        raw = sum(len(cache.get(key).text.encode()) for key in keys)
+        stored = cache.stats()["stored_bytes"]
+        results["storage"] = {"raw_text_bytes": raw, "stored_bytes": stored,
+                              "ratio": round(stored / raw, 3) if raw else 0.0}
+        print(f"\n🗜️  storage: {raw} bytes of response text stored in {stored} bytes "
+              f"({results['storage']['ratio'] * 100:.0f}%)")
+
+        row = run_processes(os.path.join(tmp, "shared.sqlite"), args.processes, args.operations, keys=500)
+        results["processes"] = row
+        print(f"\n🔀 {row['processes']} processes | {row['operations']} get/put ops | "
+              f"{row['ops_per_s']:.0f} ops/s | errors {row['errors']} | hits {row['hits']}")
+
+    if args.output:
+        save_results(args.output, "benchmark_response_cache", vars(args), results)
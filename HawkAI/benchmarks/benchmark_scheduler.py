@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark critical-request latency under mixed load on the simulated Gemini
+backend: each request runs the coordinator pipeline shape (streamed
+analysis, parallel specialist calls, synthesis) through a FIFO scheduler
+and through the priority scheduler with reserved critical capacity and
+preemption.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation, create_model
+from agents.scheduler import PriorityScheduler, preclassify
+from config.constants import MODEL_NAME_PRO, MODEL_NAME_FLASH
+from monitoring import tracked_stream, CallCancelled
+from harness import latency_summary
+
+CRITICAL_REQUESTS = [
+    "Fire reported near gate 2, people are trapped - evacuate now",
+    "Crush risk at the main stage barrier, one person unconscious"
+]
+ROUTINE_REQUESTS = [
+    "Historical incident patterns at the food court",
+    "Summarize attendance trends for the last hour",
+    "Low-priority: review staffing for the merch tent"
+]
+SPECIALISTS = ["safety_monitoring", "data_analytics", "alert_management"]
+
+
+def ignore_chunk(text):
+    pass
+
+
+def run_request(scheduler, pool, coordinator, specialist, prompt, priority, fifo):
+    """Analysis, parallel specialists and synthesis, each in a scheduler slot"""
+    start = time.perf_counter()
+    deferred = 0
+    with scheduler.slot("medium" if fifo else preclassify(prompt), agent="coordinator", preemptible=False):
+        tracked_stream("coordinator", MODEL_NAME_PRO, coordinator.generate_content, f'User Request: "{prompt}"', ignore_chunk)
+
+    def call(agent_name):
+        with scheduler.slot("medium" if fifo else priority, agent=agent_name):
+            return tracked_stream(agent_name, MODEL_NAME_FLASH, specialist.generate_content, prompt, ignore_chunk)
+
+    for future in [pool.submit(call, name) for name in SPECIALISTS]:
+        try:
+            future.result()
+        except CallCancelled:
+            deferred += 1
+
+    with scheduler.slot("medium" if fifo else priority, agent="coordinator", preemptible=False):
+        tracked_stream("coordinator", MODEL_NAME_PRO, coordinator.generate_content, "Synthesize: " + prompt, ignore_chunk)
+    return time.perf_counter() - start, deferred
+
+
+def run(label, fifo, requests, concurrency, critical_share, seed):
+    if fifo:
+        scheduler = PriorityScheduler(reserved_critical=0, preemptible=[])
+    else:
+        scheduler = PriorityScheduler()
+    coordinator = create_model(MODEL_NAME_PRO, "Coordinator")
+    specialist = create_model(MODEL_NAME_FLASH, "Specialist")
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(requests):
+        if rng.random() < critical_share:
+            jobs.append(("critical", rng.choice(CRITICAL_REQUESTS)))
+        else:
+            jobs.append((rng.choice(["medium", "low"]), rng.choice(ROUTINE_REQUESTS)))
+
+    latencies = {"critical": [], "routine": []}
+    deferred = 0
+    specialist_pool = ThreadPoolExecutor(max_workers=concurrency * len(SPECIALISTS))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [(priority, pool.submit(run_request, scheduler, specialist_pool, coordinator, specialist,
+                                          prompt, priority, fifo))
+                   for priority, prompt in jobs]
+        for priority, future in futures:
+            elapsed, skipped = future.result()
+            latencies["critical" if priority == "critical" else "routine"].append(elapsed)
+            deferred += skipped
+    wall = time.perf_counter() - started
+    specialist_pool.shutdown()
+
+    result = {
+        "scheduler": label,
+        "requests": requests,
+        "concurrency": concurrency,
+        "critical_ms": latency_summary(latencies["critical"]),
+        "routine_ms": latency_summary(latencies["routine"]),
+        "deferred_specialist_calls": deferred,
+        "throughput_rps": round(requests / wall, 2),
+        "scheduler_stats": scheduler.stats()["by_priority"]
+    }
+    critical, routine = result["critical_ms"], result["routine_ms"]
+    print(f"🚦 {label:8s} | critical p50 {critical['p50_ms']:7.1f} p95 {critical['p95_ms']:7.1f} "
+          f"p99 {critical['p99_ms']:7.1f} ms | routine p50 {routine['p50_ms']:7.1f} p95 {routine['p95_ms']:7.1f} ms | "
+          f"deferred {deferred} | {result['throughput_rps']} rps")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=24)
+    parser.add_argument("--critical-share", type=float, default=0.1)
+    parser.add_argument("--time-scale", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    models.set_backend("simulated")
+    configure_simulation(time_scale=args.time_scale, error_rate=0.0)
+
+    print("=== HawkAI Scheduler Benchmark (simulated Gemini) ===\n")
+    results = [run(label, fifo, args.requests, args.concurrency, args.critical_share, args.seed)
+               for label, fifo in (("fifo", True), ("priority", False))]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""
+Throughput of the async HTTP service mode versus the current sync
+handler on the simulated Gemini backend. The handler is driven in-process
+by a thread pool sized like functions-framework's gunicorn default (one
+worker, 4 threads per CPU), so it pays no HTTP cost; the service is driven
+over loopback HTTP with one keep-alive connection per concurrent client.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation
+from service import HawkAIService, run_workers, stop_workers
+from harness import latency_summary, run_concurrent, save_results, compare_to_baseline
+from loadtest_handler import FakeRequest, QUERIES
+
+
+def use_simulation(time_scale: float):
+    models.set_backend("simulated")
+    configure_simulation(time_scale=time_scale, error_rate=0.0)
+
+
+def run_handler(requests: int, concurrency: int, threads: int):
+    import main
+    payloads = [{"text": QUERIES[i % len(QUERIES)]} for i in range(requests)]
+
+    def handle(payload):
+        body, status, _ = main.projectHawkAI_handler(FakeRequest(payload))
+        return {"status": status} if status == 200 else {"error": f"HTTP {status}"}
+
+    # Requests beyond the worker threads queue, as they would in gunicorn
+    row = run_concurrent(handle, payloads, min(concurrency, threads))
+    row.pop("_results")
+    return row
+
+
+async def _client(port: int, bodies: asyncio.Queue, latencies: list, errors: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while True:
+            try:
+                body = bodies.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            start = time.perf_counter()
+            writer.write(b"POST / HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(next(line.split(b":")[1] for line in head.split(b"\r\n")
+                              if line.lower().startswith(b"content-length")))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n")[0].decode())
+    finally:
+        writer.close()
+
+
+async def _drive_service(port: int, requests: int, concurrency: int):
+    bodies = asyncio.Queue()
+    for i in range(requests):
+        bodies.put_nowait(json.dumps({"text": QUERIES[i % len(QUERIES)]}).encode())
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(port, bodies, latencies, errors) for _ in range(concurrency)])
+    wall = time.perf_counter() - start
+    return {"concurrency": concurrency, "requests": requests, "wall_time_s": round(wall, 3),
+            "throughput_rps": round(requests / wall, 2), **latency_summary(latencies),
+            "errors": len(errors), "error_rate": round(len(errors) / requests, 4)}
+
+
+def run_service(port: int, requests: int, concurrency: int):
+    return asyncio.run(_drive_service(port, requests, concurrency))
+
+
+def report(label: str, row: dict):
+    print(f"🌐 {label:<18} c={row['concurrency']:<4} | {row['throughput_rps']:8.2f} req/s | "
+          f"p50 {row['p50_ms']:8.1f} ms | p95 {row['p95_ms']:8.1f} ms | p99 {row['p99_ms']:8.1f} ms | "
+          f"errors {row['error_rate'] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64, 256])
+    parser.add_argument("--requests", type=int, default=10, help="Requests per concurrent client")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="Service worker processes")
+    parser.add_argument("--handler-threads", type=int, default=(os.cpu_count() or 1) * 4)
+    parser.add_argument("--time-scale", type=float, default=0.2,
+                        help="Multiply simulated model latency, e.g. 1.0 for real-time")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    use_simulation(args.time_scale)
+
+    print("=== HawkAI Service Mode Benchmark (simulated Gemini) ===\n")
+    results = []
+    for concurrency in args.concurrency:
+        requests = concurrency * args.requests
+        row = {"mode": f"handler ({args.handler_threads} threads)", **run_handler(requests, concurrency,
+                                                                                  args.handler_threads)}
+        row["concurrency"] = concurrency
+        report(row["mode"], row)
+        results.append(row)
+
+        for workers in args.workers:
+            processes, port = run_workers(HawkAIService, "127.0.0.1", 0, workers,
+                                          setup=lambda: use_simulation(args.time_scale))
+            try:
+                run_service(port, min(concurrency, 4), min(concurrency, 4))  # warm up workers
+                row = {"mode": f"service ({workers} worker{'s' if workers > 1 else ''})",
+                       **run_service(port, requests, concurrency)}
+            finally:
+                stop_workers(processes)
+            report(row["mode"], row)
+            results.append(row)
+        print()
+
+    if args.output:
+        save_results(args.output, "benchmark_service", vars(args), results)
+    if args.baseline:
+        compare_to_baseline(args.baseline, results)
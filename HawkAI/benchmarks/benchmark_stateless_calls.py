@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Soak benchmark: prompt tokens per specialist call over many requests on
+the simulated Gemini backend, with one long-lived chat session per
+specialist (the old behaviour) versus stateless calls that carry only a
+bounded per-request SpecialistContext. Chat sessions resend every earlier
+prompt and answer, so their per-call tokens grow with requests served.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation, create_model
+from config.constants import MODEL_NAME_FLASH_2
+from config.agent_config import get_agent_for_query
+from agents.specialist_context import SpecialistContext, generate
+from monitoring import UsageTracker
+from harness import save_results
+from loadtest_handler import QUERIES
+
+# Shape of each specialist's prompt (see agents/*_agent.py)
+SPECIALIST_PROMPTS = {
+    "safety_monitoring": """
+        Analyze crowd safety based on this data:
+        - Current crowd size: 12000
+        - Venue capacity: 15000
+        - Exit routes available: 6
+        - Time of day: evening
+
+        Provide JSON response with: risk_level, recommendations, monitoring_priority
+        """,
+    "data_analytics": """
+        Detect anomalies in current event metrics:
+        Current metrics: {'gate_a_per_min': 140, 'gate_b_per_min': 60, 'medical_calls': 2}
+
+        Rate anomaly severity and provide investigation priorities.
+        """,
+    "alert_management": """
+        Prioritize these new or escalated safety alerts:
+        New alerts: [{'id': 'A1', 'type': 'crowding', 'severity': 'high', 'location': 'Gate 3'}]
+
+        Provide ranked list with justifications.
+        """
+}
+
+
+def soak(requests: int, stateful: bool) -> list:
+    tracker = UsageTracker()
+    model = create_model(MODEL_NAME_FLASH_2, "Specialist")
+    sessions = {name: model.start_chat() for name in SPECIALIST_PROMPTS} if stateful else {}
+    for i in range(requests):
+        query = QUERIES[i % len(QUERIES)]
+        agent = get_agent_for_query(query)
+        agent = agent if agent in SPECIALIST_PROMPTS else "safety_monitoring"
+        context = None if stateful else SpecialistContext(request=query, priority="medium")
+        generate(agent, MODEL_NAME_FLASH_2, model, SPECIALIST_PROMPTS[agent], context, sessions.get(agent),
+                 tracker=tracker)
+    return [record.prompt_tokens for record in tracker.records]
+
+
+def window_mean(values: list, start: int, size: int) -> float:
+    window = values[start:start + size]
+    return round(sum(window) / len(window), 1) if window else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=100, help="Requests averaged per reported point")
+    parser.add_argument("--time-scale", type=float, default=0.0005,
+                        help="Multiply simulated model latency, e.g. 1.0 for real-time")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    models.set_backend("simulated")
+    configure_simulation(time_scale=args.time_scale, error_rate=0.0)
+
+    print(f"=== HawkAI Stateless Specialist Calls Soak ({args.requests} requests, simulated Gemini) ===\n")
+    checkpoints = sorted({0, args.requests // 2 - args.window, args.requests - args.window} - {-args.window})
+    results = []
+    for stateful in (True, False):
+        tokens = soak(args.requests, stateful)
+        row = {"mode": "chat sessions" if stateful else "stateless + context", "requests": args.requests,
+               "total_prompt_tokens": sum(tokens), "max_prompt_tokens": max(tokens),
+               "prompt_tokens_by_window": {f"{start + 1}-{start + args.window}": window_mean(tokens, start,
+                                                                                             args.window)
+                                           for start in checkpoints}}
+        results.append(row)
+        windows = " | ".join(f"req {span}: {mean:8.1f}" for span, mean in row["prompt_tokens_by_window"].items())
+        print(f"🧾 {row['mode']:<20} | {windows} | total {row['total_prompt_tokens']:,} tokens")
+
+    if args.output:
+        save_results(args.output, "benchmark_stateless_calls", vars(args), results)
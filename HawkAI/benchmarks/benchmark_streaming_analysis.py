@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark streamed request analysis on the simulated Gemini backend: time
+until required_agents is available (when specialists can be dispatched)
+versus the end of the stream, and how often truncated output is recovered
+locally instead of falling back to keyword routing.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation, create_model
+from agents.structured_output import ANALYSIS_GENERATION_CONFIG, IncrementalJSONParser, repair_json, validate_analysis
+from config.constants import MODEL_NAME_PRO
+from harness import latency_summary
+
+REQUESTS = [
+    "Fire alarm in sector A, crowd surge at gate 3, escalate",
+    "Historical incident patterns at the food court",
+    "Is the crowd density at the main stage safe?",
+    "Prioritize alerts: lost child, medical emergency gate 2"
+]
+
+ANALYSIS_PROMPT = 'User Request: "{request}"\nRespond in JSON with priority and "required_agents" first, then request_type, complexity, expected_response_time, reasoning.'
+
+
+def run(requests: int, malformed_rate: float):
+    configure_simulation(malformed_rate=malformed_rate)
+    session = create_model(MODEL_NAME_PRO).start_chat()
+    dispatch_at, complete_at = [], []
+    recovered = fallback = 0
+    for i in range(requests):
+        request = REQUESTS[i % len(REQUESTS)]
+        start = time.perf_counter()
+        seen = {}
+
+        def on_field(key, value):
+            if key == "required_agents":
+                seen.setdefault("at", time.perf_counter() - start)
+
+        parser = IncrementalJSONParser(on_field)
+        for chunk in session.send_message(ANALYSIS_PROMPT.format(request=request), stream=True,
+                                          generation_config=ANALYSIS_GENERATION_CONFIG):
+            parser.feed(chunk.text)
+        complete_at.append(time.perf_counter() - start)
+        dispatch_at.append(seen.get("at", complete_at[-1]))
+
+        data = parser.fields if parser.complete else {**parser.fields, **(repair_json(parser.buffer) or {})}
+        analysis = validate_analysis(data, request)
+        if not parser.complete:
+            recovered += 1
+        if "required_agents" in analysis.get("recovered_fields", []):
+            fallback += 1
+
+    dispatch, complete = latency_summary(dispatch_at), latency_summary(complete_at)
+    result = {
+        "malformed_rate": malformed_rate,
+        "requests": requests,
+        "dispatch_ms": dispatch,
+        "stream_complete_ms": complete,
+        "dispatch_saving_pct": round((1 - dispatch["mean_ms"] / complete["mean_ms"]) * 100, 1),
+        "truncated_responses": recovered,
+        "keyword_fallbacks": fallback
+    }
+    print(f"🌊 malformed {malformed_rate:4.0%} | dispatch p50 {dispatch['p50_ms']:7.1f} ms vs complete "
+          f"p50 {complete['p50_ms']:7.1f} ms (-{result['dispatch_saving_pct']}%) | "
+          f"truncated {recovered}, keyword fallback {fallback}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--malformed-rates", type=float, nargs="+", default=[0.0, 0.2])
+    parser.add_argument("--time-scale", type=float, default=0.05)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    models.set_backend("simulated")
+    configure_simulation(time_scale=args.time_scale, error_rate=0.0)
+
+    print("=== HawkAI Streaming Analysis Benchmark (simulated Gemini) ===\n")
+    results = [run(args.requests, rate) for rate in args.malformed_rates]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark tracing overhead: cost of a nested span tree per request with
+tracing disabled (no exporters) versus the ring-buffer and JSONL exporters.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from monitoring.tracing import Tracer, RingBufferExporter, JsonlExporter
+
+SPECIALISTS = ["safety_monitoring", "data_analytics", "alert_management"]
+
+
+def simulated_request(tracer: Tracer):
+    """Same span shape as CoordinatorAgent.process_request"""
+    with tracer.span("process_request", request_id="bench") as root:
+        with tracer.span("analyze_request"):
+            with tracer.span("model_call", agent="coordinator"):
+                pass
+        root.set_attribute("required_agents", SPECIALISTS)
+        for name in SPECIALISTS:
+            with tracer.span("specialist_call", agent=name):
+                with tracer.span("model_call", agent=name):
+                    pass
+        with tracer.span("synthesize_responses"):
+            with tracer.span("model_call", agent="coordinator"):
+                pass
+
+
+def measure(tracer: Tracer, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        simulated_request(tracer)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def run(requests: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        tracers = {
+            "disabled": Tracer(),
+            "ring": Tracer([RingBufferExporter()]),
+            "jsonl": Tracer([JsonlExporter(os.path.join(tmp, "spans.jsonl"))])
+        }
+        results = {}
+        for name, tracer in tracers.items():
+            per_request_us = measure(tracer, requests)
+            results[name] = {"us_per_request": round(per_request_us, 2),
+                             "us_per_span": round(per_request_us / 10, 3)}
+            print(f"⏱️  {name:<9} | {per_request_us:8.2f} µs/request | {per_request_us / 10:7.3f} µs/span")
+            tracer.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print("=== HawkAI Tracing Overhead Benchmark ===\n")
+    results = run(args.requests)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📁 Results saved to {args.output}")
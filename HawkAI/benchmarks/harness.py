@@ -0,0 +1,125 @@
+# benchmarks/harness.py
+"""
+Shared helpers for the benchmark scripts: latency percentiles, loading the
+hyphenated entry-point modules, concurrent request runs and JSON results.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Callable
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    values = sorted(latencies_s)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0
+    }
+
+
+def load_entry_module(filename: str, module_name: str):
+    """Import an entry point such as fast-main.py, whose name is not importable"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(PROJECT_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_concurrent(handle: Callable[[Any], Any], payloads: List[Any], concurrency: int) -> Dict[str, Any]:
+    """
+    Run `handle(payload)` for every payload on `concurrency` worker threads.
+    Coroutine functions are run with asyncio.run in their worker thread.
+    A call counts as an error if it raises or returns a dict with "error".
+    """
+    def timed(payload):
+        start = time.perf_counter()
+        try:
+            result = handle(payload)
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+            ok = not (isinstance(result, dict) and "error" in result)
+            error = None if ok else str(result["error"])[:200]
+        except Exception as e:
+            result, ok, error = None, False, f"{type(e).__name__}: {e}"[:200]
+        return time.perf_counter() - start, ok, error, result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, payloads))
+    wall_time = time.perf_counter() - start
+
+    latencies = [latency for latency, ok, _, _ in outcomes if ok]
+    errors = [error for _, ok, error, _ in outcomes if not ok]
+    return {
+        "concurrency": concurrency,
+        "requests": len(payloads),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(payloads), 4) if payloads else 0.0,
+        "sample_errors": sorted(set(errors))[:3],
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(payloads) / wall_time, 2) if wall_time else 0.0,
+        **latency_summary(latencies),
+        "_results": [result for _, _, _, result in outcomes]
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(path: str, benchmark: str, config: Dict[str, Any], results: Any) -> None:
+    """Write results with enough metadata to compare runs between commits"""
+    with open(path, 'w') as f:
+        json.dump({
+            "benchmark": benchmark,
+            "git_revision": git_revision(),
+            "timestamp": datetime.now().isoformat(),
+            "config": config,
+            "results": results
+        }, f, indent=2, default=str)
+    print(f"\n📁 Results saved to {path}")
+
+
+def compare_to_baseline(path: str, results: List[Dict[str, Any]], key_fields=("mode", "concurrency")) -> None:
+    """Print p95 and throughput changes against an earlier results file"""
+    with open(path) as f:
+        baseline = json.load(f)
+    rows = baseline["results"]
+    if isinstance(rows, dict):
+        rows = rows.get("runs", [])
+    previous = {tuple(r.get(k) for k in key_fields): r for r in rows}
+    print(f"\n=== Compared with {baseline.get('git_revision', '?')} ({path}) ===")
+    for row in results:
+        old = previous.get(tuple(row.get(k) for k in key_fields))
+        if not old or not old.get("p95_ms") or not old.get("throughput_rps"):
+            continue
+        p95_change = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        rps_change = (row["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100
+        flag = "⚠️ " if p95_change > 10 or rps_change < -10 else "  "
+        label = " ".join(f"{k}={row.get(k)}" for k in key_fields)
+        print(f"{flag}{label:<35} p95 {p95_change:+6.1f}% | throughput {rps_change:+6.1f}%")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+"""
+Local load test of main.projectHawkAI_handler on the simulated Gemini
+backend. Drives the handler in-process with a configurable mix of text,
+image (several sizes) and Dialogflow queryResult requests, sweeps
+concurrency, and reports requests/s, latency percentiles, peak RSS and
+error rates per request type - the inputs for sizing --memory and
+--max-instances in deploy.sh.
+"""
+
+import argparse
+import base64
+import io
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import models
+from models import configure_simulation
+from harness import run_concurrent, save_results, compare_to_baseline
+
+IMAGE_SIZES = {
+    "image_small": (320, 240),
+    "image_medium": (1280, 960),
+    "image_large": (4000, 3000)
+}
+
+QUERIES = [
+    "5000 people in 3000 capacity venue",
+    "Fire alarm sector A, medical emergency gate 3",
+    "Is the crowd at the main stage safe?",
+    "Rain forecast 25mph winds tomorrow outdoor event"
+]
+
+
+class FakeRequest:
+    """In-process stand-in for the flask.Request the handler receives"""
+
+    def __init__(self, payload, method: str = "POST"):
+        self.method = method
+        self._payload = payload
+
+    def get_json(self, silent: bool = False):
+        return self._payload
+
+
+def make_image(size, seed: int = 0) -> str:
+    """A camera-like JPEG (gradient plus noise) as a data URI"""
+    from PIL import Image
+    width, height = size
+    rng = random.Random(seed)
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.frombytes("RGB", (64, 64), bytes(rng.randrange(256) for _ in range(64 * 64 * 3)))
+    image = Image.blend(image, noise.resize((width, height)), 0.3)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def make_payloads(request_type: str, count: int):
+    images = {}
+    payloads = []
+    for i in range(count):
+        query = QUERIES[i % len(QUERIES)]
+        if request_type == "text":
+            payloads.append({"text": query})
+        elif request_type == "dialogflow":
+            payloads.append({"queryResult": {"queryText": query,
+                                             "intent": {"displayName": "safety.crowd.analysis"}}})
+        elif request_type in IMAGE_SIZES:
+            # A few distinct images per size so decoding is not trivially cached
+            key = i % 3
+            if key not in images:
+                images[key] = make_image(IMAGE_SIZES[request_type], seed=key)
+            payloads.append({"text": query, "image": images[key]})
+        else:
+            raise ValueError(f"Unknown request type: {request_type}")
+    return payloads
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # Not Linux: fall back to the high-water mark (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler:
+    """Samples process RSS on a background thread and keeps the peak"""
+
+    def __init__(self, interval_s: float = 0.01):
+        self.interval_s = interval_s
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+            time.sleep(self.interval_s)
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+        return False
+
+
+def run(request_types, concurrency_levels, requests_per_level):
+    # The handler module builds its agent at import time, after the backend switch
+    import main
+
+    def handle(payload):
+        body, status, _ = main.projectHawkAI_handler(FakeRequest(payload))
+        if status != 200 or "HawkAI Analysis Error" in body:
+            return {"error": f"HTTP {status}: {body[:120]}"}
+        return {"status": status}
+
+    results = []
+    for request_type in request_types:
+        payloads = make_payloads(request_type, requests_per_level)
+        for concurrency in concurrency_levels:
+            baseline_mb = current_rss_mb()
+            with RssSampler() as rss:
+                row = run_concurrent(handle, payloads, concurrency)
+            row.pop("_results")
+            row = {"request_type": request_type, **row,
+                   "baseline_rss_mb": round(baseline_mb, 1),
+                   "peak_rss_mb": round(rss.peak_mb, 1),
+                   "peak_rss_delta_mb": round(rss.peak_mb - baseline_mb, 1)}
+            results.append(row)
+            print(f"📨 {request_type:<12} c={concurrency:<3} | {row['throughput_rps']:7.2f} req/s | "
+                  f"p50 {row['p50_ms']:8.1f} ms | p95 {row['p95_ms']:8.1f} ms | p99 {row['p99_ms']:8.1f} ms | "
+                  f"peak RSS {row['peak_rss_mb']:7.1f} MB (+{row['peak_rss_delta_mb']:.1f}) | "
+                  f"errors {row['error_rate'] * 100:.1f}%")
+    return results
+
+
+def capacity_report(results, memory_mb: float, target_rps: float):
+    """Per request type: best concurrency that fits in memory and instances needed for target_rps"""
+    print(f"\n=== Capacity per instance ({memory_mb:.0f} MB, target {target_rps:g} req/s) ===")
+    report = {}
+    for request_type in dict.fromkeys(r["request_type"] for r in results):
+        fitting = [r for r in results if r["request_type"] == request_type
+                   and r["peak_rss_mb"] <= memory_mb * 0.85 and r["error_rate"] < 0.05]
+        if not fitting:
+            print(f"⚠️  {request_type:<12} | no tested concurrency fits in {memory_mb:.0f} MB")
+            report[request_type] = None
+            continue
+        best = max(fitting, key=lambda r: r["throughput_rps"])
+        instances = max(1, -(-target_rps // best["throughput_rps"]))
+        report[request_type] = {"concurrency": best["concurrency"], "throughput_rps": best["throughput_rps"],
+                                "peak_rss_mb": best["peak_rss_mb"], "instances_for_target": int(instances)}
+        print(f"📦 {request_type:<12} | concurrency {best['concurrency']:<3} | {best['throughput_rps']:7.2f} req/s | "
+              f"peak {best['peak_rss_mb']:.0f} MB | --max-instances ≥ {int(instances)}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--types", nargs="+", default=["text", "dialogflow", *IMAGE_SIZES],
+                        choices=["text", "dialogflow", *IMAGE_SIZES])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=40, help="Requests per type and concurrency level")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="Multiply simulated model latency, e.g. 1.0 for real-time")
+    parser.add_argument("--error-rate", type=float, help="Override the simulated error rate")
+    parser.add_argument("--memory-mb", type=float, default=512, help="Instance memory, as in deploy.sh --memory")
+    parser.add_argument("--target-rps", type=float, default=50)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    models.set_backend("simulated")
+    overrides = {"time_scale": args.time_scale}
+    if args.error_rate is not None:
+        overrides["error_rate"] = args.error_rate
+    configure_simulation(**overrides)
+
+    print("=== HawkAI Webhook Load Test (simulated Gemini) ===\n")
+    results = run(args.types, args.concurrency, args.requests)
+    capacity = capacity_report(results, args.memory_mb, args.target_rps)
+
+    if args.output:
+        save_results(args.output, "loadtest_handler", vars(args), {"runs": results, "capacity": capacity})
+    if args.baseline:
+        compare_to_baseline(args.baseline, results, key_fields=("request_type", "concurrency"))
@@ -1,6 +1,8 @@
 from typing import Dict, Any, List
 from dataclasses import dataclass
 
+from config.constants import MODEL_NAME_FLASH_2
+
 @dataclass
 class AgentConfig:
     """Configuration for individual agents"""
@@ -56,6 +58,116 @@ AGENT_CONFIGS = {
     )
 }
 
+# Alert scoring: response-time SLA per severity (seconds) and zone criticality
+ALERT_SLA_SECONDS = {
+    "critical": 60,
+    "high": 300,
+    "medium": 900,
+    "low": 3600
+}
+
+# Age raises the score by at most this many SLAs' worth, so an overdue alert always
+# ranks below a fresh alert one severity level up (weights double per level)
+ALERT_MAX_AGE_SLAS = 0.5
+
+# Live alerts expire this long after they were raised or last escalated; past the
+# cap the oldest are dropped
+ALERT_TTL_SECONDS = 1800
+ALERT_QUEUE_MAX_ALERTS = 1000
+
+ALERT_SEVERITY_WEIGHTS = {
+    "critical": 8.0,
+    "high": 4.0,
+    "medium": 2.0,
+    "low": 1.0
+}
+
+# Substring of the zone name -> multiplier; unmatched zones score 1.0
+ZONE_CRITICALITY = {
+    "main stage": 1.5,
+    "exit": 1.4,
+    "gate": 1.3,
+    "sector": 1.2,
+    "food court": 1.1,
+    "parking": 0.8
+}
+
+# Venue layout used to correlate alerts from neighbouring zones into one incident
+ZONE_ADJACENCY = {
+    "gate 1": ["gate 2", "sector a", "parking"],
+    "gate 2": ["gate 1", "gate 3", "sector a"],
+    "gate 3": ["gate 2", "gate 4", "sector b", "food court"],
+    "gate 4": ["gate 3", "sector b"],
+    "sector a": ["gate 1", "gate 2", "main stage", "sector b"],
+    "sector b": ["gate 3", "gate 4", "main stage", "sector a"],
+    "main stage": ["sector a", "sector b", "food court"],
+    "food court": ["gate 3", "main stage"],
+    "parking": ["gate 1"]
+}
+
+# Keywords used to type free-text incidents before correlation
+INCIDENT_TYPE_KEYWORDS = {
+    "fire": ["fire", "smoke", "burning", "alarm"],
+    "medical": ["medical", "injury", "injured", "unconscious", "ambulance"],
+    "crowd": ["crowd", "overcrowding", "crush", "stampede", "capacity"],
+    "weather": ["weather", "storm", "rain", "wind", "lightning", "heat"],
+    "security": ["fight", "weapon", "theft", "suspicious", "intruder"]
+}
+
+# Response plan cache: zone classes (substring -> class) and attributes that force a fresh plan
+ZONE_CLASSES = {
+    "gate": "entry_gate",
+    "exit": "egress",
+    "sector": "seating",
+    "main stage": "stage",
+    "food court": "concession",
+    "parking": "parking"
+}
+
+UNUSUAL_INCIDENT_KEYWORDS = [
+    "weapon", "explosion", "explosive", "hostage", "structural collapse", "chemical",
+    "gas leak", "shooting", "bomb", "vip"
+]
+
+# Scheduler: concurrent model-backed steps, slots reserved for critical requests,
+# and weighted shares for the other priority classes
+SCHEDULER_MAX_CONCURRENCY = 8
+SCHEDULER_RESERVED_CRITICAL = 2
+PRIORITY_WEIGHTS = {"high": 4, "medium": 2, "low": 1}
+PREEMPTIBLE_PRIORITIES = ["low", "medium"]
+
+# Requests treated as critical before the model analysis has returned
+CRITICAL_REQUEST_KEYWORDS = [
+    "fire", "evacuat", "stampede", "crush", "medical emergency", "cardiac", "unconscious",
+    "explosion", "shooting", "bomb", "gas leak", "structural collapse"
+]
+
+# Deadline budgeting: assumed stage latencies until enough calls have been measured,
+# and the specialist time a low-priority request keeps (plus synthesis) when its
+# analysis expected_response_time is shorter
+STAGE_LATENCY_DEFAULTS = {"analysis": 3.0, "synthesis": 5.0}
+STAGE_LATENCY_MIN_SAMPLES = 20
+LOW_PRIORITY_MIN_SPECIALIST_SECONDS = 8
+
+# Local answers when the deadline leaves no time for the model
+FAST_PATH_RESPONSES = {
+    "critical": ("🚨 Treat this as an emergency: alert on-site security and medical teams, clear the nearest "
+                 "exits and follow the venue evacuation plan. A full analysis will follow."),
+    "safety_monitoring": ("🛡️ Keep exit routes clear, hold entry at busy gates and have stewards report "
+                          "crowd density every 5 minutes."),
+    "data_analytics": "📊 Live analytics are unavailable right now; monitor gate counts and retry shortly.",
+    "alert_management": "🚨 Review open alerts by severity and escalate anything involving injuries first."
+}
+
+PLAN_CACHE_TTL_SECONDS = 3600
+PLAN_CACHE_MAX_ENTRIES = 256
+
+# Token budget for the coordinator's synthesis prompt
+SYNTHESIS_TOKEN_BUDGET = 1500
+
+# Token budget for the per-request context sent with each specialist call
+SPECIALIST_CONTEXT_TOKENS = 300
+
 # Routing rules for the coordinator agent
 ROUTING_RULES = {
     # Safety-related keywords
@@ -1,4 +1,5 @@
 # Project constants for HawkAI
+import os
 
 # Google Cloud configuration
 PROJECT_ID = "hawkai-467107"
@@ -9,12 +10,83 @@ MODEL_NAME_FLASH = "gemini-1.5-flash"
 MODEL_NAME_PRO = "gemini-1.5-pro"
 MODEL_NAME_FLASH_2 = "gemini-2.5-flash"
 
+# Estimated list prices in USD per 1M tokens: (input, output)
+MODEL_PRICING = {
+    MODEL_NAME_FLASH: (0.075, 0.30),
+    MODEL_NAME_PRO: (1.25, 5.00),
+    MODEL_NAME_FLASH_2: (0.30, 2.50)
+}
+
+# Retries for transient model errors (quota, unavailable, deadline)
+MODEL_CALL_MAX_RETRIES = 2
+
+# Process-wide model registry: in-flight calls allowed per model, and gRPC
+# channels shared by all vertex models in a process
+MODEL_CONCURRENCY_LIMITS = {
+    MODEL_NAME_FLASH: 256,
+    MODEL_NAME_PRO: 64,
+    MODEL_NAME_FLASH_2: 256
+}
+DEFAULT_MODEL_CONCURRENCY = 64
+MODEL_TRANSPORT_POOL_SIZE = 2
+
+# Simulated model behaviour for offline benchmarks (HAWKAI_MODEL_BACKEND=simulated)
+SIMULATED_MODEL_PROFILES = {
+    MODEL_NAME_FLASH: {"ttft_median_s": 0.35, "ttft_sigma": 0.35, "tokens_per_second": 180.0,
+                       "output_tokens_median": 150, "error_rate": 0.01},
+    MODEL_NAME_PRO: {"ttft_median_s": 0.9, "ttft_sigma": 0.45, "tokens_per_second": 60.0,
+                     "output_tokens_median": 250, "error_rate": 0.01},
+    MODEL_NAME_FLASH_2: {"ttft_median_s": 0.5, "ttft_sigma": 0.4, "tokens_per_second": 150.0,
+                         "output_tokens_median": 200, "error_rate": 0.01}
+}
+
 # Storage configuration
 BUCKET_NAME = "hawkai-feedbucket"
 
 # Function configuration
 FUNCTION_NAME = "hawkai-handler"
 
+# Dialogflow CX webhook timeout; requests are answered this much before it expires
+WEBHOOK_TIMEOUT_SECONDS = 30
+DEADLINE_SAFETY_MARGIN_SECONDS = 2.0
+
+# Agents make stateless model calls; True restores per-agent chat sessions that
+# resend their whole history with every call
+STATEFUL_CHAT_SESSIONS = False
+
+# Identical concurrent requests share one in-flight computation (single-flight)
+COALESCE_REQUESTS = True
+
+# Local data configuration, under the package directory whatever the working directory
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+INCIDENT_STORE_PATH = os.path.join(DATA_DIR, "incidents.bin")
+TRACE_DIR = os.path.join(DATA_DIR, "traces")
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+
+# Results kept in memory per history; older ones are read back from disk
+HISTORY_MEMORY_ENTRIES = 100
+# Session logs kept per history name; the oldest are deleted when a new session starts
+HISTORY_MAX_SESSIONS = 20
+
 # Set quota project to avoid authentication warnings
-import os
-os.environ['GOOGLE_CLOUD_QUOTA_PROJECT'] = PROJECT_ID
\ No newline at end of file
+os.environ['GOOGLE_CLOUD_QUOTA_PROJECT'] = PROJECT_ID
+
+# On-disk LLM response cache shared by all processes; agents opt in, or all
+# do with HAWKAI_RESPONSE_CACHE=1
+RESPONSE_CACHE_ENABLED = os.environ.get("HAWKAI_RESPONSE_CACHE", "0").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_PATH = os.environ.get("HAWKAI_RESPONSE_CACHE_PATH", os.path.join(DATA_DIR, "response_cache.sqlite"))
+RESPONSE_CACHE_TTL_SECONDS = 24 * 3600
+RESPONSE_CACHE_MAX_BYTES = 256 * 2 ** 20
+
+# Model backend: "vertex" (Vertex AI) or "simulated" (offline stand-in)
+MODEL_BACKEND = os.environ.get("HAWKAI_MODEL_BACKEND", "vertex")
+SIMULATION_SEED = int(os.environ.get("HAWKAI_SIMULATION_SEED", "42"))
+
+# Async HTTP service mode (service-main.py)
+SERVICE_HOST = "0.0.0.0"
+SERVICE_PORT = int(os.environ.get("PORT", "8080"))
+SERVICE_WORKERS = 1
+SERVICE_KEEPALIVE_SECONDS = 75
+SERVICE_MAX_BODY_BYTES = 32 * 2**20
+# Longest deadline_s a /coordinator client may ask for
+SERVICE_MAX_DEADLINE_SECONDS = 120
@@ -4,6 +4,7 @@ from vertexai.generative_models import GenerativeModel
 
 # Import project constants
 from config.constants import PROJECT_ID, LOCATION, MODEL_NAME_PRO, BUCKET_NAME
+from monitoring import tracked_call
 
 # Initialize Vertex AI
 vertexai.init(project=PROJECT_ID, location=LOCATION)
@@ -24,7 +25,7 @@ class ProjectHawkAIAgent:
         self.chat_session = self.model.start_chat()
     
     def chat(self, message):
-        response = self.chat_session.send_message(message)
+        response = tracked_call("project_hawkai_agent", MODEL_NAME_PRO, self.chat_session.send_message, message)
         return response.text
     
     def analyze_safety_condition(self, condition_description):
@@ -39,7 +40,7 @@ class ProjectHawkAIAgent:
         3. Recommended actions
         4. Monitoring suggestions
         """
-        response = self.chat_session.send_message(prompt)
+        response = tracked_call("project_hawkai_agent", MODEL_NAME_PRO, self.chat_session.send_message, prompt)
         return response.text
 
 # Create and use the agent
@@ -1,15 +1,58 @@
 import vertexai
-from vertexai.generative_models import GenerativeModel
 from google.cloud import aiplatform
 from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import contextvars
 import json
+import threading
 
 # Import project constants
-from config.constants import PROJECT_ID, LOCATION
+from config.constants import (PROJECT_ID, LOCATION, MODEL_NAME_PRO, WEBHOOK_TIMEOUT_SECONDS,
+                              DEADLINE_SAFETY_MARGIN_SECONDS)
+from config.agent_config import FAST_PATH_RESPONSES
+from monitoring import (tracked_call, request_scope, deadline_scope, remaining_time, cancellation_scope,
+                        DeadlineExpired)
+from models import init_backend, create_model
 
 # Agent configuration
 AGENT_NAME = "projectHawkAI-safety-monitor"
 
+# Model calls run here so the handler can answer before the webhook times out.
+# The SDK takes no per-call timeout, so a call the handler stops waiting for
+# keeps its thread until the model answers; the pool has room for
+# MODEL_WORKERS live calls plus MAX_ABANDONED_CALLS such stragglers.
+MODEL_WORKERS = 4
+MAX_ABANDONED_CALLS = 12
+_model_executor = ThreadPoolExecutor(max_workers=MODEL_WORKERS + MAX_ABANDONED_CALLS,
+                                     thread_name_prefix="webhook-model")
+_abandoned_lock = threading.Lock()
+abandoned_calls = {"abandoned": 0, "in_flight": 0, "skipped": 0}
+
+
+def _release_abandoned(future) -> None:
+    with _abandoned_lock:
+        abandoned_calls["in_flight"] -= 1
+
+
+def _abandon(future, cancel: threading.Event) -> None:
+    """Stop waiting for a model call; it holds a pool thread (and is counted) until it returns"""
+    cancel.set()  # no further retries
+    if future.cancel() or future.done():
+        return
+    with _abandoned_lock:
+        abandoned_calls["abandoned"] += 1
+        abandoned_calls["in_flight"] += 1
+    future.add_done_callback(_release_abandoned)
+
+
+def _pool_saturated() -> bool:
+    """True when stragglers fill the headroom, so a new call would queue behind them"""
+    with _abandoned_lock:
+        if abandoned_calls["in_flight"] < MAX_ABANDONED_CALLS:
+            return False
+        abandoned_calls["skipped"] += 1
+        return True
+
 class VertexAgentDeployer:
     """
     Deploy ProjectHawkAI multi-agent system to Vertex AI Agent Builder
@@ -127,7 +170,7 @@ class VertexAgentDeployer:
                 },
                 "allowed_ca_certs": []
             },
-            "timeout": "30s",
+            "timeout": f"{WEBHOOK_TIMEOUT_SECONDS}s",
             "disabled": False
         }
         
@@ -139,11 +182,11 @@ class ProjectHawkAIAgentHandler:
     """
     
     def __init__(self):
-        vertexai.init(project=PROJECT_ID, location=LOCATION)
+        init_backend(PROJECT_ID, LOCATION)
         
         # Initialize the coordinator model
-        self.model = GenerativeModel(
-            model_name="gemini-1.5-pro",
+        self.model = create_model(
+            model_name=MODEL_NAME_PRO,
             system_instruction="""
             You are ProjectHawkAI Coordinator for Vertex AI Agent Builder.
             
@@ -202,7 +245,25 @@ class ProjectHawkAIAgentHandler:
             Provide structured analysis focusing on the {agent_type} perspective.
             """
             
-            response = self.chat_session.send_message(enhanced_prompt)
+            with request_scope(session_id or None), \
+                    deadline_scope(WEBHOOK_TIMEOUT_SECONDS - DEADLINE_SAFETY_MARGIN_SECONDS):
+                cancel = threading.Event()
+                with cancellation_scope(cancel):
+                    context = contextvars.copy_context()
+                future = None if _pool_saturated() else _model_executor.submit(
+                    context.run, tracked_call, "webhook_handler", MODEL_NAME_PRO,
+                    self.chat_session.send_message, enhanced_prompt)
+                try:
+                    if future is None:
+                        raise DeadlineExpired("Model pool is held by abandoned calls")
+                    response_text = future.result(timeout=remaining_time()).text
+                    degradation = "full"
+                except (FutureTimeout, DeadlineExpired):
+                    if future is not None:
+                        _abandon(future, cancel)
+                    # Local fast-path answer rather than a missed webhook timeout
+                    response_text = FAST_PATH_RESPONSES.get(agent_type, FAST_PATH_RESPONSES["safety_monitoring"])
+                    degradation = "fast_path"
             
             # Return Dialogflow CX response format
             return {
@@ -210,7 +271,7 @@ class ProjectHawkAIAgentHandler:
                     "messages": [
                         {
                             "text": {
-                                "text": [response.text]
+                                "text": [response_text]
                             }
                         }
                     ]
@@ -218,7 +279,8 @@ class ProjectHawkAIAgentHandler:
                 "session_info": {
                     "parameters": {
                         "agent_type": agent_type,
-                        "processing_time": "< 3s"
+                        "processing_time": "< 3s",
+                        "degradation": degradation
                     }
                 }
             }
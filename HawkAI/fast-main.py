@@ -1,13 +1,14 @@
 # fast_main.py - Ultra-fast version with Gemini Flash
 import asyncio
 import json
+import time
 from datetime import datetime
-import vertexai
-from vertexai.generative_models import GenerativeModel
 from typing import Dict, Any
 
 # Import project constants
 from config.constants import PROJECT_ID, LOCATION, MODEL_NAME_FLASH, MODEL_NAME_FLASH_2, MODEL_NAME_FLASH_2
+from monitoring import tracked_call, request_scope, usage_tracker, HistoryLog, with_usage_totals
+from models import init_backend, create_model, start_session
 
 class FastCoordinatorAgent:
     """
@@ -19,10 +20,10 @@ class FastCoordinatorAgent:
         self.location = location
         
         # Initialize Vertex AI
-        vertexai.init(project=project_id, location=location)
+        init_backend(project_id, location)
         
         # Use Gemini Flash for speed
-        self.model = GenerativeModel(
+        self.model = create_model(
             model_name=MODEL_NAME_FLASH,
             system_instruction="""
             You are ProjectHawkAI - AI for event safety monitoring.
@@ -39,39 +40,50 @@ class FastCoordinatorAgent:
             """
         )
         
-        self.chat_session = self.model.start_chat()
-        self.conversation_history = []
+        # Stateless calls unless STATEFUL_CHAT_SESSIONS is set
+        self.chat_session = start_session(self.model)
+        self.conversation_history = HistoryLog("fast_conversation")
+    
+    def _model_call(self, prompt: str):
+        if self.chat_session is not None:
+            return self.chat_session.send_message(prompt)
+        return self.model.generate_content(prompt)
     
     async def process_request(self, user_prompt: str) -> Dict[str, Any]:
         """
         Process request with minimal latency
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Minimal prompt for speed
         prompt = f"Analyze: {user_prompt}"
         
-        try:
-            response = self.chat_session.send_message(prompt)
-            
-            result = {
-                "user_request": user_prompt,
-                "response": response.text,
-                "processing_time": (datetime.now() - start_time).total_seconds(),
-                "timestamp": datetime.now().isoformat(),
-                "model": MODEL_NAME_FLASH_2
-            }
-            
-            self.conversation_history.append(result)
-            return result
-            
-        except Exception as e:
-            return {
-                "user_request": user_prompt,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat(),
-                "processing_time": (datetime.now() - start_time).total_seconds()
-            }
+        with request_scope() as request_id:
+            try:
+                response = tracked_call("fast_coordinator", MODEL_NAME_FLASH, self._model_call, prompt)
+                
+                result = {
+                    "request_id": request_id,
+                    "user_request": user_prompt,
+                    "response": response.text,
+                    "processing_time": time.perf_counter() - start_time,
+                    "timestamp": datetime.now().isoformat(),
+                    "model": MODEL_NAME_FLASH,
+                    "usage": usage_tracker.request_usage(request_id)
+                }
+                
+                usage_tracker.record_request_latency("fast", result['processing_time'])
+                self.conversation_history.append(result)
+                return result
+                
+            except Exception as e:
+                return {
+                    "request_id": request_id,
+                    "user_request": user_prompt,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat(),
+                    "processing_time": time.perf_counter() - start_time
+                }
 
 class FastProjectHawkAISystem:
     """
@@ -80,7 +92,8 @@ class FastProjectHawkAISystem:
     
     def __init__(self):
         self.coordinator = FastCoordinatorAgent(PROJECT_ID, LOCATION)
-        self.session_history = []
+        # Running token/cost totals cover the whole session, not just the in-memory window
+        self.session_history = HistoryLog("fast_session", numeric_fields=("processing_time", "tokens", "cost_usd"))
     
     async def process_prompt(self, user_prompt: str) -> Dict[str, Any]:
         """
@@ -93,7 +106,7 @@ class FastProjectHawkAISystem:
             result = await self.coordinator.process_request(user_prompt)
             
             self._display_results(result)
-            self.session_history.append(result)
+            self.session_history.append(with_usage_totals(result))
             
             return result
             
@@ -125,12 +138,18 @@ class FastProjectHawkAISystem:
             return {"message": "No requests processed yet"}
         
         total_requests = len(self.session_history)
-        avg_processing_time = sum(r['processing_time'] for r in self.session_history) / total_requests
+        avg_processing_time = self.session_history.mean('processing_time')
+        tokens_per_request = self.session_history.mean('tokens')
         
         return {
             "total_requests": total_requests,
             "average_processing_time": f"{avg_processing_time:.2f}s",
-            "model_used": MODEL_NAME_FLASH_2,
+            "model_used": MODEL_NAME_FLASH,
+            "tokens_per_request": round(tokens_per_request, 1) if tokens_per_request is not None else 0,
+            "estimated_cost_usd": round(self.session_history.total('cost_usd'), 6),
+            "usage_by_agent": usage_tracker.summary()['by_agent'],
+            "latency_ms": usage_tracker.latency_percentiles("mode/fast").get("mode/fast", {}),
+            "model_latency_by_agent_ms": usage_tracker.latency_percentiles("agent/"),
             "session_start": self.session_history[0]['timestamp'] if self.session_history else None
         }
 
@@ -1,18 +1,20 @@
+import hashlib
 import json
 import functions_framework
-import vertexai
-from vertexai.generative_models import GenerativeModel
+from typing import Optional
 
 # Import project constants
 from config.constants import PROJECT_ID, LOCATION, MODEL_NAME_FLASH, MODEL_NAME_FLASH_2 as MODEL_NAME
+from monitoring import tracked_call, tracked_call_async, request_scope, tracer, SingleFlight, normalize_key
+from models import init_backend, create_model, start_session, ResponseCache
 
 class HawkAIAgent:
     """HawkAI agent for Vertex AI Agent Builder"""
     
-    def __init__(self):
-        vertexai.init(project=PROJECT_ID, location=LOCATION)
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
+        init_backend(PROJECT_ID, LOCATION)
         
-        self.model = GenerativeModel(
+        self.model = create_model(
             model_name=MODEL_NAME,
             system_instruction="""
             You are ProjectHawkAI - AI for event safety monitoring.
@@ -26,36 +28,68 @@ class HawkAIAgent:
             💡 RECOMMENDATION: [1-2 sentence action plan]
             
             Be extremely concise. No fluff. Safety first.
-            """
+            """,
+            cache=response_cache
         )
         
-        self.chat_session = self.model.start_chat()
+        # Each prompt is self-contained; a shared chat would resend every earlier request
+        self.chat_session = start_session(self.model)
+        
+        # Identical concurrent requests share one model call
+        self.flight = SingleFlight("webhook_requests")
+    
+    def build_prompt(self, user_query: str, intent_name: str = "", image_data: str = "") -> str:
+        focus_map = {
+            "safety": "Focus on crowd safety, infrastructure risks, and immediate hazards",
+            "analytics": "Focus on data patterns, trends, and predictive insights", 
+            "alert": "Focus on emergency response, prioritization, and escalation",
+            "general": "Provide comprehensive safety analysis"
+        }
+        
+        agent_focus = "general"
+        for key in focus_map.keys():
+            if key in intent_name.lower():
+                agent_focus = key
+                break
+        
+        return f"""
+        Request: {user_query}
+        Focus: {focus_map[agent_focus]}
+        {f'Image Data: {image_data}' if image_data else ''}
+        
+        Provide structured analysis for HawkAI event safety monitoring.
+        """
+    
+    def coalescing_key(self, user_query: str, intent_name: str = "", image_data: str = "") -> str:
+        """Requests with the same normalized query, focus and image get the same answer"""
+        prompt = self.build_prompt(normalize_key(user_query), intent_name, image_data)
+        return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
     
     def analyze_request(self, user_query: str, intent_name: str = "", image_data: str = "") -> str:
         """Analyze user request and provide structured response"""
+        key = self.coalescing_key(user_query, intent_name, image_data)
+        return self.flight.do(key, self._analyze_once, user_query, intent_name, image_data)[0]
+    
+    async def analyze_request_async(self, user_query: str, intent_name: str = "", image_data: str = "") -> str:
+        """analyze_request for the async service: no thread is held while the model runs"""
+        key = self.coalescing_key(user_query, intent_name, image_data)
+        return (await self.flight.do_async(key, self._analyze_once_async, user_query, intent_name, image_data))[0]
+    
+    def _analyze_once(self, user_query: str, intent_name: str = "", image_data: str = "") -> str:
         try:
-            focus_map = {
-                "safety": "Focus on crowd safety, infrastructure risks, and immediate hazards",
-                "analytics": "Focus on data patterns, trends, and predictive insights", 
-                "alert": "Focus on emergency response, prioritization, and escalation",
-                "general": "Provide comprehensive safety analysis"
-            }
-            
-            agent_focus = "general"
-            for key in focus_map.keys():
-                if key in intent_name.lower():
-                    agent_focus = key
-                    break
-            
-            prompt = f"""
-            Request: {user_query}
-            Focus: {focus_map[agent_focus]}
-            {f'Image Data: {image_data}' if image_data else ''}
-            
-            Provide structured analysis for HawkAI event safety monitoring.
-            """
+            prompt = self.build_prompt(user_query, intent_name, image_data)
+            call = self.chat_session.send_message if self.chat_session else self.model.generate_content
+            response = tracked_call("hawkai_agent", MODEL_NAME, call, prompt)
+            return response.text
             
-            response = self.chat_session.send_message(prompt)
+        except Exception as e:
+            return f"🚨 HawkAI Analysis Error: {str(e)}. Please provide more details or try again."
+    
+    async def _analyze_once_async(self, user_query: str, intent_name: str = "", image_data: str = "") -> str:
+        try:
+            prompt = self.build_prompt(user_query, intent_name, image_data)
+            call = self.chat_session.send_message_async if self.chat_session else self.model.generate_content_async
+            response = await tracked_call_async("hawkai_agent", MODEL_NAME, call, prompt)
             return response.text
             
         except Exception as e:
@@ -64,118 +98,127 @@ class HawkAIAgent:
 # Initialize agent
 agent = HawkAIAgent()
 
+PREFLIGHT_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Max-Age': '3600'
+}
+
+RESPONSE_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Content-Type': 'application/json'
+}
+
+
+def fulfillment_response(text: str) -> dict:
+    """Dialogflow compatible response"""
+    return {
+        "fulfillment_response": {
+            "messages": [
+                {
+                    "text": {
+                        "text": [text]
+                    }
+                }
+            ]
+        }
+    }
+
+
+def parse_fulfillment_request(request_json: dict) -> tuple:
+    """User query, intent name and preprocessed image from a webhook request"""
+    # Extract user query and intent
+    user_query = ""
+    intent_name = ""
+    
+    if 'text' in request_json:
+        user_query = request_json['text']
+    elif 'queryResult' in request_json:
+        user_query = request_json['queryResult'].get('queryText', '')
+        intent_name = request_json['queryResult'].get('intent', {}).get('displayName', '')
+    elif 'query' in request_json:
+        user_query = request_json['query']
+
+    request_image = ""
+    if 'image' in request_json:
+        request_image = preprocess_image(request_json['image'])
+    
+    if not user_query:
+        user_query = "General safety status check"
+    
+    return user_query, intent_name, request_image
+
+
+def preprocess_image(image_field) -> str:
+    """Process image bytes to a downscaled JPEG data URI"""
+    import base64
+    import io
+    from PIL import Image
+    
+    with tracer.span("image_preprocessing") as span:
+        try:
+            # Decode base64 image data if it's in that format
+            if isinstance(image_field, str) and image_field.startswith('data:image'):
+                # Extract the base64 part
+                image_data = image_field.split(',')[1]
+                image_bytes = base64.b64decode(image_data)
+            else:
+                # Assume it's already bytes
+                image_bytes = image_field
+            
+            # Create image from bytes
+            image = Image.open(io.BytesIO(image_bytes))
+            span.set_attribute("input_bytes", len(image_bytes))
+            span.set_attribute("input_size", image.size)
+            
+            # Process image (resize if needed)
+            max_size = (1024, 1024)  # Maximum dimensions
+            image.thumbnail(max_size, Image.LANCZOS)
+            
+            # Save processed image to bytes
+            img_byte_arr = io.BytesIO()
+            image.save(img_byte_arr, format='JPEG')
+            
+            # Convert back to base64 for model input
+            processed_image = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+            span.set_attribute("output_size", image.size)
+            span.set_attribute("output_bytes", img_byte_arr.tell())
+            return f"data:image/jpeg;base64,{processed_image}"
+        except Exception as e:
+            print(f"Error processing image: {str(e)}")
+            span.set_attribute("error", str(e))
+            return "[Error processing image]"
+
+
 @functions_framework.http
+@tracer.traced("projectHawkAI_handler")
 def projectHawkAI_handler(request):
     """Cloud Function entry point for Vertex AI Agent Builder webhook"""
     
     # Handle CORS
     if request.method == 'OPTIONS':
-        headers = {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST',
-            'Access-Control-Allow-Headers': 'Content-Type',
-            'Access-Control-Max-Age': '3600'
-        }
-        return ('', 204, headers)
+        return ('', 204, PREFLIGHT_HEADERS)
     
-    headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Content-Type': 'application/json'
-    }
+    headers = RESPONSE_HEADERS
     
     try:
         if request.method == 'POST':
             request_json = request.get_json(silent=True)
             
             if not request_json:
-                return json.dumps({
-                    "fulfillment_response": {
-                        "messages": [{"text": {"text": ["No request data received"]}}]
-                    }
-                }), 400, headers
-            
-            # Extract user query and intent
-            user_query = ""
-            intent_name = ""
-            
-            if 'text' in request_json:
-                user_query = request_json['text']
-            elif 'queryResult' in request_json:
-                user_query = request_json['queryResult'].get('queryText', '')
-                intent_name = request_json['queryResult'].get('intent', {}).get('displayName', '')
-            elif 'query' in request_json:
-                user_query = request_json['query']
-
-            request_image = ""
-            if 'image' in request_json:
-                # Process image bytes to JPEG
-                import base64
-                import io
-                from PIL import Image
-                
-                try:
-                    # Decode base64 image data if it's in that format
-                    if isinstance(request_json['image'], str) and request_json['image'].startswith('data:image'):
-                        # Extract the base64 part
-                        image_data = request_json['image'].split(',')[1]
-                        image_bytes = base64.b64decode(image_data)
-                    else:
-                        # Assume it's already bytes
-                        image_bytes = request_json['image']
-                    
-                    # Create image from bytes
-                    image = Image.open(io.BytesIO(image_bytes))
-                    
-                    # Process image (resize if needed)
-                    max_size = (1024, 1024)  # Maximum dimensions
-                    image.thumbnail(max_size, Image.LANCZOS)
-                    
-                    # Save processed image to bytes
-                    img_byte_arr = io.BytesIO()
-                    image.save(img_byte_arr, format='JPEG')
-                    
-                    # Convert back to base64 for model input
-                    processed_image = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
-                    request_image = f"data:image/jpeg;base64,{processed_image}"
-                except Exception as e:
-                    print(f"Error processing image: {str(e)}")
-                    request_image = "[Error processing image]"
+                return json.dumps(fulfillment_response("No request data received")), 400, headers
             
-            if not user_query:
-                user_query = "General safety status check"
+            user_query, intent_name, request_image = parse_fulfillment_request(request_json)
             
             # Process with HawkAI agent
-            response_text = agent.analyze_request(user_query, intent_name, request_image)
-            
-            # Return Dialogflow compatible response
-            response_data = {
-                "fulfillment_response": {
-                    "messages": [
-                        {
-                            "text": {
-                                "text": [response_text]
-                            }
-                        }
-                    ]
-                }
-            }
+            with request_scope() as request_id, tracer.span("analyze_request", request_id=request_id):
+                response_text = agent.analyze_request(user_query, intent_name, request_image)
             
-            return json.dumps(response_data), 200, headers
+            return json.dumps(fulfillment_response(response_text)), 200, headers
         
         else:
             return json.dumps({"error": "Only POST method supported"}), 405, headers
             
     except Exception as e:
-        error_response = {
-            "fulfillment_response": {
-                "messages": [
-                    {
-                        "text": {
-                            "text": [f"🚨 HawkAI System Error: {str(e)}"]
-                        }
-                    }
-                ]
-            }
-        }
-        
-        return json.dumps(error_response), 500, headers
\ No newline at end of file
+        return json.dumps(fulfillment_response(f"🚨 HawkAI System Error: {str(e)}")), 500, headers
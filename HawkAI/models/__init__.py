@@ -0,0 +1,56 @@
+# models/__init__.py
+from typing import Optional, Union
+
+from config.constants import MODEL_BACKEND, RESPONSE_CACHE_ENABLED, STATEFUL_CHAT_SESSIONS
+from .simulated import SimulatedGenerativeModel, SimulatedChatSession, SimulationProfile, configure_simulation
+from .registry import ModelRegistry, ModelHandle, ModelLimiter, model_registry
+from .response_cache import ResponseCache, CachedModel, CachedResponse, cache_key, response_cache
+
+_backend = MODEL_BACKEND
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(backend: str) -> None:
+    """Switch between "vertex" and "simulated" before agents are created"""
+    global _backend
+    if backend not in ("vertex", "simulated"):
+        raise ValueError(f"Unknown model backend: {backend}")
+    _backend = backend
+
+
+def init_backend(project_id: str, location: str) -> None:
+    """Initialize Vertex AI once per process; a no-op for the simulated backend"""
+    if _backend == "vertex":
+        model_registry.init(project_id, location)
+
+
+def create_model(model_name: str, system_instruction: Optional[str] = None,
+                 cache: Union[bool, ResponseCache, None] = None):
+    """
+    Shared model handle for the configured backend (HAWKAI_MODEL_BACKEND).
+    `cache` answers repeated calls from the on-disk response cache: True
+    for the default cache, or a ResponseCache; None follows
+    HAWKAI_RESPONSE_CACHE.
+    """
+    handle = model_registry.get(model_name, system_instruction, backend=_backend)
+    if cache is None:
+        cache = RESPONSE_CACHE_ENABLED
+    if cache is True:
+        cache = response_cache()
+    return CachedModel(handle, cache) if cache else handle
+
+
+def start_session(model):
+    """A chat session only when STATEFUL_CHAT_SESSIONS opts back into resending history"""
+    return model.start_chat() if STATEFUL_CHAT_SESSIONS else None
+
+
+__all__ = [
+    'get_backend', 'set_backend', 'init_backend', 'create_model', 'start_session',
+    'SimulatedGenerativeModel', 'SimulatedChatSession', 'SimulationProfile', 'configure_simulation',
+    'ModelRegistry', 'ModelHandle', 'ModelLimiter', 'model_registry',
+    'ResponseCache', 'CachedModel', 'CachedResponse', 'cache_key', 'response_cache'
+]
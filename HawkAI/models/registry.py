@@ -0,0 +1,294 @@
+# models/registry.py
+import asyncio
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.constants import MODEL_CONCURRENCY_LIMITS, DEFAULT_MODEL_CONCURRENCY, MODEL_TRANSPORT_POOL_SIZE
+from .simulated import SimulatedGenerativeModel
+
+
+class ModelLimiter:
+    """
+    Cap on in-flight calls to one model, shared by every handle of that model.
+
+    Threads and coroutines wait in one FIFO queue and `release` hands the
+    slot straight to the next waiter: a thread blocks on its own event, a
+    coroutine awaits a future on its loop, so async waiters hold no thread
+    and a cancelled one simply leaves the queue.
+    """
+
+    def __init__(self, model_name: str, limit: int):
+        self.model_name = model_name
+        self.limit = limit
+        self._free = limit
+        self._waiters: deque = deque()  # threading.Event, or (loop, asyncio.Future)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.waits = 0
+
+    def _acquired(self) -> None:
+        # Called with the lock held
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                self._acquired()
+                return
+            self.waits += 1
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free:
+                self._free -= 1
+                self._acquired()
+                return
+            self.waits += 1
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                # Granted just before the cancellation: pass the slot on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    self._acquired()
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if future.cancelled():
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                except RuntimeError:
+                    continue  # its loop is closed
+                self._acquired()
+                return
+            self._free += 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        # On the waiter's loop; a waiter cancelled since the hand-off passes the slot on
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    @contextmanager
+    def hold(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"limit": self.limit, "in_flight": self.in_flight, "peak": self.peak, "waits": self.waits}
+
+
+def _limited_stream(limiter: ModelLimiter, call, *args, **kwargs):
+    """Hold a slot until the stream is consumed or closed"""
+    with limiter.hold():
+        yield from call(*args, **kwargs)
+
+
+class LimitedChatSession:
+    """Chat session whose messages go through the model's limiter"""
+
+    def __init__(self, session, limiter: ModelLimiter):
+        self._session = session
+        self._limiter = limiter
+
+    def send_message(self, content, *args, stream: bool = False, **kwargs):
+        if stream:
+            return _limited_stream(self._limiter, self._session.send_message, content, *args, stream=True, **kwargs)
+        with self._limiter.hold():
+            return self._session.send_message(content, *args, **kwargs)
+
+    async def send_message_async(self, content, *args, **kwargs):
+        await self._limiter.acquire_async()
+        try:
+            return await self._session.send_message_async(content, *args, **kwargs)
+        finally:
+            self._limiter.release()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class ModelHandle:
+    """
+    Shared client for one (model, system instruction) pair. Agents use it
+    like a GenerativeModel; calls wait for a slot under the model's
+    concurrency limit, anything else goes straight to the client.
+    """
+
+    def __init__(self, client, model_name: str, system_instruction: Optional[str], limiter: ModelLimiter):
+        self.client = client
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.limiter = limiter
+
+    def generate_content(self, contents, *args, stream: bool = False, **kwargs):
+        if stream:
+            return _limited_stream(self.limiter, self.client.generate_content, contents, *args, stream=True, **kwargs)
+        with self.limiter.hold():
+            return self.client.generate_content(contents, *args, **kwargs)
+
+    async def generate_content_async(self, contents, *args, **kwargs):
+        await self.limiter.acquire_async()
+        try:
+            return await self.client.generate_content_async(contents, *args, **kwargs)
+        finally:
+            self.limiter.release()
+
+    def start_chat(self, **kwargs) -> LimitedChatSession:
+        return LimitedChatSession(self.client.start_chat(**kwargs), self.limiter)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+class ModelRegistry:
+    """
+    Process-wide model clients. Agents ask for a handle instead of building
+    their own GenerativeModel, so each (model, system instruction) pair is
+    created once per process, Vertex AI is initialized once per project and
+    location, and vertex models share a small pool of gRPC channels instead
+    of opening one each. With `enabled=False` every lookup builds a new
+    client, as agents did before the registry.
+    """
+
+    def __init__(self, pool_size: int = MODEL_TRANSPORT_POOL_SIZE, enabled: bool = True):
+        self.pool_size = pool_size
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._handles: Dict[Tuple[str, str, Optional[str]], ModelHandle] = {}
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._transports: Dict[str, List[Any]] = {}
+        self._assigned = 0
+        self._initialized: Optional[Tuple[str, str]] = None
+        self.lookups = 0
+        self.created = 0
+
+    def init(self, project_id: str, location: str) -> None:
+        """vertexai.init once; later calls for the same project and location are no-ops"""
+        with self._lock:
+            if self._initialized == (project_id, location):
+                return
+            import vertexai
+            vertexai.init(project=project_id, location=location)
+            self._initialized = (project_id, location)
+
+    def limiter(self, model_name: str) -> ModelLimiter:
+        with self._lock:
+            return self._limiter(model_name)
+
+    def _limiter(self, model_name: str) -> ModelLimiter:
+        limiter = self._limiters.get(model_name)
+        if limiter is None:
+            limit = MODEL_CONCURRENCY_LIMITS.get(model_name, DEFAULT_MODEL_CONCURRENCY)
+            limiter = self._limiters[model_name] = ModelLimiter(model_name, limit)
+        return limiter
+
+    def get(self, model_name: str, system_instruction: Optional[str] = None,
+            backend: str = "vertex") -> ModelHandle:
+        """The process's handle for this model and system instruction, created on first use"""
+        key = (backend, model_name, system_instruction)
+        with self._lock:
+            self.lookups += 1
+            if not self.enabled:
+                self.created += 1
+                return ModelHandle(self._create_client(backend, model_name, system_instruction), model_name,
+                                   system_instruction, self._limiter(model_name))
+            handle = self._handles.get(key)
+            if handle is None:
+                client = self._create_client(backend, model_name, system_instruction)
+                handle = self._handles[key] = ModelHandle(client, model_name, system_instruction,
+                                                          self._limiter(model_name))
+                self.created += 1
+            return handle
+
+    def _create_client(self, backend: str, model_name: str, system_instruction: Optional[str]):
+        if backend == "simulated":
+            return SimulatedGenerativeModel(model_name, system_instruction=system_instruction)
+        from vertexai.generative_models import GenerativeModel
+        model = GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+        if self.enabled:
+            self._attach_transport(model)
+        return model
+
+    def _attach_transport(self, model) -> None:
+        """
+        Give the model a prediction client from the pool. GenerativeModel
+        caches its client (and gRPC channel) in the `_prediction_client`
+        cached_property, so seeding the instance dict shares the channel.
+        The async client is left per model: grpc.aio channels are bound to
+        the event loop that created them.
+        """
+        if "_prediction_client" in vars(model):
+            return
+        from google.cloud.aiplatform import initializer
+        pool = self._transports.setdefault(initializer.global_config.location, [])
+        if len(pool) < self.pool_size:
+            try:
+                pool.append(model._prediction_client)
+            except Exception:
+                # No credentials yet: the model builds its own client on first call, as before
+                pass
+            return
+        model.__dict__["_prediction_client"] = pool[self._assigned % len(pool)]
+        self._assigned += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._handles),
+                "lookups": self.lookups,
+                "reused": self.lookups - self.created,
+                "transports": sum(len(pool) for pool in self._transports.values()),
+                "limits": {name: limiter.stats() for name, limiter in self._limiters.items()}
+            }
+
+    def clear(self) -> None:
+        """Drop every handle and pooled channel, e.g. between benchmark runs"""
+        with self._lock:
+            self._handles.clear()
+            self._limiters.clear()
+            self._transports.clear()
+            self._assigned = 0
+            self.lookups = self.created = 0
+
+    def _after_fork(self) -> None:
+        # The parent's lock may have been held by another thread at fork time
+        self._lock = threading.Lock()
+        self.clear()
+
+
+model_registry = ModelRegistry()
+
+# gRPC channels must not be shared across fork; forked service workers start with an empty registry
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=model_registry._after_fork)
@@ -0,0 +1,403 @@
+# models/response_cache.py
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional, Union
+
+from config.constants import RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_BYTES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,
+    model TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    body BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+# Check the size bound every this many writes
+EVICTION_INTERVAL = 64
+
+
+def _digest(*parts: Any) -> bytes:
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.digest()
+
+
+def _prompt_text(contents) -> str:
+    return contents if isinstance(contents, str) else "\n".join(str(part) for part in contents)
+
+
+def _part_bytes(part) -> Optional[bytes]:
+    """Stable serialization of one prompt part, or None when it has none (e.g. a repr with an address)"""
+    if isinstance(part, str):
+        return b"text:" + part.encode("utf-8")
+    if isinstance(part, bytes):
+        return b"bytes:" + part
+    # vertexai Image keeps its bytes in _image_bytes; Part.to_dict() carries inline data base64-encoded
+    data = getattr(part, "_image_bytes", None)
+    if isinstance(data, bytes):
+        return b"image:" + data
+    if hasattr(part, "to_dict"):
+        return b"dict:" + json.dumps(part.to_dict(), sort_keys=True, default=str).encode("utf-8")
+    return None
+
+
+def _prompt_key(contents) -> Optional[Union[str, bytes]]:
+    """What a call's prompt is keyed by: the text itself, or a digest of every part; None when not cacheable"""
+    if isinstance(contents, str):
+        return contents
+    parts = [_part_bytes(part) for part in (contents if isinstance(contents, (list, tuple)) else [contents])]
+    return None if any(part is None for part in parts) else _digest(*parts)
+
+
+def _config_text(generation_config) -> str:
+    if generation_config is None:
+        return ""
+    if hasattr(generation_config, "to_dict"):
+        generation_config = generation_config.to_dict()
+    return json.dumps(generation_config, sort_keys=True, default=str)
+
+
+def cache_key(model_name: str, system_instruction: Optional[str], prompt: Union[str, bytes],
+              generation_config=None, context: bytes = b"") -> bytes:
+    """Content address of a call: model, system instruction hash, generation config, context and prompt hash"""
+    return _digest(model_name, _digest(system_instruction or ""), _config_text(generation_config),
+                   context, _digest(prompt))
+
+
+class _CachedUsage:
+    __slots__ = ("prompt_token_count", "candidates_token_count", "total_token_count")
+
+    def __init__(self):
+        # Nothing was billed for a cached answer
+        self.prompt_token_count = self.candidates_token_count = self.total_token_count = 0
+
+
+class _CachedPart:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _CachedContent:
+    __slots__ = ("role", "parts")
+
+    def __init__(self, text: str):
+        self.role = "model"
+        self.parts = [_CachedPart(text)]
+
+
+class _CachedCandidate:
+    __slots__ = ("index", "content", "finish_reason", "text")
+
+    def __init__(self, text: str):
+        self.index = 0
+        self.content = _CachedContent(text)
+        # Only completed answers are cached
+        self.finish_reason = "STOP"
+        self.text = text
+
+
+class CachedResponse:
+    """A response served from the cache: text, one candidate holding it, and zero usage"""
+
+    cached = True
+
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = [_CachedCandidate(text)]
+        self.usage_metadata = _CachedUsage()
+
+
+def _usage(response) -> tuple:
+    usage = getattr(response, "usage_metadata", None)
+    return (getattr(usage, "prompt_token_count", 0) or 0, getattr(usage, "candidates_token_count", 0) or 0)
+
+
+class ResponseCache:
+    """
+    Content-addressed LLM response cache in SQLite, shared by every process
+    on the machine. Entries expire after a TTL; once the file holds more
+    than `max_bytes` of responses the least recently read are evicted.
+    Response text is stored zlib-compressed. WAL mode lets readers in
+    other processes proceed while one process writes.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+                 max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        """One connection per thread and process; SQLite connections must not cross a fork"""
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        db = self._db()
+        row = db.execute("SELECT expires, prompt_tokens, output_tokens, body FROM responses WHERE key = ?",
+                         (key,)).fetchone()
+        now = time.time()
+        if row is None or row[0] < now:
+            with self._lock:
+                self.misses += 1
+                self.expirations += row is not None
+            if row is not None:
+                db.execute("DELETE FROM responses WHERE key = ? AND expires < ?", (key, now))
+            return None
+        db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        with self._lock:
+            self.hits += 1
+            self.tokens_saved += row[1] + row[2]
+        return CachedResponse(zlib.decompress(row[3]).decode("utf-8"))
+
+    def put(self, key: bytes, model_name: str, text: str, prompt_tokens: int = 0, output_tokens: int = 0,
+            ttl_seconds: Optional[float] = None) -> None:
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        expires = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                   (key, model_name, now, expires, now, len(body), prompt_tokens, output_tokens, body))
+        with self._lock:
+            self._writes += 1
+            check = self._writes % EVICTION_INTERVAL == 1
+        if check:
+            self.evict()
+
+    def store(self, key: bytes, model_name: str, response) -> None:
+        """Cache a model response; failures to write never fail the call"""
+        if getattr(response, "cached", False):
+            return
+        try:
+            # Vertex raises ValueError for blocked or empty candidates
+            text = response.text
+            if text:
+                self.put(key, model_name, text, *_usage(response))
+        except (ValueError, AttributeError, sqlite3.Error):
+            pass
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently read ones until under max_bytes"""
+        db = self._db()
+        removed = db.execute("DELETE FROM responses WHERE expires < ?", (time.time(),)).rowcount
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess > 0:
+            cutoff, freed = None, 0
+            for accessed, size in db.execute("SELECT accessed, size FROM responses ORDER BY accessed"):
+                cutoff, freed = accessed, freed + size
+                if freed >= excess + self.max_bytes // 10:
+                    break
+            removed += db.execute("DELETE FROM responses WHERE accessed <= ?", (cutoff,)).rowcount
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        self._db().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        entries, stored = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "stored_bytes": stored,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "tokens_saved": self.tokens_saved
+            }
+
+
+def _replay(response):
+    """A cached answer as a one-chunk stream"""
+    yield response
+
+
+def _recording_stream(cache: ResponseCache, key: bytes, model_name: str, chunks, on_complete=None):
+    """Pass chunks through and cache the full text once the stream completes"""
+    parts, last = [], None
+    for chunk in chunks:
+        parts.append(chunk.text)
+        last = chunk
+        yield chunk
+    text = "".join(parts)
+    if text:
+        prompt_tokens, output_tokens = _usage(last)
+        try:
+            cache.put(key, model_name, text, prompt_tokens, output_tokens)
+        except sqlite3.Error:
+            pass
+    if on_complete:
+        on_complete(text)
+
+
+class CachedModel:
+    """
+    Model (or registry handle) whose calls are answered from a
+    ResponseCache when the same model, system instruction, generation
+    config and prompt were seen before. Chat sessions fold the
+    conversation so far into the key, so a hit is only possible for the
+    same exchange. Prompts with a part that has no stable serialization
+    bypass the cache.
+    """
+
+    def __init__(self, model, cache: ResponseCache):
+        self.model = model
+        self.cache = cache
+        self.model_name = model.model_name
+        self.system_instruction = getattr(model, "system_instruction", None)
+
+    def _key(self, contents, generation_config, context: bytes = b"") -> Optional[bytes]:
+        prompt = _prompt_key(contents)
+        if prompt is None:
+            return None
+        return cache_key(self.model_name, self.system_instruction, prompt, generation_config, context)
+
+    def generate_content(self, contents, generation_config=None, stream: bool = False, **kwargs):
+        key = self._key(contents, generation_config)
+        if key is None:
+            return self.model.generate_content(contents, generation_config=generation_config, stream=stream, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _replay(cached) if stream else cached
+        response = self.model.generate_content(contents, generation_config=generation_config, stream=stream, **kwargs)
+        if stream:
+            return _recording_stream(self.cache, key, self.model_name, response)
+        self.cache.store(key, self.model_name, response)
+        return response
+
+    async def generate_content_async(self, contents, generation_config=None, **kwargs):
+        key = self._key(contents, generation_config)
+        if key is None:
+            return await self.model.generate_content_async(contents, generation_config=generation_config, **kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.model.generate_content_async(contents, generation_config=generation_config, **kwargs)
+        await asyncio.to_thread(self.cache.store, key, self.model_name, response)
+        return response
+
+    def start_chat(self, **kwargs) -> "CachedChatSession":
+        return CachedChatSession(self, self.model.start_chat(**kwargs), kwargs.get("history"))
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class CachedChatSession:
+    """Chat session over a CachedModel; hits are appended to the session history like real answers"""
+
+    def __init__(self, model: CachedModel, session, history=None):
+        self.model = model
+        self._session = session
+        self._context = _digest(*(str(turn) for turn in history or []))
+        self._lock = threading.Lock()
+
+    def _advance(self, prompt: str, text: str) -> None:
+        with self._lock:
+            self._context = _digest(self._context, prompt, text)
+
+    def _record_hit(self, prompt: str, text: str) -> None:
+        """Keep the real session's history in step, so later misses send the same conversation"""
+        session = self._session
+        while hasattr(session, "_session"):
+            session = session._session
+        if hasattr(session, "_remember"):
+            session._remember(prompt, text)
+        else:
+            from vertexai.generative_models import Content, Part
+            session.history.extend([Content(role="user", parts=[Part.from_text(prompt)]),
+                                    Content(role="model", parts=[Part.from_text(text)])])
+        self._advance(prompt, text)
+
+    def _bypass(self) -> None:
+        """An uncacheable turn: later keys of this conversation can no longer match any other"""
+        with self._lock:
+            self._context = _digest(self._context, os.urandom(16))
+
+    def send_message(self, content, generation_config=None, stream: bool = False, **kwargs):
+        prompt = _prompt_text(content)
+        key = self.model._key(content, generation_config, self._context)
+        if key is None:
+            self._bypass()
+            return self._session.send_message(content, generation_config=generation_config, stream=stream, **kwargs)
+        cached = self.model.cache.get(key)
+        if cached is not None:
+            self._record_hit(prompt, cached.text)
+            return _replay(cached) if stream else cached
+        response = self._session.send_message(content, generation_config=generation_config, stream=stream, **kwargs)
+        if stream:
+            return _recording_stream(self.model.cache, key, self.model.model_name, response,
+                                     lambda text: self._advance(prompt, text))
+        self.model.cache.store(key, self.model.model_name, response)
+        self._advance(prompt, response.text)
+        return response
+
+    async def send_message_async(self, content, generation_config=None, **kwargs):
+        prompt = _prompt_text(content)
+        key = self.model._key(content, generation_config, self._context)
+        if key is None:
+            self._bypass()
+            return await self._session.send_message_async(content, generation_config=generation_config, **kwargs)
+        cached = self.model.cache.get(key)
+        if cached is not None:
+            self._record_hit(prompt, cached.text)
+            return cached
+        response = await self._session.send_message_async(content, generation_config=generation_config, **kwargs)
+        await asyncio.to_thread(self.model.cache.store, key, self.model.model_name, response)
+        self._advance(prompt, response.text)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+_shared: Dict[str, ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def response_cache(path: str = RESPONSE_CACHE_PATH) -> ResponseCache:
+    """The process's ResponseCache for `path`"""
+    with _shared_lock:
+        if path not in _shared:
+            _shared[path] = ResponseCache(path)
+        return _shared[path]
@@ -0,0 +1,277 @@
+# models/simulated.py
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Optional
+
+from config.constants import SIMULATED_MODEL_PROFILES, SIMULATION_SEED
+from config.agent_config import ROUTING_RULES, get_agent_for_query
+
+
+# Same class names as google.api_core.exceptions, so tracked_call retries them
+class ResourceExhausted(Exception):
+    pass
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class InvalidArgument(Exception):
+    pass
+
+
+@dataclass
+class SimulationProfile:
+    """Latency, throughput and failure behaviour of one simulated model"""
+    ttft_median_s: float = 0.5       # time to first token, lognormal median
+    ttft_sigma: float = 0.4          # lognormal shape; larger means a heavier tail
+    tokens_per_second: float = 120.0
+    output_tokens_median: int = 180
+    output_tokens_sigma: float = 0.3
+    error_rate: float = 0.0          # share of calls that fail
+    malformed_rate: float = 0.0      # share of responses cut off mid-output
+    transient_error_share: float = 0.9  # share of failures that are retryable
+    connect_s: float = 0.15          # channel setup (DNS, TLS, HTTP/2) paid by a client's first call
+    time_scale: float = 1.0          # multiply every sleep, e.g. 0.01 for fast benchmarks
+
+
+_profiles: Dict[str, SimulationProfile] = {
+    name: SimulationProfile(**values) for name, values in SIMULATED_MODEL_PROFILES.items()
+}
+
+
+def get_profile(model_name: str) -> SimulationProfile:
+    return _profiles.get(model_name) or SimulationProfile()
+
+
+def configure_simulation(model_name: Optional[str] = None, **overrides) -> None:
+    """
+    Override profile fields for one model, or for every known model when
+    `model_name` is None, e.g. configure_simulation(time_scale=0.01).
+    """
+    names = [model_name] if model_name else list(_profiles)
+    for name in names:
+        _profiles[name] = replace(get_profile(name), **overrides)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _UsageMetadata:
+    __slots__ = ("prompt_token_count", "candidates_token_count", "total_token_count")
+
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class SimulatedResponse:
+    """The parts of a Vertex AI GenerationResponse the agents use"""
+
+    def __init__(self, text: str, prompt_tokens: int, output_tokens: int):
+        self.text = text
+        self.usage_metadata = _UsageMetadata(prompt_tokens, output_tokens)
+
+
+_FILLER = ("Monitor crowd flow at the main entrances, keep exit routes clear, brief stewards on the "
+           "escalation protocol and review conditions again in fifteen minutes. ").split()
+
+
+class SimulatedGenerativeModel:
+    """
+    Offline stand-in for vertexai.generative_models.GenerativeModel.
+
+    Each call sleeps for a lognormal time-to-first-token plus output
+    tokens / tokens_per_second, may raise a (mostly transient) error, and
+    returns plausible text with usage metadata. Coordinator analysis
+    prompts get valid routing JSON so the full pipeline runs end to end.
+    """
+
+    def __init__(self, model_name: str, system_instruction: Optional[str] = None, seed: Optional[int] = None):
+        self.model_name = model_name
+        self.system_instruction = system_instruction or ""
+        self._system_tokens = _estimate_tokens(self.system_instruction) if system_instruction else 0
+        self._rng = random.Random(SIMULATION_SEED if seed is None else seed)
+        self._lock = threading.Lock()
+        self.connections = 0
+
+    def start_chat(self, history: Optional[List[Dict[str, str]]] = None) -> "SimulatedChatSession":
+        return SimulatedChatSession(self, history)
+
+    def generate_content(self, contents, generation_config=None, stream: bool = False, **kwargs):
+        prompt = contents if isinstance(contents, str) else "\n".join(str(part) for part in contents)
+        if stream:
+            return self._stream(prompt, 0, generation_config)
+        return self._generate(prompt, 0, generation_config)
+
+    async def generate_content_async(self, contents, generation_config=None, **kwargs):
+        prompt = contents if isinstance(contents, str) else "\n".join(str(part) for part in contents)
+        return await self._generate_async(prompt, 0, generation_config)
+
+    def _plan(self, prompt: str, generation_config) -> tuple:
+        """Sample latency, output and failure for one call; raises after the TTFT on failure"""
+        profile, ttft, text, error = self._sample(prompt, generation_config)
+        if error is not None:
+            # Failures come back after roughly the time-to-first-token
+            time.sleep(ttft * profile.time_scale)
+            raise error
+        return profile, ttft, text
+
+    async def _plan_async(self, prompt: str, generation_config) -> tuple:
+        profile, ttft, text, error = self._sample(prompt, generation_config)
+        if error is not None:
+            await asyncio.sleep(ttft * profile.time_scale)
+            raise error
+        return profile, ttft, text
+
+    def _sample(self, prompt: str, generation_config) -> tuple:
+        """Latency, output text and the error to raise (or None) for one call"""
+        profile = get_profile(self.model_name)
+        with self._lock:
+            ttft = profile.ttft_median_s * math.exp(self._rng.gauss(0, profile.ttft_sigma))
+            output_tokens = max(8, int(profile.output_tokens_median * math.exp(self._rng.gauss(0, profile.output_tokens_sigma))))
+            failure = self._rng.random() < profile.error_rate
+            transient = self._rng.random() < profile.transient_error_share
+            cut_at = self._rng.uniform(0.3, 0.9) if self._rng.random() < profile.malformed_rate else None
+            if not self.connections:
+                # Like a real client, the first call opens the channel
+                self.connections += 1
+                ttft += profile.connect_s
+
+        if failure:
+            if transient:
+                error = (ResourceExhausted if output_tokens % 2 else ServiceUnavailable)(
+                    f"Simulated transient error from {self.model_name}")
+            else:
+                error = InvalidArgument(f"Simulated request error from {self.model_name}")
+            return profile, ttft, None, error
+
+        json_mode = (generation_config or {}).get("response_mime_type") == "application/json"
+        text = self._response_text(prompt, output_tokens, json_mode,
+                                   (generation_config or {}).get("response_schema") if json_mode else None)
+        if cut_at is not None:
+            text = text[:int(len(text) * cut_at)]
+        return profile, ttft, text, None
+
+    def _generate(self, prompt: str, context_tokens: int, generation_config=None) -> SimulatedResponse:
+        profile, ttft, text = self._plan(prompt, generation_config)
+        output_tokens = _estimate_tokens(text)
+        time.sleep((ttft + output_tokens / profile.tokens_per_second) * profile.time_scale)
+        prompt_tokens = self._system_tokens + context_tokens + _estimate_tokens(prompt)
+        return SimulatedResponse(text, prompt_tokens, output_tokens)
+
+    async def _generate_async(self, prompt: str, context_tokens: int, generation_config=None) -> SimulatedResponse:
+        """Like _generate, but waits on the event loop instead of blocking a thread"""
+        profile, ttft, text = await self._plan_async(prompt, generation_config)
+        output_tokens = _estimate_tokens(text)
+        await asyncio.sleep((ttft + output_tokens / profile.tokens_per_second) * profile.time_scale)
+        prompt_tokens = self._system_tokens + context_tokens + _estimate_tokens(prompt)
+        return SimulatedResponse(text, prompt_tokens, output_tokens)
+
+    def _stream(self, prompt: str, context_tokens: int, generation_config=None, chunk_chars: int = 48):
+        """Yield chunks at tokens_per_second after the TTFT; usage counts are cumulative"""
+        profile, ttft, text = self._plan(prompt, generation_config)
+        prompt_tokens = self._system_tokens + context_tokens + _estimate_tokens(prompt)
+        time.sleep(ttft * profile.time_scale)
+        for start in range(0, len(text), chunk_chars):
+            chunk = text[start:start + chunk_chars]
+            time.sleep(_estimate_tokens(chunk) / profile.tokens_per_second * profile.time_scale)
+            yield SimulatedResponse(chunk, prompt_tokens, _estimate_tokens(text[:start + chunk_chars]))
+
+    def _response_text(self, prompt: str, output_tokens: int, json_mode: bool = False,
+                       schema: Optional[Dict[str, Any]] = None) -> str:
+        if '"required_agents"' in prompt:
+            routing = self._routing_json(prompt, schema)
+            return routing if json_mode else "```json\n" + routing + "\n```"
+
+        lines = [
+            "🛡️ SAFETY: Risk: MEDIUM. Crowd density is approaching the comfortable limit near the busiest gates.",
+            "📊 DATA: Watch arrivals per minute at each gate; the trend is rising.",
+            "🚨 ALERT: Priority P3, respond within 15 minutes, no escalation needed.",
+            "💡 RECOMMENDATION:"
+        ]
+        words = []
+        budget = output_tokens * 4 - sum(len(line) + 1 for line in lines)
+        while budget > 0:
+            word = _FILLER[len(words) % len(_FILLER)]
+            words.append(word)
+            budget -= len(word) + 1
+        return "\n".join(lines) + " " + " ".join(words)
+
+    def _routing_json(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Routing analysis as JSON. Like Gemini, properties under a response
+        schema come out alphabetically unless it sets propertyOrdering;
+        free-form answers follow the prompt's example order.
+        """
+        match = re.search(r'User Request: "(.*?)"', prompt, re.S)
+        request = (match.group(1) if match else prompt).lower()
+        keyword_sets = {
+            "safety_monitoring": ROUTING_RULES["safety_keywords"],
+            "data_analytics": ROUTING_RULES["analytics_keywords"],
+            "alert_management": ROUTING_RULES["alert_keywords"]
+        }
+        agents = [name for name, keywords in keyword_sets.items() if any(k in request for k in keywords)]
+        agents = agents or [get_agent_for_query(request)]
+        critical = any(word in request for word in ("fire", "emergency", "evacuation", "critical"))
+        analysis = {
+            "priority": "critical" if critical else "medium",
+            "required_agents": agents,
+            "request_type": "safety_assessment" if agents[0] == "safety_monitoring" else agents[0],
+            "complexity": "complex" if len(agents) > 1 else "simple",
+            "expected_response_time": 3 if critical else 10,
+            "reasoning": "Simulated routing from request keywords. " + " ".join(_FILLER * 3)
+        }
+        if schema is not None:
+            order = schema.get("propertyOrdering") or schema.get("property_ordering") or sorted(analysis)
+            analysis = {key: analysis[key] for key in order if key in analysis}
+        return json.dumps(analysis, indent=2)
+
+
+class SimulatedChatSession:
+    """
+    Chat session over a simulated model. Like a real chat session, the
+    whole history is resent with every message, so prompt tokens grow.
+    """
+
+    def __init__(self, model: SimulatedGenerativeModel, history: Optional[List[Dict[str, str]]] = None):
+        self.model = model
+        self.history: List[Dict[str, str]] = list(history or [])
+        self._history_tokens = sum(_estimate_tokens(turn["text"]) for turn in self.history)
+        self._lock = threading.Lock()
+
+    def send_message(self, content, generation_config=None, stream: bool = False, **kwargs):
+        prompt = content if isinstance(content, str) else "\n".join(str(part) for part in content)
+        if stream:
+            return self._stream(prompt, generation_config)
+        response = self.model._generate(prompt, self._history_tokens, generation_config)
+        self._remember(prompt, response.text)
+        return response
+
+    async def send_message_async(self, content, generation_config=None, **kwargs):
+        prompt = content if isinstance(content, str) else "\n".join(str(part) for part in content)
+        response = await self.model._generate_async(prompt, self._history_tokens, generation_config)
+        self._remember(prompt, response.text)
+        return response
+
+    def _stream(self, prompt: str, generation_config):
+        parts = []
+        for chunk in self.model._stream(prompt, self._history_tokens, generation_config):
+            parts.append(chunk.text)
+            yield chunk
+        # Like the real session, history is only updated once the stream is consumed
+        self._remember(prompt, "".join(parts))
+
+    def _remember(self, prompt: str, text: str) -> None:
+        with self._lock:
+            self.history.append({"role": "user", "text": prompt})
+            self.history.append({"role": "model", "text": text})
+            self._history_tokens += _estimate_tokens(prompt) + _estimate_tokens(text)
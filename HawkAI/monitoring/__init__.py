@@ -0,0 +1,15 @@
+from .usage import (UsageTracker, CallRecord, usage_tracker, tracked_call, tracked_call_async, tracked_stream,
+                    request_scope, current_request_id, CallCancelled, DeadlineExpired, cancellation_scope,
+                    deadline_scope, remaining_time, raise_if_cancelled, with_usage_totals)
+from .history import HistoryLog
+from .single_flight import SingleFlight, normalize_key, coalescing_stats
+from .sketch import QuantileSketch, merge_exports
+from .tracing import Tracer, Span, RingBufferExporter, JsonlExporter, ChromeTraceExporter, tracer, current_span
+
+__all__ = [
+    'UsageTracker', 'CallRecord', 'usage_tracker', 'tracked_call', 'tracked_call_async', 'tracked_stream',
+    'request_scope', 'current_request_id', 'with_usage_totals',
+    'CallCancelled', 'DeadlineExpired', 'cancellation_scope', 'deadline_scope', 'remaining_time', 'raise_if_cancelled',
+    'Tracer', 'Span', 'RingBufferExporter', 'JsonlExporter', 'ChromeTraceExporter', 'tracer', 'current_span',
+    'HistoryLog', 'QuantileSketch', 'merge_exports', 'SingleFlight', 'normalize_key', 'coalescing_stats'
+]
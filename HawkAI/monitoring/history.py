@@ -0,0 +1,200 @@
+# monitoring/history.py
+import glob
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Union
+
+from config.constants import HISTORY_DIR, HISTORY_MEMORY_ENTRIES, HISTORY_MAX_SESSIONS
+
+_LENGTH = struct.Struct("<I")
+_INDEX_ENTRY = struct.Struct("<dQ")  # logged-at epoch seconds, byte offset in the log
+
+TimeBound = Union[None, float, int, str, datetime]
+
+
+def _to_epoch(value: TimeBound) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def prune_sessions(name: str, keep: int, directory: str = HISTORY_DIR) -> int:
+    """Delete all but the newest `keep` session logs (and indexes) of a history; returns logs removed"""
+    logs = sorted(glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(name)}-*.log")),
+                  key=os.path.getmtime)
+    stale = logs[:max(len(logs) - keep, 0)]
+    for path in stale:
+        for stale_path in (path, path + ".idx"):
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:
+                pass
+    return len(stale)
+
+
+class HistoryLog:
+    """
+    Request/session history with bounded memory.
+
+    The most recent `max_memory_entries` results stay in a ring buffer;
+    every entry is also appended to an on-disk log as a length-prefixed,
+    zlib-compressed compact JSON record. A small index file of
+    (logged-at, offset) pairs lets `read_range` and indexing seek straight
+    to older entries without reading the whole log.
+
+    Behaves like the list it replaces for append, len, truthiness,
+    iteration (recent entries only) and [i] (any entry). `numeric_fields`
+    keep running totals over every entry, for `total` and `mean`.
+
+    Each new session opens its own log under HISTORY_DIR; only the newest
+    `max_sessions` logs per name are kept. Files are created on the first
+    append. If that fails (e.g. a read-only deploy) the history carries on
+    in memory only, with the reason in `persist_error`.
+    """
+
+    def __init__(self, name: str, max_memory_entries: int = HISTORY_MEMORY_ENTRIES,
+                 path: Optional[str] = None, numeric_fields: Iterable[str] = ("processing_time",),
+                 max_sessions: int = HISTORY_MAX_SESSIONS):
+        # New sessions prune older logs when their own is created
+        self._prune = None
+        if path is None:
+            session = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+            path = os.path.join(HISTORY_DIR, f"{name}-{session}.log")
+            self._prune = max(max_sessions - 1, 0)
+        self.name = name
+        self.path = path
+        self.index_path = path + ".idx"
+        self.recent: deque = deque(maxlen=max_memory_entries)
+        self.persist_error: Optional[str] = None
+        self._times = array('d')  # every entry
+        self._offsets = array('Q')  # entries in the log, a prefix of _times
+        self._lock = threading.Lock()
+        self._sums = {field: 0.0 for field in numeric_fields}
+        self._counts = {field: 0 for field in numeric_fields}
+        self._log = self._index = None
+
+        # Reopening an existing log continues it, running totals included
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                for logged_at, offset in _INDEX_ENTRY.iter_unpack(f.read()):
+                    self._times.append(logged_at)
+                    self._offsets.append(offset)
+            for entry in self._iter_at(self._offsets):
+                self._add_to_totals(entry)
+
+    def _open(self) -> bool:
+        """Open the log for appending on first use; False once that has failed"""
+        if self._log is None and self.persist_error is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                if self._prune is not None:
+                    prune_sessions(self.name, self._prune, os.path.dirname(os.path.abspath(self.path)))
+                self._log = open(self.path, 'ab')
+                self._index = open(self.index_path, 'ab')
+            except OSError as error:
+                self.persist_error = f"History kept in memory only: {error}"
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+        return self._log is not None
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        record = zlib.compress(json.dumps(entry, separators=(',', ':'), default=str).encode('utf-8'), 1)
+        with self._lock:
+            logged_at = time.time()
+            if self._open() and len(self._offsets) == len(self._times):
+                offset = self._log.tell()
+                self._log.write(_LENGTH.pack(len(record)) + record)
+                self._log.flush()
+                self._index.write(_INDEX_ENTRY.pack(logged_at, offset))
+                self._index.flush()
+                self._offsets.append(offset)
+            self._times.append(logged_at)
+            self.recent.append(entry)
+            self._add_to_totals(entry)
+
+    def _add_to_totals(self, entry: Dict[str, Any]) -> None:
+        for field in self._sums:
+            value = entry.get(field)
+            if isinstance(value, (int, float)):
+                self._sums[field] += value
+                self._counts[field] += 1
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def __iter__(self):
+        return iter(list(self.recent))
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        total = len(self._times)
+        if i < 0:
+            i += total
+        if not 0 <= i < total:
+            raise IndexError("history index out of range")
+        in_memory = total - len(self.recent)
+        if i >= in_memory:
+            return self.recent[i - in_memory]
+        if i >= len(self._offsets):
+            raise IndexError("history entry was not persisted and is no longer in memory")
+        return self._read_at([self._offsets[i]])[0]
+
+    def mean(self, field: str) -> Optional[float]:
+        """Running mean of a numeric field over every entry, not just recent ones"""
+        count = self._counts.get(field)
+        return self._sums[field] / count if count else None
+
+    def total(self, field: str) -> float:
+        """Running total of a numeric field over every entry"""
+        return self._sums.get(field, 0.0)
+
+    def read_range(self, start: TimeBound = None, end: TimeBound = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries logged in [start, end]; bounds are epoch seconds, datetimes or ISO strings"""
+        start, end = _to_epoch(start), _to_epoch(end)
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self._times, start)
+            hi = len(self._times) if end is None else bisect_right(self._times, end)
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            logged = len(self._offsets)
+            offsets = self._offsets[lo:min(hi, logged)]
+            # Entries past the log (memory-only mode) come from the ring buffer while they last
+            first_recent = len(self._times) - len(self.recent)
+            unlogged = [self.recent[i - first_recent] for i in range(max(lo, logged, first_recent), hi)]
+        return self._read_at(offsets) + unlogged
+
+    def _iter_at(self, offsets):
+        if not len(offsets):
+            return
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                yield json.loads(zlib.decompress(f.read(length)))
+
+    def _read_at(self, offsets) -> List[Dict[str, Any]]:
+        return list(self._iter_at(offsets))
+
+    def disk_bytes(self) -> int:
+        if self._log is not None:
+            return self._log.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._index.close()
+                self._log = self._index = None
@@ -0,0 +1,129 @@
+# monitoring/single_flight.py
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+from config.constants import COALESCE_REQUESTS
+from .usage import remaining_time
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_registry: Dict[str, "SingleFlight"] = {}
+_registry_lock = threading.Lock()
+
+
+def normalize_key(text: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a query"""
+    return " ".join(_WORD.findall(str(text).lower()))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller (the
+    leader) runs the computation, callers arriving while it is in flight
+    wait for it and get the same result or exception. Nothing is cached
+    once the call completes.
+
+    A caller only joins a leader running under the same or an earlier
+    request deadline (see `deadline_scope`), so a tight-deadline request
+    never waits on one allowed to run longer; it runs its own call instead.
+
+    Works for threads (`do`) and coroutines (`do_async`), and across both.
+    """
+
+    def __init__(self, name: str, enabled: bool = COALESCE_REQUESTS):
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Tuple[Future, Optional[float]]] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.bypassed = 0
+        with _registry_lock:
+            _registry[name] = self
+
+    def _join(self, key: Hashable) -> tuple:
+        """(future, leader); (None, False) when the in-flight call may outlast this caller's deadline"""
+        remaining = remaining_time()
+        deadline = None if remaining is None else time.perf_counter() + remaining
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None:
+                future, leader_deadline = entry
+                if deadline is None or (leader_deadline is not None and leader_deadline <= deadline):
+                    self.followers += 1
+                    return future, False
+                self.bypassed += 1
+                return None, False
+            future = Future()
+            self._in_flight[key] = (future, deadline)
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None) -> None:
+        with self._lock:
+            del self._in_flight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> tuple:
+        """Run or join `func(*args, **kwargs)`; returns (result, shared)"""
+        if not self.enabled:
+            return func(*args, **kwargs), False
+        future, leader = self._join(key)
+        if future is None:
+            return func(*args, **kwargs), False
+        if not leader:
+            return future.result(), True
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    async def do_async(self, key: Hashable, func: Callable, *args, **kwargs) -> tuple:
+        """Coroutine version of `do`: `func` returns an awaitable"""
+        if not self.enabled:
+            return await func(*args, **kwargs), False
+        future, leader = self._join(key)
+        if future is None:
+            return await func(*args, **kwargs), False
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self.leaders + self.followers + self.bypassed
+            return {
+                "calls": calls,
+                "executed": self.leaders + self.bypassed,
+                "coalesced": self.followers,
+                "deadline_bypassed": self.bypassed,
+                "in_flight": len(self._in_flight),
+                "coalescing_ratio": round(self.followers / calls, 4) if calls else 0.0
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.leaders = self.followers = self.bypassed = 0
+
+
+def coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every SingleFlight in the process, by name"""
+    with _registry_lock:
+        flights = list(_registry.values())
+    return {flight.name: flight.stats() for flight in flights}
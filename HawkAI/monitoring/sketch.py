@@ -0,0 +1,133 @@
+# monitoring/sketch.py
+import math
+from typing import Dict, Any, Iterable, Optional
+
+
+class QuantileSketch:
+    """
+    DDSketch-style streaming quantile sketch for positive values such as
+    latencies. Values fall into logarithmic buckets, so every quantile is
+    within `relative_accuracy` of the true value. Memory is bounded by
+    `max_buckets`: past that, the lowest buckets are collapsed, which only
+    affects accuracy far below the median. Sketches with the same accuracy
+    merge exactly, e.g. across worker processes.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value < 0:
+            raise ValueError("QuantileSketch only accepts non-negative values")
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value < 1e-9:
+            self.zero_count += weight
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + weight
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if abs(other.relative_accuracy - self.relative_accuracy) > 1e-12:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Bucket midpoint in relative terms; clamp to what was observed
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def summary(self, scale: float = 1.0, digits: int = 4) -> Dict[str, Any]:
+        """count, mean, min, max and p50/p95/p99, multiplied by `scale` (e.g. 1000 for ms)"""
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.mean * scale, digits),
+            "min": round(self.min * scale, digits),
+            "p50": round(self.quantile(0.50) * scale, digits),
+            "p95": round(self.quantile(0.95) * scale, digits),
+            "p99": round(self.quantile(0.99) * scale, digits),
+            "max": round(self.max * scale, digits)
+        }
+
+    def _collapse(self) -> None:
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        merged = sum(self.buckets.pop(key) for key in keys[:excess + 1])
+        self.buckets[keys[excess]] = merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if data["count"]:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+def merge_exports(exports: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, QuantileSketch]:
+    """
+    Merge `UsageTracker.export_latency()` outputs from several processes
+    into one sketch per key, for a fleet-wide summary.
+    """
+    merged: Dict[str, QuantileSketch] = {}
+    for export in exports:
+        for key, data in export.items():
+            sketch = QuantileSketch.from_dict(data)
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+    return merged
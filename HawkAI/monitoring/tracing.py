@@ -0,0 +1,267 @@
+# monitoring/tracing.py
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from config.constants import TRACE_DIR
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("hawkai_span", default=None)
+
+
+def _process_path(template: str) -> str:
+    """Exporter path for this process: `{pid}` in the template becomes the process id"""
+    return template.replace("{pid}", str(os.getpid()))
+
+
+def _child_template(template: str) -> str:
+    """Template for a forked child; one without `{pid}` gets it before the extension"""
+    if "{pid}" in template:
+        return template
+    root, ext = os.path.splitext(template)
+    return f"{root}-{{pid}}{ext}"
+
+
+class Span:
+    """A timed operation with a parent link and attributes"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "status",
+                 "start_us", "duration_us", "thread_id", "_start_ns", "_tracer", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_us = time.time_ns() // 1000
+        self.duration_us = 0
+        self.thread_id = threading.get_ident()
+        self._start_ns = time.perf_counter_ns()
+        self._tracer = tracer
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_us = (time.perf_counter_ns() - self._start_ns) // 1000
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self._tracer._export(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_us": self.start_us,
+            "duration_us": self.duration_us,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled; every operation is a no-op"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# ---- Exporters ----
+class RingBufferExporter:
+    """Keeps the most recent spans in memory"""
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: deque = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span.to_dict())
+
+    def trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        return [s for s in self.spans if s["trace_id"] == trace_id]
+
+    def after_fork(self) -> "RingBufferExporter":
+        return RingBufferExporter(self.spans.maxlen)
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlExporter:
+    """Appends one JSON object per span to a local file (`{pid}` in the path becomes the process id)"""
+
+    def __init__(self, path: str):
+        self.template = path
+        path = _process_path(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), separators=(',', ':'), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def after_fork(self) -> "JsonlExporter":
+        return JsonlExporter(_child_template(self.template))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ChromeTraceExporter:
+    """
+    Writes complete ("X") events in Chrome trace format, viewable in
+    chrome://tracing or Perfetto. The JSON array is streamed; the closing
+    bracket is optional in this format and is written on close. `{pid}` in
+    the path becomes the process id.
+    """
+
+    def __init__(self, path: str):
+        self.template = path
+        path = _process_path(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+        # Nothing left buffered, so a forked child cannot write it out a second time
+        self._file.write("[\n")
+        self._file.flush()
+        self._first = True
+
+    def export(self, span: Span) -> None:
+        event = {
+            "name": span.name,
+            "cat": "hawkai",
+            "ph": "X",
+            "ts": span.start_us,
+            "dur": span.duration_us,
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "args": {**span.attributes, "trace_id": span.trace_id, "span_id": span.span_id,
+                     "parent_id": span.parent_id}
+        }
+        line = json.dumps(event, separators=(',', ':'), default=str)
+        with self._lock:
+            self._file.write(("" if self._first else ",\n") + line)
+            self._first = False
+            self._file.flush()
+
+    def after_fork(self) -> "ChromeTraceExporter":
+        return ChromeTraceExporter(_child_template(self.template))
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.write("\n]\n")
+            self._file.close()
+
+
+class Tracer:
+    """
+    Hierarchical tracing for the request pipeline. Parent/child links follow
+    the current span through contextvars, so they survive `await`. With no
+    exporters configured `span()` returns a shared no-op object.
+    """
+
+    def __init__(self, exporters: Optional[List[Any]] = None):
+        self.exporters: List[Any] = list(exporters or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def span(self, name: str, **attributes):
+        if not self.exporters:
+            return _NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    def traced(self, name: str):
+        """Decorator that runs the function inside a span"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_exporter(self, exporter) -> None:
+        self.exporters.append(exporter)
+
+    def after_fork(self) -> None:
+        """
+        In a forked child: replace inherited exporters, which share file
+        handles with the parent, by fresh ones writing the child's own files
+        """
+        self.exporters = [exporter.after_fork() if hasattr(exporter, "after_fork") else exporter
+                          for exporter in self.exporters]
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.close()
+        self.exporters = []
+
+    def _export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def exporters_from_env(value: Optional[str] = None) -> List[Any]:
+    """
+    Build exporters from HAWKAI_TRACING, a comma-separated list of
+    `jsonl`, `ring` and `chrome`. Unset or empty disables tracing.
+    """
+    value = os.environ.get("HAWKAI_TRACING", "") if value is None else value
+    exporters = []
+    for name in filter(None, (part.strip().lower() for part in value.split(","))):
+        if name == "jsonl":
+            exporters.append(JsonlExporter(os.path.join(TRACE_DIR, "spans-{pid}.jsonl")))
+        elif name == "ring":
+            exporters.append(RingBufferExporter())
+        elif name == "chrome":
+            exporters.append(ChromeTraceExporter(os.path.join(TRACE_DIR, "trace-{pid}.json")))
+        else:
+            raise ValueError(f"Unknown tracing exporter: {name}")
+    return exporters
+
+
+# Shared tracer for the whole process
+tracer = Tracer(exporters_from_env())
+atexit.register(tracer.shutdown)
+# Forked workers reopen {pid} exporter files; fork (and so this hook) exists only on POSIX
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=tracer.after_fork)
@@ -0,0 +1,391 @@
+# monitoring/usage.py
+import asyncio
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+from config.constants import MODEL_PRICING, MODEL_CALL_MAX_RETRIES
+from .tracing import tracer
+from .sketch import QuantileSketch
+
+# Exception class names treated as transient and retried
+TRANSIENT_ERRORS = {"ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "TooManyRequests"}
+
+_current_request_id: contextvars.ContextVar = contextvars.ContextVar("hawkai_request_id", default=None)
+_cancel_event: contextvars.ContextVar = contextvars.ContextVar("hawkai_cancel_event", default=None)
+_deadline: contextvars.ContextVar = contextvars.ContextVar("hawkai_deadline", default=None)
+
+
+class CallCancelled(Exception):
+    """Raised before a model call whose work has been cancelled (e.g. preempted)"""
+
+
+class DeadlineExpired(CallCancelled):
+    """Raised before a model call, or between stream chunks, once the request deadline has passed"""
+
+
+@dataclass
+class CallRecord:
+    """One model call, including any retries"""
+    agent: str
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    latency_s: float
+    retries: int
+    request_id: Optional[str]
+    error: Optional[str] = None
+
+    @property
+    def cost_usd(self) -> float:
+        return estimate_cost(self.model, self.prompt_tokens, self.output_tokens)
+
+
+def estimate_cost(model: str, prompt_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "latency_s": 0.0,
+            "retries": 0, "errors": 0, "cost_usd": 0.0}
+
+
+def _add(totals: Dict[str, Any], record: CallRecord):
+    totals["calls"] += 1
+    totals["prompt_tokens"] += record.prompt_tokens
+    totals["output_tokens"] += record.output_tokens
+    totals["latency_s"] += record.latency_s
+    totals["retries"] += record.retries
+    totals["errors"] += record.error is not None
+    totals["cost_usd"] += record.cost_usd
+
+
+class UsageTracker:
+    """
+    Process-wide accounting of model calls, aggregated per agent, per model
+    and per request. Only the most recent raw records and requests are
+    kept, so memory stays bounded in long-running processes.
+    """
+
+    def __init__(self, max_records: int = 10000, max_requests: int = 1000):
+        self._lock = threading.Lock()
+        self.records: deque = deque(maxlen=max_records)
+        self.max_requests = max_requests
+        self.by_agent: Dict[str, Dict[str, Any]] = {}
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+        self.by_request: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Latency sketches keyed "agent/<name>" (model calls) and "mode/<name>" (whole requests)
+        self.latency: Dict[str, QuantileSketch] = {}
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            if record.error is None:
+                self._sketch(f"agent/{record.agent}").add(record.latency_s)
+            _add(self.by_agent.setdefault(record.agent, _empty_totals()), record)
+            _add(self.by_model.setdefault(record.model, _empty_totals()), record)
+            if record.request_id:
+                if record.request_id not in self.by_request:
+                    self.by_request[record.request_id] = {**_empty_totals(), "agents": {}}
+                request = self.by_request[record.request_id]
+                _add(request, record)
+                _add(request["agents"].setdefault(record.agent, _empty_totals()), record)
+                while len(self.by_request) > self.max_requests:
+                    self.by_request.popitem(last=False)
+
+    def record_request_latency(self, mode: str, seconds: float) -> None:
+        """End-to-end latency of one request handled by `mode` (coordinator, fast, ...)"""
+        with self._lock:
+            self._sketch(f"mode/{mode}").add(seconds)
+
+    def record_stage_latency(self, stage: str, seconds: float) -> None:
+        """Latency of one pipeline stage (analysis, synthesis, ...), used for deadline budgeting"""
+        with self._lock:
+            self._sketch(f"stage/{stage}").add(seconds)
+
+    def latency_quantile(self, key: str, q: float, min_count: int = 1) -> Optional[float]:
+        """Quantile in seconds from one sketch, or None with fewer than `min_count` samples"""
+        with self._lock:
+            sketch = self.latency.get(key)
+            if sketch is None or sketch.count < min_count:
+                return None
+            return sketch.quantile(q)
+
+    def _sketch(self, key: str) -> QuantileSketch:
+        sketch = self.latency.get(key)
+        if sketch is None:
+            sketch = self.latency[key] = QuantileSketch()
+        return sketch
+
+    def latency_percentiles(self, prefix: str = "") -> Dict[str, Dict[str, Any]]:
+        """p50/p95/p99 in milliseconds per agent and mode, from the sketches"""
+        with self._lock:
+            return {key: sketch.summary(scale=1000, digits=1)
+                    for key, sketch in self.latency.items() if key.startswith(prefix)}
+
+    def export_latency(self) -> Dict[str, Dict[str, Any]]:
+        """Serializable sketches; merge exports from several workers with merge_exports"""
+        with self._lock:
+            return {key: sketch.to_dict() for key, sketch in self.latency.items()}
+
+    def request_usage(self, request_id: str) -> Dict[str, Any]:
+        with self._lock:
+            usage = self.by_request.get(request_id)
+            return _rounded(usage) if usage else _rounded(_empty_totals())
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = list(self.by_request.values())
+            return {
+                "by_agent": {name: _rounded(totals) for name, totals in self.by_agent.items()},
+                "by_model": {name: _rounded(totals) for name, totals in self.by_model.items()},
+                "requests_tracked": len(requests),
+                "avg_tokens_per_request": round(
+                    sum(r["prompt_tokens"] + r["output_tokens"] for r in requests) / len(requests), 1
+                ) if requests else 0,
+                "avg_cost_per_request_usd": round(
+                    sum(r["cost_usd"] for r in requests) / len(requests), 6
+                ) if requests else 0.0,
+                "total_cost_usd": round(sum(t["cost_usd"] for t in self.by_model.values()), 6)
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self.by_agent.clear()
+            self.by_model.clear()
+            self.by_request.clear()
+            self.latency.clear()
+
+
+def _rounded(totals: Dict[str, Any]) -> Dict[str, Any]:
+    rounded = {k: (round(v, 6) if k == "cost_usd" else round(v, 4) if isinstance(v, float) else v)
+               for k, v in totals.items() if k != "agents"}
+    if "agents" in totals:
+        rounded["agents"] = {name: _rounded(t) for name, t in totals["agents"].items()}
+    return rounded
+
+
+# Shared tracker for the whole process
+usage_tracker = UsageTracker()
+
+
+def with_usage_totals(result: Dict[str, Any]) -> Dict[str, Any]:
+    """History entry with the request's token and cost totals as top-level numeric fields"""
+    usage = result.get('usage')
+    if not usage:
+        return result
+    return {**result, "tokens": usage['prompt_tokens'] + usage['output_tokens'], "cost_usd": usage['cost_usd']}
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def current_request_id() -> Optional[str]:
+    return _current_request_id.get()
+
+
+@contextmanager
+def request_scope(request_id: Optional[str] = None):
+    """Attribute every model call made inside the block to one request"""
+    request_id = request_id or new_request_id()
+    token = _current_request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _current_request_id.reset(token)
+
+
+@contextmanager
+def cancellation_scope(event: threading.Event):
+    """Model calls inside the block raise CallCancelled once `event` is set"""
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Run the block under a deadline `seconds` from now (None: no new
+    limit). Nested scopes can only tighten the deadline; worker threads
+    started with a copied context inherit it.
+    """
+    current = _deadline.get()
+    deadline = current
+    if seconds is not None:
+        requested = time.perf_counter() + seconds
+        deadline = requested if current is None else min(current, requested)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.perf_counter()
+
+
+def raise_if_cancelled() -> None:
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise CallCancelled("Model call cancelled")
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExpired(f"Request deadline passed {-remaining:.2f}s ago")
+
+
+def _retry_backoff(error: Exception, retries: int, max_retries: int) -> Optional[float]:
+    """Backoff before the next attempt, or None if the error should not be retried"""
+    if type(error).__name__ not in TRANSIENT_ERRORS or retries >= max_retries:
+        return None
+    backoff = min(0.5 * 2 ** retries, 4.0)
+    remaining = remaining_time()
+    # No point in retrying if the deadline passes during the backoff
+    return None if remaining is not None and remaining <= backoff else backoff
+
+
+def _usage_counts(response, prompt: Any) -> tuple:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None and getattr(usage, "prompt_token_count", None) is not None:
+        return usage.prompt_token_count, getattr(usage, "candidates_token_count", 0) or 0
+    # No usage metadata: rough 4-characters-per-token estimate
+    text = getattr(response, "text", "") or ""
+    return len(str(prompt)) // 4, len(text) // 4
+
+
+def tracked_call(agent: str, model: str, call: Callable, prompt: Any,
+                 max_retries: int = MODEL_CALL_MAX_RETRIES, tracker: Optional[UsageTracker] = None, **kwargs):
+    """
+    Run a model call (e.g. `chat_session.send_message`) with retries on
+    transient errors and record tokens, monotonic latency and retry count.
+    """
+    tracker = tracker or usage_tracker
+    with tracer.span("model_call", agent=agent, model=model) as span:
+        retries = 0
+        start = time.perf_counter()
+        while True:
+            raise_if_cancelled()
+            try:
+                response = call(prompt, **kwargs)
+                break
+            except Exception as e:
+                backoff = _retry_backoff(e, retries, max_retries)
+                if backoff is not None:
+                    retries += 1
+                    time.sleep(backoff)
+                    continue
+                tracker.record(CallRecord(agent, model, 0, 0, time.perf_counter() - start, retries,
+                                          current_request_id(), error=type(e).__name__))
+                raise
+
+        prompt_tokens, output_tokens = _usage_counts(response, prompt)
+        tracker.record(CallRecord(agent, model, prompt_tokens, output_tokens, time.perf_counter() - start,
+                                  retries, current_request_id()))
+        span.set_attribute("prompt_tokens", prompt_tokens)
+        span.set_attribute("output_tokens", output_tokens)
+        span.set_attribute("retries", retries)
+    return response
+
+
+async def tracked_call_async(agent: str, model: str, call: Callable, prompt: Any,
+                             max_retries: int = MODEL_CALL_MAX_RETRIES, tracker: Optional[UsageTracker] = None,
+                             **kwargs):
+    """
+    tracked_call for coroutine model calls (e.g. `chat_session.send_message_async`):
+    same retries and records, but waits on the event loop instead of a thread.
+    """
+    tracker = tracker or usage_tracker
+    with tracer.span("model_call", agent=agent, model=model) as span:
+        retries = 0
+        start = time.perf_counter()
+        while True:
+            raise_if_cancelled()
+            try:
+                response = await call(prompt, **kwargs)
+                break
+            except Exception as e:
+                backoff = _retry_backoff(e, retries, max_retries)
+                if backoff is not None:
+                    retries += 1
+                    await asyncio.sleep(backoff)
+                    continue
+                tracker.record(CallRecord(agent, model, 0, 0, time.perf_counter() - start, retries,
+                                          current_request_id(), error=type(e).__name__))
+                raise
+
+        prompt_tokens, output_tokens = _usage_counts(response, prompt)
+        tracker.record(CallRecord(agent, model, prompt_tokens, output_tokens, time.perf_counter() - start,
+                                  retries, current_request_id()))
+        span.set_attribute("prompt_tokens", prompt_tokens)
+        span.set_attribute("output_tokens", output_tokens)
+        span.set_attribute("retries", retries)
+    return response
+
+
+def tracked_stream(agent: str, model: str, call: Callable, prompt: Any, on_chunk: Callable[[str], None],
+                   max_retries: int = MODEL_CALL_MAX_RETRIES, tracker: Optional[UsageTracker] = None, **kwargs) -> str:
+    """
+    Streaming variant of tracked_call: runs `call(prompt, stream=True)`,
+    hands each chunk's text to `on_chunk` as it arrives and returns the
+    full text. Only failures before the first chunk are retried.
+    """
+    tracker = tracker or usage_tracker
+    with tracer.span("model_call", agent=agent, model=model, stream=True) as span:
+        retries = 0
+        start = time.perf_counter()
+        parts = []
+        last = None
+        while True:
+            raise_if_cancelled()
+            try:
+                chunks = iter(call(prompt, stream=True, **kwargs))
+                last = next(chunks, None)
+                break
+            except Exception as e:
+                backoff = _retry_backoff(e, retries, max_retries)
+                if backoff is not None:
+                    retries += 1
+                    time.sleep(backoff)
+                    continue
+                tracker.record(CallRecord(agent, model, 0, 0, time.perf_counter() - start, retries,
+                                          current_request_id(), error=type(e).__name__))
+                raise
+        span.set_attribute("first_chunk_s", round(time.perf_counter() - start, 4))
+
+        try:
+            chunk = last
+            while chunk is not None:
+                last = chunk
+                parts.append(chunk.text)
+                on_chunk(chunk.text)
+                raise_if_cancelled()
+                chunk = next(chunks, None)
+        except Exception as e:
+            tracker.record(CallRecord(agent, model, len(str(prompt)) // 4, len("".join(parts)) // 4,
+                                      time.perf_counter() - start, retries, current_request_id(),
+                                      error=type(e).__name__))
+            raise
+
+        text = "".join(parts)
+        prompt_tokens, output_tokens = _usage_counts(last, prompt) if last is not None else (len(str(prompt)) // 4, 0)
+        if last is not None and getattr(getattr(last, "usage_metadata", None), "prompt_token_count", None) is None:
+            output_tokens = len(text) // 4
+        tracker.record(CallRecord(agent, model, prompt_tokens, output_tokens, time.perf_counter() - start,
+                                  retries, current_request_id()))
+        span.set_attribute("prompt_tokens", prompt_tokens)
+        span.set_attribute("output_tokens", output_tokens)
+        span.set_attribute("retries", retries)
+    return text
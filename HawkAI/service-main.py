@@ -0,0 +1,31 @@
+# service-main.py - Async HTTP service mode
+"""
+Standalone asyncio HTTP service: the webhook fulfillment contract of
+main.projectHawkAI_handler on POST / plus the multi-agent coordinator on
+POST /coordinator, with keep-alive connections and pre-forked workers.
+
+    python service-main.py --port 8080 --workers 4
+"""
+import argparse
+
+from config.constants import SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_KEEPALIVE_SECONDS
+from service import HawkAIService, run_workers, stop_workers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Worker processes")
+    parser.add_argument("--keepalive", type=float, default=SERVICE_KEEPALIVE_SECONDS,
+                        help="Idle seconds before a keep-alive connection is closed")
+    args = parser.parse_args()
+
+    processes, port = run_workers(HawkAIService, args.host, args.port, args.workers, args.keepalive)
+    print(f"🚀 ProjectHawkAI service on http://{args.host}:{port} ({len(processes)} worker(s))")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping workers...")
+    finally:
+        stop_workers(processes)
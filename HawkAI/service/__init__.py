@@ -0,0 +1,4 @@
+from .http import Request, HttpError, connection_handler, serve, run_workers, stop_workers
+from .app import HawkAIService
+
+__all__ = ['Request', 'HttpError', 'connection_handler', 'serve', 'run_workers', 'stop_workers', 'HawkAIService']
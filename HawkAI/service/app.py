@@ -0,0 +1,101 @@
+# service/app.py
+import asyncio
+import os
+import time
+
+from config.constants import SERVICE_MAX_DEADLINE_SECONDS
+from models import model_registry
+from monitoring import request_scope, tracer, usage_tracker, coalescing_stats
+from .http import Request, Response
+
+
+class HawkAIService:
+    """
+    Async routes of the HTTP service mode. One instance per worker
+    process: the HawkAI agent, the coordinator (built on first use) and
+    the usage tracker are shared by every connection in the worker.
+
+    - POST / and /fulfillment: same contract as main.projectHawkAI_handler
+    - POST /coordinator: {"prompt": ..., "deadline_s": optional} through
+      CoordinatorAgent.process_request; deadline_s must be positive and is
+      capped at SERVICE_MAX_DEADLINE_SECONDS
+    - GET /healthz, GET /usage
+    """
+
+    def __init__(self):
+        # The handler module builds its agent at import time, after any backend switch
+        import main
+        self.main = main
+        self._coordinator = None
+        self._coordinator_lock = asyncio.Lock()
+
+    async def __call__(self, request: Request) -> Response:
+        if request.method == "OPTIONS":
+            return 204, self.main.PREFLIGHT_HEADERS, b""
+        route = {
+            ("POST", "/"): self.fulfillment,
+            ("POST", "/fulfillment"): self.fulfillment,
+            ("POST", "/coordinator"): self.coordinator,
+            ("GET", "/healthz"): self.healthz,
+            ("GET", "/usage"): self.usage
+        }.get((request.method, request.path))
+        if route is None:
+            status = 405 if request.path in ("/", "/fulfillment", "/coordinator") else 404
+            return status, self.main.RESPONSE_HEADERS, {"error": "Only POST method supported" if status == 405
+                                                        else f"No route for {request.path}"}
+        return await route(request)
+
+    async def fulfillment(self, request: Request) -> Response:
+        main, headers = self.main, self.main.RESPONSE_HEADERS
+        try:
+            request_json = request.get_json(silent=True)
+            if not request_json:
+                return 400, headers, main.fulfillment_response("No request data received")
+
+            # Image decoding is CPU-bound: keep it off the event loop
+            if 'image' in request_json:
+                parsed = await asyncio.to_thread(main.parse_fulfillment_request, request_json)
+            else:
+                parsed = main.parse_fulfillment_request(request_json)
+            user_query, intent_name, request_image = parsed
+
+            start = time.perf_counter()
+            with request_scope() as request_id, tracer.span("analyze_request", request_id=request_id):
+                response_text = await main.agent.analyze_request_async(user_query, intent_name, request_image)
+            usage_tracker.record_request_latency("service", time.perf_counter() - start)
+            return 200, headers, main.fulfillment_response(response_text)
+        except Exception as e:
+            return 500, headers, main.fulfillment_response(f"🚨 HawkAI System Error: {str(e)}")
+
+    async def coordinator(self, request: Request) -> Response:
+        body = request.get_json(silent=True) or {}
+        prompt = body.get("prompt") or body.get("text")
+        if not prompt:
+            return 400, {}, {"error": "Missing prompt"}
+        deadline_s = body.get("deadline_s")
+        if deadline_s is not None:
+            if isinstance(deadline_s, bool) or not isinstance(deadline_s, (int, float)) or not deadline_s > 0:
+                return 400, {}, {"error": "deadline_s must be a positive number of seconds"}
+            deadline_s = float(min(deadline_s, SERVICE_MAX_DEADLINE_SECONDS))
+        try:
+            coordinator = await self._get_coordinator()
+        except Exception as e:
+            return 503, {}, {"error": f"Coordinator unavailable: {str(e)}"}
+        result = await coordinator.process_request(prompt, deadline_s=deadline_s)
+        return 200, {}, result
+
+    async def _get_coordinator(self):
+        async with self._coordinator_lock:
+            if self._coordinator is None:
+                from agents.coordinator import CoordinatorAgent
+                from config.constants import PROJECT_ID, LOCATION
+                self._coordinator = await asyncio.to_thread(CoordinatorAgent, PROJECT_ID, LOCATION)
+            return self._coordinator
+
+    async def healthz(self, request: Request) -> Response:
+        return 200, {}, {"status": "ok", "pid": os.getpid()}
+
+    async def usage(self, request: Request) -> Response:
+        return 200, {}, {"pid": os.getpid(), **usage_tracker.summary(),
+                         "latency_ms": usage_tracker.latency_percentiles(), "coalescing": coalescing_stats(),
+                         "models": model_registry.stats()}
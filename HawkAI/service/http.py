@@ -0,0 +1,206 @@
+# service/http.py
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+
+from config.constants import SERVICE_KEEPALIVE_SECONDS, SERVICE_MAX_BODY_BYTES
+from monitoring import tracer
+
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class Request:
+    """One parsed HTTP/1.1 (or 1.0) request"""
+
+    __slots__ = ("method", "path", "headers", "body", "version")
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes, version: str = "HTTP/1.1"):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.version = version
+
+    @property
+    def keep_alive(self) -> bool:
+        """HTTP/1.1 connections persist unless closed; HTTP/1.0 ones only on request"""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def get_json(self, silent: bool = False):
+        """Same signature as flask.Request.get_json, so handlers can share parsing code"""
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            if silent:
+                return None
+            raise
+
+
+# (status, headers, body); a str or dict body is encoded as text or JSON
+Response = Tuple[int, Dict[str, str], Any]
+App = Callable[[Request], Awaitable[Response]]
+
+
+class HttpError(Exception):
+    def __init__(self, status: int):
+        super().__init__(REASONS.get(status, str(status)))
+        self.status = status
+
+
+async def read_request(reader: asyncio.StreamReader, max_body_bytes: int) -> Optional[Request]:
+    """Read the next request on a connection, or None when the client has closed it"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HttpError(400)
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(400)
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        raise HttpError(411)
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400)
+    if length < 0:
+        raise HttpError(400)
+    if length > max_body_bytes:
+        raise HttpError(413)
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), path.split("?", 1)[0], headers, body, version.strip().upper())
+
+
+def encode_response(status: int, headers: Dict[str, str], body: Any, keep_alive: bool) -> bytes:
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body, default=str)
+        headers = {"Content-Type": "application/json", **headers}
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def connection_handler(app: App, keepalive_s: float = SERVICE_KEEPALIVE_SECONDS,
+                       max_body_bytes: int = SERVICE_MAX_BODY_BYTES):
+    """
+    asyncio.start_server callback serving requests on one connection until
+    the client closes it, asks for Connection: close or idles `keepalive_s`
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader, max_body_bytes), keepalive_s)
+                except asyncio.TimeoutError:
+                    break
+                except HttpError as e:
+                    writer.write(encode_response(e.status, {}, {"error": str(e)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                keep_alive = request.keep_alive
+                try:
+                    status, headers, body = await app(request)
+                except Exception as e:
+                    status, headers, body = 500, {}, {"error": str(e)}
+                writer.write(encode_response(status, headers, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client went away, or the worker is shutting down
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+def bind_socket(host: str, port: int, backlog: int = 1024) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+async def serve(app_factory: Callable[[], App], sock: socket.socket, keepalive_s: float = SERVICE_KEEPALIVE_SECONDS):
+    """Serve on an already bound socket until the process is stopped"""
+    app = app_factory()
+    server = await asyncio.start_server(connection_handler(app, keepalive_s), sock=sock,
+                                        limit=MAX_HEADER_BYTES)
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda: stop.done() or stop.set_result(None))
+    async with server:
+        await stop
+
+
+def _worker(app_factory, sock, keepalive_s, setup):
+    # Forked workers skip atexit: close the trace files (opened for this pid after the fork) here
+    if setup:
+        setup()
+    try:
+        asyncio.run(serve(app_factory, sock, keepalive_s))
+    finally:
+        tracer.shutdown()
+
+
+def run_workers(app_factory: Callable[[], App], host: str, port: int, workers: int = 1,
+                keepalive_s: float = SERVICE_KEEPALIVE_SECONDS,
+                setup: Optional[Callable[[], None]] = None) -> Tuple[List[multiprocessing.Process], int]:
+    """
+    Bind once, then fork `workers` processes that accept on the shared
+    socket. Each worker builds its own app (agents, caches, usage tracker)
+    and shares it across all of its connections. `setup` runs first in
+    each worker. Returns the processes and the bound port (for port 0).
+    """
+    sock = bind_socket(host, port)
+    port = sock.getsockname()[1]
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_worker, args=(app_factory, sock, keepalive_s, setup), daemon=True)
+                 for _ in range(max(1, workers))]
+    for process in processes:
+        process.start()
+    sock.close()
+    return processes, port
+
+
+def stop_workers(processes: List[multiprocessing.Process], timeout: float = 5.0) -> None:
+    for process in processes:
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+    for process in processes:
+        process.join(timeout)
@@ -1,15 +1,16 @@
 # simplified_main.py
 import asyncio
 import json
+import time
 from datetime import datetime
-import vertexai
-from vertexai.generative_models import GenerativeModel
 
 from google.adk.agents import Agent
 from typing import Dict, Any
 
 # Import project constants
 from config.constants import PROJECT_ID, LOCATION, MODEL_NAME_PRO
+from monitoring import tracked_call, request_scope, usage_tracker, HistoryLog, with_usage_totals
+from models import init_backend, create_model, start_session
 
 class SimpleCoordinatorAgent:
     """
@@ -21,10 +22,10 @@ class SimpleCoordinatorAgent:
         self.location = location
         
         # Initialize Vertex AI
-        vertexai.init(project=project_id, location=location)
+        init_backend(project_id, location)
         
         # Initialize the coordinator model
-        self.model = GenerativeModel(
+        self.model = create_model(
             model_name=MODEL_NAME_PRO,
             system_instruction="""
             You are ProjectHawkAI Coordinator, an AI agent for proactive event safety monitoring.
@@ -51,14 +52,20 @@ class SimpleCoordinatorAgent:
             """
         )
         
-        self.chat_session = self.model.start_chat()
-        self.conversation_history = []
+        # Stateless calls unless STATEFUL_CHAT_SESSIONS is set
+        self.chat_session = start_session(self.model)
+        self.conversation_history = HistoryLog("simple_conversation")
+    
+    def _model_call(self, prompt: str):
+        if self.chat_session is not None:
+            return self.chat_session.send_message(prompt)
+        return self.model.generate_content(prompt)
     
     async def process_request(self, user_prompt: str) -> Dict[str, Any]:
         """
         Process user request through the coordinator
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Analyze which agent logic would be invoked
         agent_analysis = self._analyze_agent_routing(user_prompt)
@@ -76,29 +83,34 @@ class SimpleCoordinatorAgent:
         Be brief and actionable.
         """
         
-        try:
-            response = self.chat_session.send_message(enhanced_prompt)
-            
-            result = {
-                "user_request": user_prompt,
-                "coordinator_response": response.text,
-                "processing_time": (datetime.now() - start_time).total_seconds(),
-                "timestamp": datetime.now().isoformat(),
-                "analysis_type": "comprehensive",
-                "agent_routing": agent_analysis  # Added agent routing info
-            }
-            
-            self.conversation_history.append(result)
-            return result
-            
-        except Exception as e:
-            return {
-                "user_request": user_prompt,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat(),
-                "processing_time": (datetime.now() - start_time).total_seconds(),
-                "agent_routing": agent_analysis
-            }
+        with request_scope() as request_id:
+            try:
+                response = tracked_call("simple_coordinator", MODEL_NAME_PRO, self._model_call, enhanced_prompt)
+                
+                result = {
+                    "request_id": request_id,
+                    "user_request": user_prompt,
+                    "coordinator_response": response.text,
+                    "processing_time": time.perf_counter() - start_time,
+                    "timestamp": datetime.now().isoformat(),
+                    "analysis_type": "comprehensive",
+                    "agent_routing": agent_analysis,  # Added agent routing info
+                    "usage": usage_tracker.request_usage(request_id)
+                }
+                
+                usage_tracker.record_request_latency("simplified", result['processing_time'])
+                self.conversation_history.append(result)
+                return result
+                
+            except Exception as e:
+                return {
+                    "request_id": request_id,
+                    "user_request": user_prompt,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat(),
+                    "processing_time": time.perf_counter() - start_time,
+                    "agent_routing": agent_analysis
+                }
     
     def _analyze_agent_routing(self, user_prompt: str) -> Dict[str, Any]:
         """
@@ -156,7 +168,8 @@ class SimpleProjectHawkAISystem:
     
     def __init__(self):
         self.coordinator = SimpleCoordinatorAgent(PROJECT_ID, LOCATION)
-        self.session_history = []
+        # Running token/cost totals cover the whole session, not just the in-memory window
+        self.session_history = HistoryLog("simple_session", numeric_fields=("processing_time", "tokens", "cost_usd"))
     
     async def process_prompt(self, user_prompt: str) -> Dict[str, Any]:
         """
@@ -169,7 +182,7 @@ class SimpleProjectHawkAISystem:
             result = await self.coordinator.process_request(user_prompt)
             
             self._display_results(result)
-            self.session_history.append(result)
+            self.session_history.append(with_usage_totals(result))
             
             return result
             
@@ -217,11 +230,17 @@ class SimpleProjectHawkAISystem:
             return {"message": "No requests processed yet"}
         
         total_requests = len(self.session_history)
-        avg_processing_time = sum(r['processing_time'] for r in self.session_history) / total_requests
+        avg_processing_time = self.session_history.mean('processing_time')
+        tokens_per_request = self.session_history.mean('tokens')
         
         return {
             "total_requests": total_requests,
             "average_processing_time": avg_processing_time,
+            "tokens_per_request": round(tokens_per_request, 1) if tokens_per_request is not None else 0,
+            "estimated_cost_usd": round(self.session_history.total('cost_usd'), 6),
+            "usage_by_agent": usage_tracker.summary()['by_agent'],
+            "latency_ms": usage_tracker.latency_percentiles("mode/simplified").get("mode/simplified", {}),
+            "model_latency_by_agent_ms": usage_tracker.latency_percentiles("agent/"),
             "session_start": self.session_history[0]['timestamp'] if self.session_history else None,
             "latest_request": self.session_history[-1]['timestamp'] if self.session_history else None
         }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Load time and memory of the binary embedding store against the float
+JSONL it replaces. Each load runs in a fresh process and is measured up to
+having every vector available for one similarity pass; RSS is the growth
+over a process that has only imported numpy.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from embedding_store import EmbeddingStore, jsonl_to_store, store_paths
+
+DIMENSION = 1408
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def measure(mode: str, path: str) -> dict:
+    """Runs in the child: load, then one dot product against every vector"""
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if mode == "jsonl":
+        # What query_image.py did: parse every line into an array
+        with open(path) as f:
+            vectors = np.array([json.loads(line)["embedding"] for line in f if line.strip()], dtype=np.float32)
+    else:
+        vectors = EmbeddingStore.load(path).vectors
+    loaded = time.perf_counter() - start
+    loaded_rss = rss_mb() - baseline
+    query = np.ones(vectors.shape[1], dtype=vectors.dtype)
+    (vectors @ query).max()
+    return {"load_seconds": round(loaded, 4), "load_and_scan_seconds": round(time.perf_counter() - start, 4),
+            "rss_after_load_mb": round(loaded_rss, 1), "rss_after_scan_mb": round(rss_mb() - baseline, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def write_jsonl(path: str, count: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as f:
+        for start in range(0, count, 1000):
+            block = rng.standard_normal((min(1000, count - start), DIMENSION)).astype(np.float32) * 0.05
+            for i, vector in enumerate(block):
+                f.write(json.dumps({"id": f"sample_{start + i:07d}.jpg", "embedding": vector.tolist(),
+                                    "metadata": {"gcs_path": f"gs://local-bucket/uploaded_images/"
+                                                             f"sample_{start + i:07d}.jpg"}}) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        sys.exit(0)
+
+    print(f"=== HawkAI Embedding Store Benchmark ({args.vectors} x {DIMENSION}) ===\n")
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        jsonl_path = os.path.join(root, "image_embeddings.jsonl")
+        write_jsonl(jsonl_path, args.vectors)
+        runs = [("jsonl", jsonl_path, os.path.getsize(jsonl_path), 0.0)]
+        for dtype in ("float32", "float16"):
+            base = os.path.join(root, f"image_embeddings_{dtype}")
+            start = time.perf_counter()
+            jsonl_to_store(jsonl_path, base, dtype)
+            convert = time.perf_counter() - start
+            runs.append((f"store {dtype}", base, sum(os.path.getsize(p) for p in store_paths(base).values()),
+                         convert))
+
+        for mode, path, size, convert in runs:
+            # Drop nothing from the page cache: every mode reads warm files, so the gap is parsing, not disk
+            child = subprocess.run([sys.executable, __file__, "--measure", mode.split()[0], path],
+                                   capture_output=True, text=True, check=True)
+            row = {"format": mode, "size_mb": round(size / 2 ** 20, 1), "convert_seconds": round(convert, 2),
+                   **json.loads(child.stdout.strip().splitlines()[-1])}
+            results.append(row)
+            print(f"💾 {mode:<14} | {row['size_mb']:8.1f} MB on disk | load {row['load_seconds'] * 1000:9.1f} ms | "
+                  f"load+scan {row['load_and_scan_seconds'] * 1000:9.1f} ms | RSS +{row['rss_after_load_mb']:7.1f} MB "
+                  f"loaded, +{row['rss_after_scan_mb']:7.1f} MB scanned, peak {row['peak_rss_mb']:7.1f} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "benchmark_embedding_store", "config": vars(args), "results": results},
+                      f, indent=2)
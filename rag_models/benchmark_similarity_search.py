@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+Throughput of the vectorized top-k search over memory-mapped embedding
+stores of 10k, 100k and 1M vectors, against the per-line
+cosine_similarity loop query_image.py used to run. Each store has one
+planted near-duplicate of the query, so every run also checks that the
+top hit is the true best match.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from embedding_store import EmbeddingStore, StoreWriter
+from similarity_search import top_k, search, TOP_K
+
+DIMENSION = 1408
+BLOCK = 50000
+LOOP_SAMPLE = 20000  # rows timed for the per-line loop; larger stores are extrapolated
+
+
+def cosine_similarity(v1, v2):
+    # The function query_image.py called once per stored vector
+    v1, v2 = np.array(v1), np.array(v2)
+    return np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+
+
+def build_store(base: str, count: int, dtype: str, planted: int, seed: int = 0) -> np.ndarray:
+    """Random store with a near-duplicate of the returned query at row `planted`"""
+    rng = np.random.default_rng(seed)
+    query = rng.standard_normal(DIMENSION, dtype=np.float32)
+    writer = StoreWriter(base, count, DIMENSION, dtype)
+    for start in range(0, count, BLOCK):
+        block = rng.standard_normal((min(BLOCK, count - start), DIMENSION), dtype=np.float32)
+        if start <= planted < start + len(block):
+            block[planted - start] = query + 0.3 * rng.standard_normal(DIMENSION, dtype=np.float32)
+        writer.add_batch([f"sample_{row:07d}.jpg" for row in range(start, start + len(block))], block)
+    writer.close()
+    return query
+
+
+def timed(func, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--float16-from", type=int, default=1000000,
+                        help="Store sizes at or above this use float16, so the matrix fits in page cache")
+    parser.add_argument("--batch", type=int, default=32, help="Queries per matrix-matrix search")
+    parser.add_argument("--k", type=int, default=TOP_K)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print(f"=== HawkAI Similarity Search Benchmark (top-{args.k}, {DIMENSION}-dim) ===\n")
+    results = []
+    rng = np.random.default_rng(1)
+    for size in args.sizes:
+        dtype = "float16" if size >= args.float16_from else "float32"
+        with tempfile.TemporaryDirectory() as root:
+            base = os.path.join(root, "image_embeddings")
+            planted = size * 2 // 3
+            query = build_store(base, size, dtype, planted)
+            start = time.perf_counter()
+            store = EmbeddingStore.load(base)
+            load_seconds = time.perf_counter() - start
+
+            hit = search(store, query, k=args.k)[0][0]
+            single = timed(lambda: top_k(store.vectors, query, args.k), args.repeats)
+            queries = np.vstack([query, rng.standard_normal((args.batch - 1, DIMENSION))])
+            batch = timed(lambda: top_k(store.vectors, queries, args.k), max(1, args.repeats // 2))
+
+            sample = min(size, LOOP_SAMPLE)
+            start = time.perf_counter()
+            for row in range(sample):
+                cosine_similarity(query.tolist(), store.vectors[row])
+            loop = (time.perf_counter() - start) * size / sample
+            del store
+
+        row = {"vectors": size, "dtype": dtype, "load_ms": round(load_seconds * 1000, 2),
+               "top1_correct": hit.row == planted, "top1_score": round(hit.score, 4),
+               "single_query_ms": round(single * 1000, 2), "single_queries_per_second": round(1 / single, 1),
+               "batch_queries_per_second": round(args.batch / batch, 1),
+               "loop_ms": round(loop * 1000, 1), "loop_extrapolated": size > sample,
+               "speedup_single": round(loop / single, 1)}
+        results.append(row)
+        print(f"🔎 {size:>9,} x {dtype:<7} | load {row['load_ms']:7.2f} ms | 1 query {row['single_query_ms']:9.2f} ms "
+              f"| batch of {args.batch}: {row['batch_queries_per_second']:8.1f} q/s | per-line loop "
+              f"{row['loop_ms']:10.1f} ms{' (est.)' if row['loop_extrapolated'] else ''} | "
+              f"{row['speedup_single']:6.1f}x | top-1 {'✅' if row['top1_correct'] else '❌'} {row['top1_score']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "benchmark_similarity_search", "config": vars(args), "results": results},
+                      f, indent=2)
@@ -1,9 +1,18 @@
 import os
 import json
+import sys
+import argparse
 import vertexai
 from vertexai.preview.vision_models import MultiModalEmbeddingModel, Image
 from google.cloud import storage, aiplatform
 
+from embedding_pipeline import (EmbeddingPipeline, list_images, is_image, jsonl_line, datapoint_id, RunSummary,
+                                EMBEDDING_DIMENSION)
+from index_manifest import Manifest, MANIFEST_FILE
+from run_checkpoint import CheckpointedWriter, failed_blobs, write_run_summary
+from embedding_store import jsonl_to_store, upload_store_to_gcs, STORE_BASE
+from recreate_index import get_index, to_datapoint, upsert_datapoints, remove_datapoints, UPSERT_BATCH_SIZE
+
 # ---- Config ----
 PROJECT = "hawkai-467107"
 LOCATION = "asia-south1"
@@ -12,81 +21,296 @@ IMAGE_FOLDER = "uploaded_images"
 JSONL_FILE = "image_embeddings.jsonl"
 GCS_JSONL_PATH = f"gs://{BUCKET_NAME}/{JSONL_FILE}"
 INDEX_DISPLAY_NAME = "image-index-fixed"
-EMBEDDING_DIMENSION = 1408  # MultimodalEmbedding model output
+EMBEDDING_MODEL = "multimodalembedding@001"  # pinned: the manifest re-embeds everything when this changes
+
+# ---- Init (on first use, so --local runs need no credentials) ----
+_clients = {}
 
-# ---- Init ----
-vertexai.init(project=PROJECT, location=LOCATION)
-aiplatform.init(project=PROJECT, location=LOCATION)
-model = MultiModalEmbeddingModel.from_pretrained("multimodalembedding")
-storage_client = storage.Client()
-bucket = storage_client.bucket(BUCKET_NAME)
+def get_clients():
+    if not _clients:
+        vertexai.init(project=PROJECT, location=LOCATION)
+        aiplatform.init(project=PROJECT, location=LOCATION)
+        _clients["model"] = MultiModalEmbeddingModel.from_pretrained(EMBEDDING_MODEL)
+        _clients["storage"] = storage.Client()
+        _clients["bucket"] = _clients["storage"].bucket(BUCKET_NAME)
+    return _clients
+
+def model_version(model) -> str:
+    return getattr(model, "version", EMBEDDING_MODEL)
 
 # ---- Step 1: Extract Embeddings from GCS ----
 def extract_embedding_from_gcs(gcs_path: str):
+    clients = get_clients()
     blob_path = gcs_path.replace(f"gs://{BUCKET_NAME}/", "")
-    blob = bucket.blob(blob_path)
-    image_bytes = blob.download_as_bytes()
-    image = Image(image_bytes=image_bytes)
-    response = model.get_embeddings(image=image)
-    return response.image_embedding
-
-def extract_embeddings_and_write_jsonl():
-    jsonl_lines = []
-    image_count = 0
-
-    for blob in storage_client.list_blobs(BUCKET_NAME, prefix=IMAGE_FOLDER):
-        if not blob.name.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
-            continue
-
-        gcs_uri = f"gs://{BUCKET_NAME}/{blob.name}"
-        try:
-            print(f"🔄 Processing: {gcs_uri}")
-            embedding = extract_embedding_from_gcs(gcs_uri)
-
-            if embedding and len(embedding) == EMBEDDING_DIMENSION:
-                json_obj = {
-                    "id": os.path.basename(blob.name),
-                    "embedding": embedding,  # Must be a flat list!
-                    "metadata": {"gcs_path": gcs_uri}
-                }
-                jsonl_lines.append(json.dumps(json_obj))
-                image_count += 1
-            else:
-                print(f"⚠️ Skipped: Invalid or empty embedding for {blob.name}")
+    image_bytes = clients["bucket"].blob(blob_path).download_as_bytes()
+    return embed_image_bytes(image_bytes)
 
-        except Exception as e:
-            print(f"❌ Error processing {blob.name}: {e}")
-
-    if image_count == 0:
-        raise RuntimeError("❌ No valid embeddings found. JSONL will not be created.")
-
-    with open(JSONL_FILE, "w") as f:
-        f.write("\n".join(jsonl_lines))
-
-    print(f"✅ Saved {image_count} embeddings to {JSONL_FILE}")
+def embed_image_bytes(image_bytes: bytes, model=None):
+    model = model or get_clients()["model"]
+    response = model.get_embeddings(image=Image(image_bytes=image_bytes))
+    return response.image_embedding
 
-# ---- Step 2: Upload JSONL to GCS ----
+def embed_to_jsonl(items, model, output_path: str, **pipeline_options):
+    """Run the staged pipeline over `items`, streaming each line to output_path; returns (summary, written items)"""
+    written = []
+    with open(output_path, "w") as f:
+        def write(item):
+            f.write(jsonl_line(item) + "\n")
+            f.flush()
+            item.embedding = None
+            written.append(item)
+
+        pipeline = EmbeddingPipeline(lambda data: embed_image_bytes(data, model), write, **pipeline_options)
+        summary = pipeline.run(items)
+    return summary, written
+
+def extract_embeddings_and_write_jsonl(bucket=None, model=None, output_path: str = JSONL_FILE,
+                                       manifest: Manifest = None, resume: bool = True, retry_failed: bool = False,
+                                       **pipeline_options) -> RunSummary:
+    """
+    Embed every image under IMAGE_FOLDER with the staged pipeline,
+    appending each JSONL line as soon as its embedding is ready and
+    checkpointing every CHECKPOINT_EVERY images. An interrupted run picks
+    up where its last checkpoint left off; `retry_failed` embeds only the
+    failures listed in the previous run summary. `bucket` and `model`
+    default to GCS and Vertex AI; local stand-ins work too. Completed
+    blobs are recorded in `manifest` when one is given.
+    """
+    if bucket is None:
+        bucket = get_clients()["bucket"]
+    if model is None:
+        model = get_clients()["model"]
+
+    writer = CheckpointedWriter(output_path, resume=resume or retry_failed, model_version=model_version(model))
+    if retry_failed and writer.resuming:
+        blobs = failed_blobs(output_path, bucket)
+    else:
+        if retry_failed:
+            print("⚠️ No usable checkpoint to retry into; embedding every image instead")
+        blobs = [blob for blob in bucket.list_blobs(prefix=IMAGE_FOLDER) if is_image(blob)]
+    pipeline = EmbeddingPipeline(lambda data: embed_image_bytes(data, model), writer, **pipeline_options)
+    completed = False
+    try:
+        summary = pipeline.run(writer.pending(list_images(blobs, bucket.name)))
+        completed = True
+    finally:
+        # An interrupted run keeps its checkpoint, so the next one resumes
+        writer.close(pipeline.summary, completed)
+    summary.resumed = writer.resumed
+    report = write_run_summary(output_path, summary, checkpoints=writer.checkpoints)
+
+    if not writer.completed:
+        os.remove(output_path)
+        print(f"❌ No valid embeddings found. JSONL will not be created; failures are listed in {report}")
+        return summary
+
+    if manifest is not None:
+        for blob in blobs:
+            if f"gs://{bucket.name}/{blob.name}" in writer.completed:
+                manifest.record(blob, datapoint_id(blob.name), model_version(model))
+        manifest.save()
+
+    stats = summary.as_dict()
+    print(f"✅ Saved {stats['written']} embeddings to {output_path} ({stats['images_per_second']} images/s, "
+          f"{stats['resumed']} from an earlier run, {stats['failed']} failed, {stats['skipped']} skipped)")
+    if summary.failures:
+        print(f"⚠️ {len(summary.failures)} images failed; see {report} and rerun with --retry-failed")
+    return summary
+
+# ---- Step 1b: Incremental update from the manifest ----
+def merge_jsonl_snapshot(output_path: str, delta_path: str, replaced_ids: set, added_ids: set) -> None:
+    """
+    Rewrite the full JSONL without replaced/deleted ids, then append the
+    upserted delta lines. Where two blobs share a datapoint id, the later
+    line wins, as the later upsert does in the index.
+    """
+    with open(delta_path) as f:
+        last_line = {json.loads(line)["id"]: number for number, line in enumerate(f)}
+    tmp = f"{output_path}.tmp"
+    with open(tmp, "w") as out:
+        if os.path.exists(output_path):
+            with open(output_path) as f:
+                for line in f:
+                    if line.strip() and json.loads(line)["id"] not in replaced_ids:
+                        out.write(line.rstrip("\n") + "\n")
+        with open(delta_path) as f:
+            for number, line in enumerate(f):
+                datapoint = json.loads(line)["id"]
+                if datapoint in added_ids and last_line[datapoint] == number:
+                    out.write(line)
+    os.replace(tmp, output_path)
+
+def update_index_incrementally(bucket=None, model=None, index=None, manifest_path: str = MANIFEST_FILE,
+                               output_path: str = JSONL_FILE, batch_size: int = UPSERT_BATCH_SIZE,
+                               **pipeline_options) -> RunSummary:
+    """
+    Embed and upsert only the images that are new or changed since the
+    manifest was written, and remove the datapoints of deleted blobs, so a
+    run costs the day's new images rather than the whole corpus. The
+    manifest is saved after each upsert batch; anything that fails stays
+    out of it and is picked up by the next run. The local JSONL snapshot
+    is rewritten with the delta so query_image.py sees the same vectors.
+    """
+    if bucket is None:
+        bucket = get_clients()["bucket"]
+    if model is None:
+        model = get_clients()["model"]
+    if index is None:
+        index = get_index(manifest_path=manifest_path)
+    version = model_version(model)
+
+    manifest = Manifest.load(manifest_path)
+    diff = manifest.diff((blob for blob in bucket.list_blobs(prefix=IMAGE_FOLDER) if is_image(blob)), version)
+    print(f"🗂️ Manifest diff: {len(diff.new)} new, {len(diff.changed)} changed, {len(diff.deleted)} deleted, "
+          f"{diff.unchanged} unchanged")
+
+    # Deletions first. Ids are basenames, so an id still used by another indexed blob (a/x.jpg
+    # deleted, b/x.jpg live) stays. One only about to be upserted for another blob (moved to
+    # b/x.jpg) stays too, unless that upsert fails, so the index never keeps the deleted vector
+    indexed_ids = {entry["id"] for name, entry in manifest.entries.items() if name not in diff.deleted}
+    removed = set(diff.deleted.values()) - indexed_ids
+    remove_unless_upserted = removed & {datapoint_id(blob.name) for blob in diff.to_embed}
+    removed -= remove_unless_upserted
+    if diff.deleted:
+        remove_datapoints(sorted(removed), index, batch_size)
+        for name in diff.deleted:
+            manifest.forget(name)
+        manifest.save()
+        print(f"🗑️ Removed {len(removed)} datapoints of {len(diff.deleted)} deleted images from the index")
+
+    delta_path = f"{output_path}.delta"
+    summary, written = embed_to_jsonl(list_images(diff.to_embed, bucket.name), model, delta_path,
+                                      **pipeline_options)
+
+    # Upsert the delta in batches, read back from disk so memory follows the batch size
+    upserted = set()
+    with open(delta_path) as f:
+        batch, items = [], iter(written)
+        for line in f:
+            batch.append((next(items), json.loads(line)))
+            if len(batch) == batch_size:
+                upserted |= upsert_batch(batch, index, manifest, version, summary)
+                batch = []
+        if batch:
+            upserted |= upsert_batch(batch, index, manifest, version, summary)
+
+    stale = sorted(remove_unless_upserted - upserted)
+    if stale:
+        remove_datapoints(stale, index, batch_size)
+        removed |= set(stale)
+        print(f"🗑️ Removed {len(stale)} datapoints of deleted images whose replacement was not upserted")
+
+    merge_jsonl_snapshot(output_path, delta_path, upserted | removed, upserted)
+    os.remove(delta_path)
+
+    stats = summary.as_dict()
+    print(f"✅ Upserted {len(upserted)} of {len(diff.to_embed)} new or changed images "
+          f"({stats['failed']} failed, {stats['skipped']} skipped); {output_path} updated")
+    return summary
+
+def upsert_batch(batch, index, manifest: Manifest, version: str, summary: RunSummary) -> set:
+    try:
+        upsert_datapoints([to_datapoint(record) for _, record in batch], index)
+    except Exception as e:
+        for item, _ in batch:
+            summary.failures[item.gcs_uri] = f"upsert: {type(e).__name__}: {e}"
+        print(f"❌ Upsert of {len(batch)} datapoints failed: {e}")
+        return set()
+    for item, record in batch:
+        manifest.record(item.blob, record["id"], version)
+    manifest.save()
+    return {record["id"] for _, record in batch}
+
+# ---- Step 1c: Binary store for query_image.py ----
+def build_embedding_store(jsonl_path: str = JSONL_FILE, base: str = STORE_BASE):
+    """The index keeps reading JSONL; queries memory-map this instead of parsing it"""
+    if os.path.exists(jsonl_path):
+        store = jsonl_to_store(jsonl_path, base)
+        print(f"✅ Wrote embedding store {base}.npy ({len(store)} x {store.dimension})")
+
+# ---- Step 2: Upload JSONL, store and manifest to GCS ----
 def upload_jsonl_to_gcs():
-    blob = bucket.blob(JSONL_FILE)
+    blob = get_clients()["bucket"].blob(JSONL_FILE)
     blob.upload_from_filename(JSONL_FILE)
     print(f"✅ Uploaded {JSONL_FILE} to {GCS_JSONL_PATH}")
 
+def upload_manifest_to_gcs(path: str = MANIFEST_FILE):
+    get_clients()["bucket"].blob(MANIFEST_FILE).upload_from_filename(path)
+    print(f"✅ Uploaded {path} to gs://{BUCKET_NAME}/{MANIFEST_FILE}")
+
+def download_from_gcs_if_missing(path: str):
+    """Fetch the shared manifest/snapshot when this machine has no local copy"""
+    blob = get_clients()["bucket"].blob(os.path.basename(path))
+    if not os.path.exists(path) and blob.exists():
+        blob.download_to_filename(path)
+        print(f"📥 Downloaded gs://{BUCKET_NAME}/{blob.name}")
+
 # ---- Step 3: Create Index ----
-def create_index():
+def create_index(manifest_path: str = MANIFEST_FILE):
+    get_clients()
     index = aiplatform.MatchingEngineIndex.create_tree_ah_index(
         display_name=INDEX_DISPLAY_NAME,
         contents_delta_uri=GCS_JSONL_PATH,
         dimensions=EMBEDDING_DIMENSION,
         approximate_neighbors_count=150,
-        distance_measure_type="DOT_PRODUCT_DISTANCE"
+        distance_measure_type="DOT_PRODUCT_DISTANCE",
+        index_update_method="STREAM_UPDATE"  # so later runs can upsert/remove datapoints
     )
     print(f"✅ Created Matching Engine Index: {index.resource_name}")
+    # Incremental runs upsert into whatever index the manifest names
+    manifest = Manifest.load(manifest_path)
+    manifest.index_name = index.resource_name
+    manifest.save()
+    return index
 
 # ---- Run Everything ----
 if __name__ == "__main__":
-    extract_embeddings_and_write_jsonl()
-    upload_jsonl_to_gcs()
-    create_index()
+    parser = argparse.ArgumentParser(description="Embed bucket images and keep the Matching Engine index up to date")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Re-embed every image and create a new index instead of upserting the delta")
+    parser.add_argument("--local", metavar="DIR",
+                        help="Read images from DIR/uploaded_images and embed with the offline stand-in model; "
+                             "JSONL and manifest are written to DIR, the index is an in-memory stand-in")
+    parser.add_argument("--fresh", action="store_true",
+                        help="With --rebuild, ignore the checkpoint of an unfinished run (interrupted or with "
+                             "failures) and re-embed every image; without it, images embedded by that run with "
+                             "the same model are reused")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="With --rebuild, embed only the failures listed in the last run summary")
+    args = parser.parse_args()
+    rebuild_options = {"resume": not args.fresh, "retry_failed": args.retry_failed}
+
+    if args.local:
+        from local_stand_ins import LocalBucket, FakeEmbeddingModel, LocalIndex
+        bucket, model = LocalBucket(args.local), FakeEmbeddingModel()
+        manifest_path, output_path = os.path.join(args.local, MANIFEST_FILE), os.path.join(args.local, JSONL_FILE)
+        if args.rebuild:
+            manifest = Manifest.load(manifest_path) if args.retry_failed else Manifest(manifest_path)
+            extract_embeddings_and_write_jsonl(bucket, model, output_path, manifest, requests_per_minute=None,
+                                               **rebuild_options)
+        else:
+            update_index_incrementally(bucket, model, LocalIndex(), manifest_path, output_path,
+                                       requests_per_minute=None)
+        build_embedding_store(output_path, os.path.join(args.local, STORE_BASE))
+    elif args.rebuild:
+        manifest = Manifest.load(MANIFEST_FILE) if args.retry_failed else Manifest(MANIFEST_FILE)
+        summary = extract_embeddings_and_write_jsonl(manifest=manifest, **rebuild_options)
+        if not summary.written and not summary.resumed:
+            sys.exit(1)
+        build_embedding_store()
+        upload_jsonl_to_gcs()
+        upload_store_to_gcs(get_clients()["bucket"])
+        create_index()
+        upload_manifest_to_gcs()
+    else:
+        download_from_gcs_if_missing(MANIFEST_FILE)
+        download_from_gcs_if_missing(JSONL_FILE)
+        update_index_incrementally()
+        build_embedding_store()
+        upload_jsonl_to_gcs()
+        upload_store_to_gcs(get_clients()["bucket"])
+        upload_manifest_to_gcs()
+
 
 
 
@@ -0,0 +1,261 @@
+import json
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+EMBEDDING_DIMENSION = 1408  # MultimodalEmbedding model output
+
+# ---- Pipeline defaults ----
+DOWNLOAD_WORKERS = 8
+PREPROCESS_WORKERS = 2
+EMBED_WORKERS = 4
+EMBED_REQUESTS_PER_MINUTE = 120  # multimodalembedding online prediction quota
+QUEUE_SIZE = 32
+MAX_RETRIES = 4
+MAX_IMAGE_BYTES = 20 * 2 ** 20  # larger images are downscaled before embedding
+
+_DONE = object()
+
+# Errors worth retrying: quota, unavailable, timeouts (google.api_core and requests class names)
+TRANSIENT_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+                    "InternalServerError", "GatewayTimeout", "ConnectionError", "Timeout", "TimeoutError"}
+
+
+class RateLimiter:
+    """Token bucket shared by all embed workers: at most `per_minute` calls, bursts of `burst`"""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_transient(error: Exception) -> bool:
+    return type(error).__name__ in TRANSIENT_ERRORS or isinstance(error, (ConnectionError, TimeoutError))
+
+
+def with_retries(func: Callable, *args, max_retries: int = MAX_RETRIES, base_delay: float = 1.0):
+    """Call func, retrying transient errors with jittered exponential backoff"""
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args)
+        except Exception as e:
+            if attempt == max_retries or not is_transient(e):
+                raise
+            time.sleep(base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def preprocess_image(image_bytes: bytes, max_bytes: int = MAX_IMAGE_BYTES) -> bytes:
+    """Reject empty or non-image payloads; downscale images over the model's size limit"""
+    if not image_bytes:
+        raise ValueError("empty image")
+    if not (image_bytes[:3] == b"\xff\xd8\xff" or image_bytes[:8] == b"\x89PNG\r\n\x1a\n"
+            or image_bytes[8:12] == b"WEBP"):
+        raise ValueError("not a JPEG, PNG or WebP image")
+    if len(image_bytes) <= max_bytes:
+        return image_bytes
+
+    import io
+    from PIL import Image as PILImage
+    image = PILImage.open(io.BytesIO(image_bytes)).convert("RGB")
+    while True:
+        image.thumbnail((image.width * 3 // 4, image.height * 3 // 4))
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=85)
+        if out.tell() <= max_bytes:
+            return out.getvalue()
+
+
+@dataclass
+class Item:
+    """One blob moving through the pipeline"""
+    name: str
+    gcs_uri: str
+    blob: Any = None  # kept to the end so writers can record its generation/crc32c
+    data: Optional[bytes] = None
+    embedding: Optional[List[float]] = None
+
+
+@dataclass
+class RunSummary:
+    listed: int = 0
+    written: int = 0
+    skipped: int = 0
+    resumed: int = 0  # completed by an earlier, interrupted run
+    failures: Dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"listed": self.listed, "written": self.written, "skipped": self.skipped, "resumed": self.resumed,
+                "failed": len(self.failures), "failures": self.failures, "seconds": round(self.seconds, 3),
+                "images_per_second": round(self.written / self.seconds, 2) if self.seconds else 0.0}
+
+
+def datapoint_id(blob_name: str) -> str:
+    return blob_name.rsplit("/", 1)[-1]
+
+
+def jsonl_record(item: Item) -> Dict[str, Any]:
+    return {
+        "id": datapoint_id(item.name),
+        "embedding": item.embedding,  # Must be a flat list!
+        "metadata": {"gcs_path": item.gcs_uri}
+    }
+
+
+def jsonl_line(item: Item) -> str:
+    return json.dumps(jsonl_record(item))
+
+
+class EmbeddingPipeline:
+    """
+    list -> download (thread pool) -> preprocess -> embed (bounded, rate
+    limited) -> write, connected by bounded queues so a slow stage holds
+    back the ones before it instead of buffering the whole bucket in
+    memory. Transient download and embed errors are retried; an item that
+    still fails is recorded in the summary and the run continues.
+
+    `embed(image_bytes)` returns the embedding; `write(item)` is called
+    from a single writer thread as each item completes.
+    """
+
+    def __init__(self, embed: Callable[[bytes], List[float]], write: Callable[[Item], None],
+                 download_workers: int = DOWNLOAD_WORKERS, preprocess_workers: int = PREPROCESS_WORKERS,
+                 embed_workers: int = EMBED_WORKERS, requests_per_minute: Optional[float] = EMBED_REQUESTS_PER_MINUTE,
+                 queue_size: int = QUEUE_SIZE, max_retries: int = MAX_RETRIES, retry_delay: float = 1.0,
+                 dimension: int = EMBEDDING_DIMENSION, preprocess: Callable[[bytes], bytes] = preprocess_image,
+                 log: Callable[[str], None] = print):
+        self.embed = embed
+        self.write = write
+        self.preprocess = preprocess
+        self.workers = {"download": download_workers, "preprocess": preprocess_workers, "embed": embed_workers}
+        self.limiter = RateLimiter(requests_per_minute, burst=embed_workers) if requests_per_minute else None
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.dimension = dimension
+        self.log = log
+        self.summary = RunSummary()
+        self._lock = threading.Lock()
+
+    def _fail(self, item: Item, error: Exception) -> None:
+        with self._lock:
+            self.summary.failures[item.gcs_uri] = f"{type(error).__name__}: {error}"
+        self.log(f"❌ Error processing {item.name}: {error}")
+
+    def _download(self, item: Item) -> Item:
+        item.data = with_retries(item.blob.download_as_bytes, max_retries=self.max_retries,
+                                 base_delay=self.retry_delay)
+        return item
+
+    def _preprocess(self, item: Item) -> Item:
+        item.data = self.preprocess(item.data)
+        return item
+
+    def _embed(self, item: Item) -> Optional[Item]:
+        def call():
+            if self.limiter:
+                self.limiter.acquire()
+            return self.embed(item.data)
+
+        embedding = with_retries(call, max_retries=self.max_retries, base_delay=self.retry_delay)
+        item.data = None
+        if not embedding or len(embedding) != self.dimension:
+            self.log(f"⚠️ Skipped: Invalid or empty embedding for {item.name}")
+            with self._lock:
+                self.summary.skipped += 1
+            return None
+        item.embedding = list(embedding)
+        return item
+
+    def _stage(self, work: Callable[[Item], Optional[Item]], inbox: queue.Queue, outbox: queue.Queue,
+               finished: List[int], workers: int, consumers: int) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                # The last worker of a stage tells the next stage it is done
+                with self._lock:
+                    finished[0] += 1
+                    last = finished[0] == workers
+                if last:
+                    for _ in range(consumers):
+                        outbox.put(_DONE)
+                return
+            try:
+                result = work(item)
+            except Exception as e:
+                self._fail(item, e)
+                continue
+            if result is not None:
+                outbox.put(result)
+
+    def run(self, items: Iterable[Item]) -> RunSummary:
+        start = time.perf_counter()
+        downloads, preprocessed, embeds, writes = (queue.Queue(self.queue_size) for _ in range(4))
+        threads = []
+        for name, work, inbox, outbox, consumers in (
+                ("download", self._download, downloads, preprocessed, self.workers["preprocess"]),
+                ("preprocess", self._preprocess, preprocessed, embeds, self.workers["embed"]),
+                ("embed", self._embed, embeds, writes, 1)):
+            finished = [0]
+            for i in range(self.workers[name]):
+                threads.append(threading.Thread(target=self._stage, name=f"{name}-{i}", daemon=True,
+                                                args=(work, inbox, outbox, finished, self.workers[name], consumers)))
+        writer = threading.Thread(target=self._write_all, args=(writes,), name="writer", daemon=True)
+        for thread in threads + [writer]:
+            thread.start()
+
+        try:
+            for item in items:
+                self.summary.listed += 1
+                downloads.put(item)
+        finally:
+            for _ in range(self.workers["download"]):
+                downloads.put(_DONE)
+            for thread in threads:
+                thread.join()
+            writer.join()
+        self.summary.seconds = time.perf_counter() - start
+        return self.summary
+
+    def _write_all(self, writes: queue.Queue) -> None:
+        while True:
+            item = writes.get()
+            if item is _DONE:
+                return
+            try:
+                self.write(item)
+            except Exception as e:
+                self._fail(item, e)
+                continue
+            with self._lock:
+                self.summary.written += 1
+
+
+def is_image(blob: Any) -> bool:
+    return blob.name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def list_images(blobs: Iterable[Any], bucket_name: str) -> Iterable[Item]:
+    """Pipeline items for the image blobs of a bucket listing"""
+    for blob in blobs:
+        if is_image(blob):
+            yield Item(blob.name, f"gs://{bucket_name}/{blob.name}", blob)
@@ -0,0 +1,262 @@
+import argparse
+import base64
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import google_crc32c
+import numpy as np
+
+STORE_BASE = "image_embeddings"  # -> image_embeddings.npy, .norms.npy, .json
+STORE_DTYPES = {"float32": np.float32, "float16": np.float16}
+FETCH_ATTEMPTS = 5  # a fetch racing an upload waits for the sidecar that matches the new .npy files
+FETCH_RETRY_SECONDS = 3.0
+
+
+def store_paths(base: str) -> Dict[str, str]:
+    return {"vectors": f"{base}.npy", "norms": f"{base}.norms.npy", "sidecar": f"{base}.json"}
+
+
+def file_crc32c(path: str) -> str:
+    """Base64 big-endian CRC32C of a file, the form GCS reports as blob.crc32c"""
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode()
+
+
+def _values(embedding_data: dict) -> List[float]:
+    # Same two layouts recreate_index.to_datapoint accepts
+    embedding = embedding_data["embedding"]
+    return embedding["values"] if isinstance(embedding, dict) else embedding
+
+
+class EmbeddingStore:
+    """
+    Embeddings as a row-per-vector matrix of unit-length float32 (or
+    float16) in a .npy file, so `load` can memory-map it instead of
+    parsing text, plus the original norms (.norms.npy) and a JSON sidecar
+    with ids, metadata, dtype, dimension and the CRC32C of both .npy
+    files, which ties it to the exact vectors it describes. Row i of `vectors` is the
+    datapoint `ids[i]`; `offset(id)` gives its byte offset in the .npy.
+    """
+
+    def __init__(self, vectors: np.ndarray, norms: np.ndarray, ids: List[str], metadata: List[Dict[str, Any]],
+                 header_bytes: int = 0):
+        self.vectors = vectors
+        self.norms = norms
+        self.ids = ids
+        self.metadata = metadata
+        self.header_bytes = header_bytes
+        self._rows = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+    def row(self, datapoint_id: str) -> int:
+        if self._rows is None:
+            self._rows = {datapoint_id: i for i, datapoint_id in enumerate(self.ids)}
+        return self._rows[datapoint_id]
+
+    def offset(self, datapoint_id: str) -> int:
+        return self.header_bytes + self.row(datapoint_id) * self.dimension * self.vectors.itemsize
+
+    def original(self, row: int) -> np.ndarray:
+        """The vector as embedded: unit row times its stored norm"""
+        return self.vectors[row].astype(np.float32) * self.norms[row]
+
+    @classmethod
+    def load(cls, base: str = STORE_BASE, mmap: bool = True) -> "EmbeddingStore":
+        paths = store_paths(base)
+        with open(paths["sidecar"]) as f:
+            sidecar = json.load(f)
+        mode = "r" if mmap else None
+        vectors = np.load(paths["vectors"], mmap_mode=mode)
+        norms = np.load(paths["norms"], mmap_mode=mode)
+        if vectors.shape != (sidecar["count"], sidecar["dimension"]):
+            raise ValueError(f"{paths['vectors']} is {vectors.shape}, sidecar says "
+                             f"({sidecar['count']}, {sidecar['dimension']})")
+        return cls(vectors, norms, sidecar["ids"], sidecar["metadata"], sidecar["header_bytes"])
+
+
+class StoreWriter:
+    """
+    Fills a store of `count` x `dimension` vectors through a memmap, so
+    memory stays at one batch however large the store. Rows are
+    normalized on the way in; `close` writes the norms and the sidecar.
+    """
+
+    def __init__(self, base: str, count: int, dimension: int, dtype: str = "float32"):
+        self.base = base
+        self.dtype = dtype
+        self.paths = store_paths(base)
+        self.vectors = np.lib.format.open_memmap(self.paths["vectors"], mode="w+", dtype=STORE_DTYPES[dtype],
+                                                 shape=(count, dimension))
+        self.norms = np.empty(count, dtype=np.float32)
+        self.ids, self.metadata = [], []
+
+    def add_batch(self, ids: List[str], vectors: np.ndarray, metadata: List[Dict[str, Any]] = None) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        if vectors.shape[1] != self.vectors.shape[1]:
+            raise ValueError(f"{ids[0]}: expected {self.vectors.shape[1]} values, got {vectors.shape[1]}")
+        start = len(self.ids)
+        norms = np.linalg.norm(vectors, axis=1)
+        self.norms[start:start + len(ids)] = norms
+        self.vectors[start:start + len(ids)] = vectors / np.where(norms, norms, 1)[:, None]
+        self.ids.extend(ids)
+        self.metadata.extend(metadata or [{} for _ in ids])
+
+    def add(self, datapoint_id: str, vector: List[float], metadata: Dict[str, Any] = None) -> None:
+        self.add_batch([datapoint_id], vector, [metadata or {}])
+
+    def close(self) -> EmbeddingStore:
+        count, dimension = self.vectors.shape
+        if len(self.ids) != count:
+            raise ValueError(f"{self.base}: wrote {len(self.ids)} of {count} vectors")
+        self.vectors.flush()
+        header_bytes = self.vectors.offset
+        del self.vectors
+        np.save(self.paths["norms"], self.norms)
+
+        crc32c = {key: file_crc32c(self.paths[key]) for key in ("vectors", "norms")}
+        tmp = f"{self.paths['sidecar']}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"count": count, "dimension": dimension, "dtype": self.dtype, "normalized": True,
+                       "header_bytes": header_bytes, "crc32c": crc32c, "ids": self.ids,
+                       "metadata": self.metadata}, f)
+        os.replace(tmp, self.paths["sidecar"])
+        return EmbeddingStore.load(self.base)
+
+
+def jsonl_to_store(jsonl_path: str, base: str = STORE_BASE, dtype: str = "float32") -> EmbeddingStore:
+    """Convert an embeddings JSONL into a store, one line at a time"""
+    with open(jsonl_path) as f:
+        count = sum(1 for line in f if line.strip())
+        f.seek(0)
+        first = next((json.loads(line) for line in f if line.strip()), None)
+    if first is None:
+        raise ValueError(f"{jsonl_path} has no embeddings")
+
+    writer = StoreWriter(base, count, len(_values(first)), dtype)
+    with open(jsonl_path) as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                writer.add(data["id"], _values(data), data.get("metadata", {}))
+    return writer.close()
+
+
+def store_to_jsonl(base: str, jsonl_path: str) -> int:
+    """Write the store back out in the JSONL layout create_tree_ah_index and recreate_index.py read"""
+    store = EmbeddingStore.load(base)
+    with open(jsonl_path, "w") as f:
+        for row, datapoint_id in enumerate(store.ids):
+            f.write(json.dumps({
+                "id": datapoint_id,
+                "embedding": store.original(row).tolist(),
+                "metadata": store.metadata[row]
+            }) + "\n")
+    return len(store)
+
+
+def _download(blob, path: str) -> None:
+    # Pinned to the generation that was checked; written aside, so a failed download leaves the old copy
+    tmp = f"{path}.download"
+    blob.download_to_filename(tmp, if_generation_match=blob.generation)
+    os.replace(tmp, path)
+
+
+def fetch_store_from_gcs(bucket, base: str = STORE_BASE, local_dir: str = ".",
+                         attempts: int = FETCH_ATTEMPTS, retry_seconds: float = FETCH_RETRY_SECONDS) -> Optional[str]:
+    """
+    Download the store files next to `local_dir` unless the local copies
+    are already at the bucket's generation. The sidecar is read first; a
+    .npy whose CRC32C differs from the one it records belongs to an
+    upload still in progress, so the fetch waits and tries again rather
+    than pair new vectors with old ids. Returns the local base, or None
+    when the bucket has no store (or no consistent one after `attempts`).
+    """
+    local_base = os.path.join(local_dir, os.path.basename(base))
+    local_paths, names = store_paths(local_base), store_paths(base)
+    marker = f"{local_base}.generations.json"
+    try:
+        with open(marker) as f:
+            have = json.load(f)
+    except (OSError, ValueError):
+        have = {}
+
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(retry_seconds)
+        blobs = {key: bucket.get_blob(name) for key, name in names.items()}
+        if any(blob is None for blob in blobs.values()):
+            return None
+        stale = {key for key, blob in blobs.items()
+                 if have.get(blob.name) != blob.generation or not os.path.exists(local_paths[key])}
+        if "sidecar" in stale:
+            try:
+                raw = blobs["sidecar"].download_as_bytes(if_generation_match=blobs["sidecar"].generation)
+                sidecar = json.loads(raw)
+            except Exception as e:  # replaced since the listing (412), or gone
+                print(f"⚠️ Embedding store sidecar changed while fetching ({type(e).__name__}); retrying")
+                continue
+        else:
+            with open(local_paths["sidecar"]) as f:
+                sidecar = json.load(f)
+        expected = sidecar.get("crc32c")  # absent in stores written before it was recorded
+        if expected and any(blobs[key].crc32c != expected[key] for key in ("vectors", "norms")):
+            print(f"⏳ Embedding store upload in progress (attempt {attempt + 1} of {attempts})")
+            continue
+        try:
+            for key in stale - {"sidecar"}:
+                _download(blobs[key], local_paths[key])
+        except Exception as e:
+            print(f"⚠️ Embedding store changed while fetching ({type(e).__name__}); retrying")
+            continue
+        if "sidecar" in stale:
+            tmp = f"{local_paths['sidecar']}.download"
+            with open(tmp, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, local_paths["sidecar"])
+        with open(marker, "w") as f:
+            json.dump({blob.name: blob.generation for blob in blobs.values()}, f)
+        return local_base
+    print("⚠️ No consistent embedding store in the bucket")
+    return None
+
+
+def upload_store_to_gcs(bucket, base: str = STORE_BASE) -> None:
+    # Sidecar last: until it lands, readers see the old sidecar's CRC32Cs mismatch and wait
+    paths = store_paths(base)
+    for key in ("vectors", "norms", "sidecar"):
+        bucket.blob(os.path.basename(paths[key])).upload_from_filename(paths[key])
+    print(f"✅ Uploaded embedding store {base}.npy/.norms.npy/.json to gs://{bucket.name}/")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between embeddings JSONL and the binary embedding store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    to_store = subparsers.add_parser("to-store", help="JSONL -> store")
+    to_store.add_argument("jsonl")
+    to_store.add_argument("base", nargs="?", default=STORE_BASE)
+    to_store.add_argument("--dtype", choices=sorted(STORE_DTYPES), default="float32")
+    to_jsonl = subparsers.add_parser("to-jsonl", help="store -> JSONL")
+    to_jsonl.add_argument("base")
+    to_jsonl.add_argument("jsonl")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "to-store":
+        store = jsonl_to_store(args.jsonl, args.base, args.dtype)
+        print(f"✅ Wrote {len(store)} x {store.dimension} {args.dtype} vectors to {args.base}.npy "
+              f"({os.path.getsize(args.jsonl) / 2 ** 20:.1f} MB JSONL -> "
+              f"{os.path.getsize(args.base + '.npy') / 2 ** 20:.1f} MB) in {time.perf_counter() - start:.2f}s")
+    else:
+        count = store_to_jsonl(args.base, args.jsonl)
+        print(f"✅ Wrote {count} embeddings to {args.jsonl} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+MANIFEST_FILE = "index_manifest.json"
+
+
+@dataclass
+class ManifestDiff:
+    """What a bucket listing changes relative to the manifest"""
+    new: List[Any] = field(default_factory=list)
+    changed: List[Any] = field(default_factory=list)
+    deleted: Dict[str, str] = field(default_factory=dict)  # blob name -> datapoint id
+    unchanged: int = 0
+
+    @property
+    def to_embed(self) -> List[Any]:
+        return self.new + self.changed
+
+
+class Manifest:
+    """
+    Blobs already in the index: name -> datapoint id, generation, crc32c
+    and the embedding model version that produced the vector. A blob is
+    re-embedded only when it is new, its content changed (neither
+    generation nor crc32c match) or the model version changed.
+
+    `index_name` is the resource name of the index the entries were
+    written to, set when --rebuild creates a new one.
+    """
+
+    def __init__(self, path: str = MANIFEST_FILE, entries: Dict[str, Dict[str, Any]] = None,
+                 index_name: Optional[str] = None):
+        self.path = path
+        self.entries = entries or {}
+        self.index_name = index_name
+
+    @classmethod
+    def load(cls, path: str = MANIFEST_FILE) -> "Manifest":
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path) as f:
+            data = json.load(f)
+        return cls(path, data["blobs"], data.get("index"))
+
+    def save(self) -> None:
+        # Write-then-rename, so an interrupted run never leaves a truncated manifest
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"updated": time.time(), "index": self.index_name, "blobs": self.entries}, f,
+                      indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def is_current(self, blob: Any, model_version: str) -> bool:
+        entry = self.entries.get(blob.name)
+        if entry is None or entry["model_version"] != model_version:
+            return False
+        # Generation is free from the listing; the CRC32C (a content hash, unlike the etag, which
+        # changes with every generation and metadata update) saves a re-embed when content was
+        # rewritten unchanged
+        if entry["generation"] == blob.generation:
+            return True
+        return entry.get("crc32c") is not None and entry["crc32c"] == blob.crc32c
+
+    def diff(self, blobs: Iterable[Any], model_version: str) -> ManifestDiff:
+        result = ManifestDiff()
+        seen = set()
+        for blob in blobs:
+            seen.add(blob.name)
+            if blob.name not in self.entries:
+                result.new.append(blob)
+            elif self.is_current(blob, model_version):
+                result.unchanged += 1
+            else:
+                result.changed.append(blob)
+        result.deleted = {name: entry["id"] for name, entry in self.entries.items() if name not in seen}
+        return result
+
+    def record(self, blob: Any, datapoint_id: str, model_version: str) -> None:
+        self.entries[blob.name] = {"id": datapoint_id, "generation": blob.generation, "crc32c": blob.crc32c,
+                                   "model_version": model_version}
+
+    def forget(self, name: str) -> None:
+        self.entries.pop(name, None)
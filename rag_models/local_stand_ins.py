@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+import google_crc32c
+import numpy as np
+
+EMBEDDING_DIMENSION = 1408
+
+
+# Same class names as google.api_core.exceptions, so the pipeline retries them
+class ResourceExhausted(Exception):
+    pass
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class LocalBlob:
+    """A file standing in for a GCS blob: name, generation, crc32c and download_as_bytes"""
+
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.path = os.path.join(bucket.root, name)
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.generation = stat.st_mtime_ns
+        self.updated = stat.st_mtime
+        self._crc32c = None
+
+    @property
+    def crc32c(self) -> str:
+        """Base64 big-endian CRC32C of the content, as GCS reports it for every object"""
+        if self._crc32c is None:
+            with open(self.path, "rb") as f:
+                self._crc32c = base64.b64encode(google_crc32c.Checksum(f.read()).digest()).decode()
+        return self._crc32c
+
+    def download_as_bytes(self) -> bytes:
+        self.bucket.simulate_latency()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class LocalBucket:
+    """
+    Directory standing in for a GCS bucket. Downloads sleep for
+    `download_latency_s` (per-object round trip) and fail transiently with
+    probability `failure_rate`.
+    """
+
+    def __init__(self, root: str, name: str = "local-bucket", download_latency_s: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0):
+        self.root = root
+        self.name = name
+        self.download_latency_s = download_latency_s
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def simulate_latency(self) -> None:
+        with self._lock:
+            fail = self._rng.random() < self.failure_rate
+        if self.download_latency_s:
+            time.sleep(self.download_latency_s)
+        if fail:
+            raise ServiceUnavailable("Simulated transient download error")
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self, name)
+
+    def get_blob(self, name: str) -> Optional[LocalBlob]:
+        return LocalBlob(self, name) if os.path.exists(os.path.join(self.root, name)) else None
+
+    def list_blobs(self, prefix: str = "") -> List[LocalBlob]:
+        blobs = []
+        for directory, _, files in os.walk(os.path.join(self.root, prefix)):
+            for filename in files:
+                name = os.path.relpath(os.path.join(directory, filename), self.root).replace(os.sep, "/")
+                blobs.append(LocalBlob(self, name))
+        return sorted(blobs, key=lambda blob: blob.name)
+
+
+class FakeEmbeddingResponse:
+    def __init__(self, image_embedding: List[float]):
+        self.image_embedding = image_embedding
+
+
+class FakeEmbeddingModel:
+    """
+    Stand-in for MultiModalEmbeddingModel. Embeddings are deterministic
+    unit vectors derived from the image bytes. Each call takes
+    `latency_s`; more than `quota_per_minute` calls in a sliding minute
+    raise ResourceExhausted, like the online prediction quota.
+    `quota_window_s` shortens that window (scaling the quota with it) so
+    benchmarks can exercise it in seconds.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, latency_s: float = 0.0,
+                 quota_per_minute: Optional[float] = None, failure_rate: float = 0.0, seed: int = 0,
+                 version: str = "multimodalembedding@001", quota_window_s: float = 60.0):
+        self.dimension = dimension
+        self.latency_s = latency_s
+        self.quota_per_minute = quota_per_minute
+        self.failure_rate = failure_rate
+        self.version = version
+        self.quota_window_s = quota_window_s
+        self._rng = random.Random(seed)
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.quota_errors = 0
+
+    def embed(self, image_bytes: bytes) -> List[float]:
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] > self.quota_window_s:
+                self._calls.popleft()
+            if self.quota_per_minute and len(self._calls) >= self.quota_per_minute * self.quota_window_s / 60:
+                self.quota_errors += 1
+                raise ResourceExhausted("Simulated quota exceeded for multimodalembedding")
+            self._calls.append(now)
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if fail:
+            raise ServiceUnavailable("Simulated transient embedding error")
+        seed = int.from_bytes(hashlib.sha256(image_bytes).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def get_embeddings(self, image=None, **kwargs) -> FakeEmbeddingResponse:
+        """Same call shape as MultiModalEmbeddingModel.get_embeddings(image=Image(...))"""
+        return FakeEmbeddingResponse(self.embed(image._image_bytes))
+
+
+class LocalIndex:
+    """Stand-in for a stream-update MatchingEngineIndex: datapoints by id, call counts"""
+
+    def __init__(self, call_latency_s: float = 0.0):
+        self.call_latency_s = call_latency_s
+        self.datapoints = {}
+        self.upsert_calls = 0
+        self.remove_calls = 0
+
+    def upsert_datapoints(self, datapoints) -> "LocalIndex":
+        time.sleep(self.call_latency_s)
+        self.upsert_calls += 1
+        for datapoint in datapoints:
+            self.datapoints[datapoint.datapoint_id] = list(datapoint.feature_vector)
+        return self
+
+    def remove_datapoints(self, datapoint_ids) -> "LocalIndex":
+        time.sleep(self.call_latency_s)
+        self.remove_calls += 1
+        for datapoint_id in datapoint_ids:
+            self.datapoints.pop(datapoint_id, None)
+        return self
+
+
+def make_sample_images(root: str, count: int, prefix: str = "uploaded_images", size: int = 64,
+                       seed: int = 0) -> List[str]:
+    """Write `count` small distinct JPEGs under root/prefix, for offline runs and benchmarks"""
+    from PIL import Image as PILImage
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(root, prefix), exist_ok=True)
+    names = []
+    for i in range(count):
+        name = f"{prefix}/sample_{i:06d}.jpg"
+        pixels = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        PILImage.fromarray(pixels).save(os.path.join(root, name), format="JPEG", quality=80)
+        names.append(name)
+    return names
@@ -3,16 +3,20 @@ from vertexai.vision_models import MultiModalEmbeddingModel
 from vertexai.preview.generative_models import GenerativeModel, Part
 from vertexai import init as vertexai_init  # <-- Init Vertex AI in correct region
 from google.cloud import storage
-import numpy as np
-import json
+import os
+
+from embedding_store import EmbeddingStore, fetch_store_from_gcs, jsonl_to_store, STORE_BASE
+from similarity_search import search
 
 # --- Config ---
 project = "hawkai-467107"
 location_gemini = "us-central1"  # Required for Gemini
 bucket_name = "hawkvision-feedback"
 jsonl_blob_path = "image_embeddings.jsonl"
+store_cache_dir = "."  # local copy of the binary embedding store, refreshed when the bucket copy changes
 image_path = "/home/g/Google_Agentic_AI/images/image_2.jpeg"
 similarity_threshold = 0.2
+top_k = 5
 custom_prompt = "Give me insights based on the image."
 
 # --- Step 1: Load image and get embedding ---
@@ -23,26 +27,23 @@ input_embedding = embedding_response.image_embedding
 print("✅ First 10 values of input embedding:", input_embedding[:10])
 
 # --- Step 2: Load all embeddings from GCS and compare ---
-print("📥 Reading JSONL from GCS...")
 storage_client = storage.Client(project=project)
 bucket = storage_client.bucket(bucket_name)
-blob = bucket.blob(jsonl_blob_path)
-content = blob.download_as_text()
-
-def cosine_similarity(v1, v2):
-    v1, v2 = np.array(v1), np.array(v2)
-    return np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+store_base = fetch_store_from_gcs(bucket, STORE_BASE, store_cache_dir)
+if store_base is None:
+    print("📥 No embedding store in the bucket; converting JSONL from GCS...")
+    local_jsonl = os.path.join(store_cache_dir, jsonl_blob_path)
+    bucket.blob(jsonl_blob_path).download_to_filename(local_jsonl)
+    store_base = os.path.join(store_cache_dir, STORE_BASE)
+    jsonl_to_store(local_jsonl, store_base)
+print("📥 Memory-mapping embedding store...")
+store = EmbeddingStore.load(store_base)
 
-print("🔍 Comparing input embedding to JSONL embeddings...")
-match_found = False
-for line in content.strip().splitlines():
-    data = json.loads(line)
-    neighbor_embedding = data["embedding"]
-    sim = cosine_similarity(input_embedding, neighbor_embedding)
-    if sim >= similarity_threshold:
-        print(f"✅ Match found! ID: {data['id']} | Similarity: {sim:.4f}")
-        match_found = True
-        break
+print(f"🔍 Searching {len(store)} stored embeddings for the top {top_k}...")
+matches = search(store, input_embedding, k=top_k, threshold=similarity_threshold)[0]
+for match in matches:
+    print(f"✅ Match found! ID: {match.id} | Similarity: {match.score:.4f}")
+match_found = bool(matches)
 
 # --- Step 3: If matched, send image and prompt to Gemini ---
 if match_found:
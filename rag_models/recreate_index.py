@@ -1,32 +1,62 @@
 from google.cloud import aiplatform
+from google.cloud.aiplatform_v1.types import IndexDatapoint
+from google.protobuf import struct_pb2
 import json
 
+from index_manifest import Manifest, MANIFEST_FILE
+
 # --- Step 1: Setup ---
 project = "hawkai-467107"
 location = "asia-south1"
-index_id = "2591592887133143040"
+index_id = "2591592887133143040"  # used until a --rebuild records its new index in the manifest
+UPSERT_BATCH_SIZE = 500  # datapoints per upsert_datapoints request
 
-aiplatform.init(project=project, location=location)
+def get_index(index_name: str = None, manifest_path: str = MANIFEST_FILE):
+    # The index the manifest's entries live in, so upserts follow the latest --rebuild
+    index_name = index_name or Manifest.load(manifest_path).index_name or index_id
+    aiplatform.init(project=project, location=location)
+    return aiplatform.MatchingEngineIndex(index_name=index_name)
 
 # --- Step 2: Load embeddings from JSONL ---
-datapoints = []
-
-with open("image_embeddings.jsonl", "r") as f:
-    for line in f:
-        if line.strip():
-            embedding_data = json.loads(line)
-            datapoint = aiplatform.MatchingEngineIndexDatapoint(
-                datapoint_id=embedding_data["id"],
-                feature_vector=embedding_data["embedding"]["values"],
-                restricts=None,
-                crowding_tag=None,
-                metadata=embedding_data.get("metadata", {})
-            )
-            datapoints.append(datapoint)
-
-print(f"📦 Loaded {len(datapoints)} datapoints.")
+def to_datapoint(embedding_data: dict) -> IndexDatapoint:
+    # Lines hold a flat list; older files wrapped it as {"values": [...]}
+    embedding = embedding_data["embedding"]
+    if isinstance(embedding, dict):
+        embedding = embedding["values"]
+    metadata = struct_pb2.Struct()
+    metadata.update(embedding_data.get("metadata", {}))
+    return IndexDatapoint(
+        datapoint_id=embedding_data["id"],
+        feature_vector=embedding,
+        restricts=None,
+        crowding_tag=None,
+        embedding_metadata=metadata
+    )
+
+def load_datapoints(path: str = "image_embeddings.jsonl"):
+    datapoints = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                datapoints.append(to_datapoint(json.loads(line)))
+    return datapoints
 
 # --- Step 3: Upsert into index ---
-index = aiplatform.MatchingEngineIndex(index_name=index_id)
-index.upsert_datapoints(datapoints=datapoints)
-print("✅ Successfully upserted datapoints.")
+def upsert_datapoints(datapoints, index=None, batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    index = index or get_index()
+    for start in range(0, len(datapoints), batch_size):
+        index.upsert_datapoints(datapoints=datapoints[start:start + batch_size])
+    return len(datapoints)
+
+def remove_datapoints(datapoint_ids, index=None, batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    index = index or get_index()
+    datapoint_ids = list(datapoint_ids)
+    for start in range(0, len(datapoint_ids), batch_size):
+        index.remove_datapoints(datapoint_ids=datapoint_ids[start:start + batch_size])
+    return len(datapoint_ids)
+
+if __name__ == "__main__":
+    datapoints = load_datapoints()
+    print(f"📦 Loaded {len(datapoints)} datapoints.")
+    upsert_datapoints(datapoints)
+    print("✅ Successfully upserted datapoints.")
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List
+
+from embedding_pipeline import Item, RunSummary, jsonl_line
+
+CHECKPOINT_EVERY = 50  # items between checkpoints
+CHECKPOINT_SECONDS = 30.0  # ... or this long, whichever comes first
+
+
+def _sync(f) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class CheckpointedWriter:
+    """
+    Pipeline writer for long runs. Each finished item is appended to the
+    JSONL output and its GCS URI to `<output>.done`; every `every` items or
+    `seconds` both files are fsynced and their lengths saved to
+    `<output>.checkpoint`. A restarted run truncates both back to the last
+    checkpoint, so a torn line never survives, and skips every URI already
+    done. A checkpoint written for another `model_version` is ignored, so
+    vectors from two models never mix. Finishing without failures removes
+    the checkpoint state, so the next run starts fresh.
+    """
+
+    def __init__(self, output_path: str, resume: bool = True, every: int = CHECKPOINT_EVERY,
+                 seconds: float = CHECKPOINT_SECONDS, model_version: str = None):
+        self.output_path = output_path
+        self.model_version = model_version
+        self.done_path = f"{output_path}.done"
+        self.checkpoint_path = f"{output_path}.checkpoint"
+        self.every = every
+        self.seconds = seconds
+        self.completed = set()
+        self.checkpoints = 0
+
+        state = self._load() if resume else None
+        if state:
+            for path, size in ((output_path, state["output_bytes"]), (self.done_path, state["done_bytes"])):
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+            with open(self.done_path) as f:
+                self.completed = {line.strip() for line in f if line.strip()}
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(state["updated"]))
+            print(f"🔁 Resuming the unfinished run of {updated} into {output_path}: {len(self.completed)} images "
+                  f"already embedded with {state.get('model_version')} are reused, not re-embedded "
+                  f"(--fresh re-embeds everything)")
+        self.resuming = bool(state)
+        self.resumed = len(self.completed)
+        self.output = open(output_path, "ab" if state else "wb")
+        self.done = open(self.done_path, "ab" if state else "wb")
+        self._since = 0
+        self._last = time.monotonic()
+        self.checkpoint()
+
+    def _load(self) -> Dict[str, Any]:
+        if not all(os.path.exists(path) for path in (self.checkpoint_path, self.output_path, self.done_path)):
+            return None
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        if state.get("model_version") != self.model_version:
+            print(f"⚠️ Ignoring the checkpoint in {self.checkpoint_path}: written with model "
+                  f"{state.get('model_version')}, this run uses {self.model_version}")
+            return None
+        return state
+
+    def pending(self, items: Iterable[Item]) -> Iterator[Item]:
+        """Items not completed by an earlier run"""
+        for item in items:
+            if item.gcs_uri not in self.completed:
+                yield item
+
+    def __call__(self, item: Item) -> None:
+        self.output.write((jsonl_line(item) + "\n").encode())
+        self.done.write((item.gcs_uri + "\n").encode())
+        self.completed.add(item.gcs_uri)
+        self._since += 1
+        if self._since >= self.every or time.monotonic() - self._last >= self.seconds:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        _sync(self.output)
+        _sync(self.done)
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"output_bytes": self.output.tell(), "done_bytes": self.done.tell(),
+                       "completed": len(self.completed), "model_version": self.model_version,
+                       "updated": time.time()}, f)
+            _sync(f)
+        os.replace(tmp, self.checkpoint_path)
+        self.checkpoints += 1
+        self._since = 0
+        self._last = time.monotonic()
+
+    def close(self, summary: RunSummary, completed: bool = False) -> None:
+        """Checkpoint and close; the resume state is dropped only after a run that completed without failures"""
+        self.checkpoint()
+        self.output.close()
+        self.done.close()
+        if completed and not summary.failures:
+            for path in (self.checkpoint_path, self.done_path):
+                os.remove(path)
+        elif completed:
+            print(f"💾 Checkpoint kept in {self.checkpoint_path}: the next --rebuild reuses the "
+                  f"{len(self.completed)} finished images and retries the rest; --fresh starts over")
+
+
+def summary_path(output_path: str) -> str:
+    return f"{output_path}.summary.json"
+
+
+def write_run_summary(output_path: str, summary: RunSummary, **extra) -> str:
+    """`<output>.summary.json`: counts, timing and every failed URI with its error, for a targeted retry"""
+    path = summary_path(output_path)
+    with open(path, "w") as f:
+        json.dump({**summary.as_dict(), **extra, "retry": sorted(summary.failures)}, f, indent=2)
+    return path
+
+
+def failed_blobs(output_path: str, bucket) -> List[Any]:
+    """Blobs listed as failed in the last run summary, fetched by name instead of listing the bucket"""
+    with open(summary_path(output_path)) as f:
+        uris = json.load(f)["retry"]
+    prefix = f"gs://{bucket.name}/"
+    blobs = [bucket.get_blob(uri[len(prefix):]) for uri in uris if uri.startswith(prefix)]
+    return [blob for blob in blobs if blob is not None]
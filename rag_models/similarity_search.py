@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_store import EmbeddingStore
+
+TOP_K = 5
+SEARCH_CHUNK_ROWS = 16384  # rows scored per matrix product; bounds the float32 copy of a float16/mmapped store
+
+
+@dataclass
+class Match:
+    id: str
+    score: float  # cosine similarity
+    row: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def normalize(queries) -> np.ndarray:
+    """Queries as float32 unit rows; one query becomes a batch of one"""
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries / np.where(norms, norms, 1)
+
+
+def _best(scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The k highest scores per query, unordered (argpartition, no full sort)"""
+    if scores.shape[1] <= k:
+        return scores, rows
+    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, keep, 1), np.take_along_axis(rows, keep, 1)
+
+
+def top_k(vectors: np.ndarray, queries, k: int = TOP_K,
+          chunk_rows: int = SEARCH_CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k of unit-row `vectors` for each query: one matrix product
+    per chunk of rows (a matrix-vector product for a single query), a
+    partial sort per chunk, then a final sort of the k survivors. Returns
+    (rows, scores), each (queries, k), best first.
+    """
+    queries = normalize(queries)
+    k = min(k, len(vectors))
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    best_rows = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_rows):
+        chunk = np.asarray(vectors[start:start + chunk_rows], dtype=np.float32)
+        scores = queries @ chunk.T
+        rows = np.broadcast_to(np.arange(start, start + len(chunk)), scores.shape)
+        scores, rows = _best(scores, rows, k)
+        best_scores, best_rows = _best(np.concatenate([best_scores, scores], 1),
+                                       np.concatenate([best_rows, rows], 1), k)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_rows, order, 1), np.take_along_axis(best_scores, order, 1)
+
+
+def search(store: EmbeddingStore, queries, k: int = TOP_K, threshold: Optional[float] = None,
+           chunk_rows: int = SEARCH_CHUNK_ROWS) -> List[List[Match]]:
+    """
+    Top-k matches per query, best first. `threshold` filters the true
+    top-k afterwards, so a result is never a weaker match that merely came
+    earlier in the file.
+    """
+    rows, scores = top_k(store.vectors, queries, k, chunk_rows)
+    results = []
+    for query_rows, query_scores in zip(rows, scores):
+        results.append([Match(store.ids[row], float(score), int(row), store.metadata[row])
+                        for row, score in zip(query_rows, query_scores)
+                        if threshold is None or score >= threshold])
+    return results